@@ -0,0 +1,61 @@
+# -*- mode: python ; coding: utf-8 -*-
+# 启动优化版本（onedir）：
+#   · 不使用onefile，启动时不用每次把整个程序解压到临时目录
+#   · 排除用不到的标准库和第三方模块
+#   · optimize=1 预编译字节码（去掉assert，保留docstring）
+#   · 去掉selenium-manager（程序自己查找chromedriver并传给Service，不会调用它）和不需要的数据文件
+#   · 不使用UPX，压缩过的DLL每次加载都要先解压
+# 构建: python build.py --fast
+
+
+EXCLUDES = [
+    'tkinter', 'unittest', 'pydoc', 'doctest', 'pdb', 'lib2to3', 'xmlrpc', 'pydoc_data',
+    'test', 'distutils', 'setuptools', 'pip', 'IPython', 'matplotlib', 'numpy', 'pandas', 'PIL',
+]
+
+a = Analysis(
+    ['run.py'],
+    pathex=[],
+    binaries=[],
+    datas=[('.env.template', '.')],
+    hiddenimports=['selenium', 'webdriver_manager', 'dotenv', 'loguru', 'requests', 'urllib3', 'certifi', 'charset_normalizer'],
+    hookspath=[],
+    hooksconfig={},
+    runtime_hooks=[],
+    excludes=EXCLUDES,
+    noarchive=False,
+    optimize=1,
+)
+
+# selenium-manager是各平台的驱动下载程序，每个都有数MB
+a.binaries = [entry for entry in a.binaries if 'selenium-manager' not in entry[0]]
+a.datas = [entry for entry in a.datas if 'selenium-manager' not in entry[0]]
+
+pyz = PYZ(a.pure)
+
+exe = EXE(
+    pyz,
+    a.scripts,
+    [],
+    exclude_binaries=True,
+    name='SZTU_Course_Helper_Fast',
+    debug=False,
+    bootloader_ignore_signals=False,
+    strip=False,
+    upx=False,
+    console=True,
+    disable_windowed_traceback=False,
+    argv_emulation=False,
+    target_arch=None,
+    codesign_identity=None,
+    entitlements_file=None,
+)
+coll = COLLECT(
+    exe,
+    a.binaries,
+    a.datas,
+    strip=False,
+    upx=False,
+    upx_exclude=[],
+    name='SZTU_Course_Helper_Fast',
+)
@@ -1,4 +1,5 @@
 import os
+import argparse
 import random
 import time
 import sys
@@ -6,7 +7,9 @@ import socket
 import subprocess
 import requests
 import urllib3
+from contextlib import contextmanager
 from datetime import datetime
+from urllib.parse import urlparse
 from dotenv import load_dotenv
 from loguru import logger
 from selenium import webdriver
@@ -15,9 +18,31 @@ from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait, Select
 from selenium.webdriver.support import expected_conditions as EC
-from selenium.common.exceptions import TimeoutException, NoSuchElementException, WebDriverException
-from webdriver_manager.chrome import ChromeDriverManager
+from selenium.common.exceptions import (TimeoutException, NoSuchWindowException, WebDriverException,
+                                        SessionNotCreatedException)
 from config import CourseConfig
+from settings import env_flag
+from browser_discovery import discover
+from table_watch import TableWatcher
+from net_timing import NetworkTimingCollector, enable_performance_log
+from outcomes import classify_result, retry_policy, SUCCESS, FULL, UNKNOWN, DONE, STOP, RELOGIN
+from table_parser import read_table
+from matcher import MatchIndex, query_text
+from session_probe import SessionProbe, EXPIRING, EXPIRED, DEFAULT_PATH as PROBE_PATH
+from section_cache import SectionCache
+import login_flow
+from login_flow import LOGIN_STATE_JS, LOGIN_SUBMIT_JS, ENTRY_STATES
+from search_form import fill_search_form, WEEKDAY_VALUES
+from latency import LatencyTracker, DEFAULT_PATH as LATENCY_PATH
+from command_stats import CommandStats
+from metrics import selection_metrics, start_server as start_metrics_server, since
+from scheduler import CourseScheduler, course_key
+from rate_limit import TokenBucket
+from catalog import CourseCatalog, DEFAULT_DB as CATALOG_DB
+from seat_history import SeatHistory, DEFAULT_DB as SEAT_HISTORY_DB
+from profiling import profiled
+from runs import run_dir, claim_run_id
+from log_archive import LogArchive
 import json
 
 # 配置详细的日志记录
@@ -31,13 +56,72 @@ logger.add(
 )
 
 # 仅在非打包模式下添加控制台输出
+CONSOLE_HANDLER = None
 if not getattr(sys, 'frozen', False):
-    logger.add(sys.stderr, level="INFO")
+    CONSOLE_HANDLER = logger.add(sys.stderr, level="INFO")
+
+def set_console_level(level):
+    """调整控制台日志级别（如 --debug 时输出DEBUG日志）"""
+    global CONSOLE_HANDLER
+    if CONSOLE_HANDLER is not None:
+        logger.remove(CONSOLE_HANDLER)
+    CONSOLE_HANDLER = logger.add(sys.stderr, level=level)
+
+# 提前加载.env，运行选项也从中读取
+load_dotenv()
+
+# 教务系统和统一认证地址，可通过环境变量指向本地模拟服务（见fault_server.py）
+BASE_URL = os.getenv("JWXT_BASE_URL", "https://jwxt.sztu.edu.cn").rstrip("/")
+AUTH_CHECK_URL = os.getenv("JWXT_AUTH_URL", "https://auth.sztu.edu.cn/idp/authcenter/ActionAuthChain?entityId=jiaowu")
+
+# 各处等待时间（秒），可通过 TIMEOUTS_FILE 指定的JSON文件覆盖
+TIMEOUTS = {
+    "element": 10,        # wait_for_element 默认等待
+    "page_load": 15,      # 页面加载超时
+    "script": 15,         # 脚本执行超时
+    "vpn_check": 5,       # 教务系统可达性检查
+    "alert": 3,           # 选课确认/结果弹窗
+    "results": 5,         # 查询结果表格刷新
+}
+
+def load_timeouts(path=None):
+    """从JSON文件加载超时设置覆盖默认值"""
+    path = path or os.getenv("TIMEOUTS_FILE")
+    if not path or not os.path.exists(path):
+        return TIMEOUTS
+    with open(path, 'r', encoding='utf-8') as f:
+        overrides = json.load(f)
+    unknown = set(overrides) - set(TIMEOUTS)
+    if unknown:
+        logger.warning(f"忽略未知的超时设置: {sorted(unknown)}")
+    TIMEOUTS.update({k: float(v) for k, v in overrides.items() if k in TIMEOUTS})
+    logger.info(f"已加载超时设置: {path}")
+    return TIMEOUTS
+
+load_timeouts()
+
+# 各选课类型对应的页面地址
+TAB_URLS = {
+    "plan": "/jsxsd/xsxkkc/comeInBxqjhxk",  # 本学期计划选课
+    "public": "/jsxsd/xsxkkc/comeInGgxxkxk",  # 公选课选课
+    "cross_grade": "/jsxsd/xsxkkc/comeInKnjxk",  # 专业内跨年级选课
+    "cross_major": "/jsxsd/xsxkkc/comeInFawxk"  # 跨专业选课
+}
+
+def launch_debug_chrome(port=9222, profile_dir=None, chrome_path=None):
+    """启动带远程调试端口和固定用户目录的Chrome，供 --attach 连接，返回调试地址"""
+    profile_dir = os.path.abspath(profile_dir or os.getenv("CHROME_PROFILE_DIR") or "chrome_profile")
+    chrome_path = chrome_path or discover()["chrome"]
+    subprocess.Popen([
+        chrome_path, f"--remote-debugging-port={port}", f"--user-data-dir={profile_dir}",
+        "--no-first-run", "--no-default-browser-check", "--disable-blink-features=AutomationControlled",
+    ])
+    return f"127.0.0.1:{port}"
 
 def check_basic_network(retries=3):
     for _ in range(retries):
         try:
-            socket.gethostbyname("auth.sztu.edu.cn")
+            socket.gethostbyname(urlparse(AUTH_CHECK_URL).hostname)
             return True
         except socket.gaierror:
             time.sleep(1)
@@ -51,9 +135,9 @@ def check_vpn_network():
         
         # 尝试访问教务系统
         response = requests.get(
-            "https://auth.sztu.edu.cn/idp/authcenter/ActionAuthChain?entityId=jiaowu",
+            AUTH_CHECK_URL,
             verify=False,  # 忽略SSL证书验证
-            timeout=5
+            timeout=TIMEOUTS["vpn_check"]
         )
         if response.status_code == 200:
             logger.info("教务系统可以访问")
@@ -75,18 +159,91 @@ def check_vpn_network():
         return False
 
 class CourseSelector:
-    def __init__(self,headless=True):
-        logger.info("初始化选课程序...")
+    def __init__(self,headless=True, multi_window=None, capture_network=None, metrics_port=None, attach=None):
+        # 本次运行的日志存档和错误截图放在 runs/<运行编号>/ 下
+        self.run_id = claim_run_id()
+        self.run_dir = run_dir(self.run_id)
+        self.current_course = None
+        self.archive = None
+        if env_flag("LOG_ARCHIVE", True):
+            self.archive = LogArchive(self.run_dir, self.run_id, context=lambda: (
+                self.current_course, getattr(self, "current_phase", None))).start()
+        logger.info(f"初始化选课程序...（运行编号 {self.run_id}）")
+        self.headless = headless
+        # 连接模式：连接已运行的Chrome（远程调试地址），不启动新浏览器
+        self.attach_address = attach if attach is not None else (os.getenv("CHROME_DEBUGGER_ADDRESS") or None)
+        # 多窗口模式：每个选课类型常驻一个窗口，切换类型只需切换窗口句柄
+        self.multi_window = env_flag("MULTI_WINDOW") if multi_window is None else multi_window
+        self.tab_windows = {}
+        self.stale_tabs = set()
+        # 用一次脚本调用填写并提交查询表单（失败时退回逐步操作）
+        self.batch_search = env_flag("BATCH_SEARCH", True)
+        # 已知教学班直接执行选课操作，不再查询
+        self.section_cache = SectionCache() if env_flag("FAST_RESELECT", True) else None
+        # 网络耗时采集：通过Chrome性能日志记录每个请求的各阶段耗时
+        if capture_network is None:
+            capture_network = env_flag("NET_TIMING")
+        # 各逻辑等待的耗时样本，用于计算自适应超时
+        # 样本文件（LATENCY_SAMPLES），"0"为不在运行之间保存
+        samples_path = os.getenv("LATENCY_SAMPLES") or LATENCY_PATH
+        self.latency = LatencyTracker(path=None if samples_path == "0" else samples_path)
+        self.latency.load()
+        self.net_timing = NetworkTimingCollector(
+            hosts=(urlparse(BASE_URL).hostname, urlparse(AUTH_CHECK_URL).hostname)
+        ) if capture_network else None
+        self.current_phase = None
+        # 运行指标：选课线程只更新内存计数，由后台线程对外提供
+        self.metrics = selection_metrics()
+        # 全局请求限流：所有发往教务系统的请求都先取令牌
+        self.limiter = TokenBucket(
+            rate_per_minute=float(os.getenv("REQUEST_RATE") or 30),
+            burst=int(os.getenv("REQUEST_BURST") or 5),
+        )
+        self.limiter.listener = lambda kind, waited: self.metrics.observe(
+            "rate_limit_wait_seconds", waited, kind=kind)
+        self.metrics.set_function("rate_limit_tokens", self.limiter.available)
+        # 课程之间检查登录状态（有最小间隔），失效或即将过期时原地重新登录
+        self.session_probe = SessionProbe(
+            BASE_URL, path=os.getenv("JWXT_PROBE_PATH") or PROBE_PATH,
+            interval=float(os.getenv("SESSION_CHECK_INTERVAL") or 30),
+            timeout=TIMEOUTS["vpn_check"],
+            max_age=float(os.getenv("SESSION_MAX_AGE") or 0) or None,
+            limiter=self.limiter,
+        )
+        self.last_poll_at = None
+        # 选课页面地址：第一次逐级进入时记下，之后登录从首页直接打开（也可用SELECTION_URL指定）
+        self.selection_url = os.getenv("SELECTION_URL") or None
+        self.entry_times = []
+        # 按阶段和命令类型统计发给chromedriver的命令
+        self.command_stats = CommandStats()
+        self.metrics.set_function("seconds_since_last_poll", since(lambda: self.last_poll_at))
+        if metrics_port is None:
+            metrics_port = int(os.getenv("METRICS_PORT") or 0)
+        self.metrics_server = None
         try:
-            # 首先检查网络连接
-            if not check_basic_network():
-                raise ConnectionError("网络连接异常，请检查网络设置")
-            if not check_vpn_network():
-                raise ConnectionError("无法访问教务系统，请确保已连接校园网或VPN")
+            # 首先检查网络连接（连接已运行的浏览器时跳过，由登录状态检查代替）
+            if not self.attach_address:
+                if not check_basic_network():
+                    raise ConnectionError("网络连接异常，请检查网络设置")
+                if not check_vpn_network():
+                    raise ConnectionError("无法访问教务系统，请确保已连接校园网或VPN")
                 
             self.setup_driver()
+            self.command_stats.install(self.driver, lambda: self.current_phase, self.on_command)
+            self.table_watcher = TableWatcher(self.driver)
+            if metrics_port:
+                self.metrics_server = start_metrics_server(self.metrics, metrics_port)
+                logger.info(f"指标接口已启动: http://127.0.0.1:{metrics_port}/metrics")
             self.load_credentials()
             self.selected_courses = set()
+            # 永久失败的课程（课程标识 -> 结果类别），不再重试
+            self.failed_courses = {}
+            # 每次解析结果表格时记录各教学班的余量
+            self.seat_history = None
+            if env_flag("SEAT_HISTORY", True):
+                self.seat_history = SeatHistory(os.getenv("SEAT_HISTORY_DB") or SEAT_HISTORY_DB)
+            # 课程标识 -> 上次解析的结果表格行（表格未变化时照此记录余量）
+            self.seat_rows = {}
             logger.success("初始化完成")
         except Exception as e:
             logger.error(f"初始化失败: {str(e)}")
@@ -96,37 +253,58 @@ class CourseSelector:
         """Set up Chrome driver with anti-detection measures"""
         logger.info("正在配置Chrome浏览器...")
         try:
-            # 检查浏览器安装
-            chrome_path = "C:\\Program Files\\Google\\Chrome\\Application\\chrome.exe"
-            if not os.path.exists(chrome_path):
-                raise FileNotFoundError(f"Chrome浏览器未安装在默认路径: {chrome_path}")
-
-            # 检查chromedriver
-            chromedriver_path = r"C:\Program Files\Google\Chrome\Application\chromedriver.exe"
-            logger.info(f"正在检查chromedriver路径: {chromedriver_path}")
-            if not os.path.exists(chromedriver_path):
-                raise FileNotFoundError(f"未找到chromedriver: {chromedriver_path}\n请执行以下操作：\n1. 访问 https://chromedriver.chromium.org/downloads\n2. 下载与Chrome版本匹配的驱动\n3. 解压后将chromedriver.exe放入Chrome安装目录")
+            # 查找Chrome和版本匹配的chromedriver（结果有缓存，之后启动不再检测）
+            self.browser_info = discover(need_chrome=not self.attach_address)
+            chromedriver_path = self.browser_info["driver"]
+            logger.info(f"Chrome: {self.browser_info['chrome']} ({self.browser_info['chrome_version']})")
+            logger.info(f"chromedriver: {chromedriver_path} ({self.browser_info['driver_version']})")
+            logger.info(f"浏览器检测耗时 {self.browser_info['seconds'] * 1000:.0f}ms"
+                        f"（{'缓存' if self.browser_info['source'] == 'cache' else '重新检测'}）")
 
             options = Options()
-            # 设置无界面模式
-            options.add_argument("--headless=new")
-            #设置界面模式
-            options.add_argument("--disable-blink-features=AutomationControlled")
-            options.add_experimental_option("excludeSwitches", ["enable-automation"])
-            options.add_experimental_option("useAutomationExtension", False)
-            
-            # 添加更多的反检测参数
-            options.add_argument("--disable-gpu")
-            options.add_argument("--no-sandbox")
-            options.add_argument("--disable-dev-shm-usage")
-            options.add_argument("--window-size=1920,1080")
-            
-            # 设置用户代理
-            options.add_argument("user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/121.0.0.0 Safari/537.36")
+            if self.attach_address:
+                # 连接已运行的Chrome：启动参数和excludeSwitches对已运行的浏览器无效，不能设置
+                options.debugger_address = self.attach_address
+                logger.info(f"正在连接已运行的Chrome: {self.attach_address}")
+            else:
+                options.binary_location = self.browser_info["chrome"]
+                # 设置无界面模式
+                if self.headless:
+                    options.add_argument("--headless=new")
+                #设置界面模式
+                options.add_argument("--disable-blink-features=AutomationControlled")
+                options.add_experimental_option("excludeSwitches", ["enable-automation"])
+                options.add_experimental_option("useAutomationExtension", False)
+                
+                # 添加更多的反检测参数
+                options.add_argument("--disable-gpu")
+                options.add_argument("--no-sandbox")
+                options.add_argument("--disable-dev-shm-usage")
+                options.add_argument("--window-size=1920,1080")
+                
+                # 设置用户代理
+                options.add_argument("user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/121.0.0.0 Safari/537.36")
+
+            if self.net_timing:
+                enable_performance_log(options)
+                logger.info("已开启网络耗时采集")
             
             logger.info("正在初始化ChromeDriver服务...")
-            service = Service(executable_path=chromedriver_path)
-            self.driver = webdriver.Chrome(service=service, options=options)
+            try:
+                self.driver = webdriver.Chrome(service=Service(executable_path=chromedriver_path), options=options)
+            except SessionNotCreatedException as e:
+                if self.browser_info["source"] != "cache":
+                    raise
+                # 缓存的chromedriver与（已更新的）Chrome不再匹配：丢弃缓存重新检测一次
+                logger.warning(f"使用缓存的浏览器路径创建会话失败，重新检测: {str(e).splitlines()[0]}")
+                self.browser_info = discover(refresh=True, need_chrome=not self.attach_address)
+                chromedriver_path = self.browser_info["driver"]
+                if not self.attach_address:
+                    options.binary_location = self.browser_info["chrome"]
+                logger.info(f"chromedriver: {chromedriver_path} ({self.browser_info['driver_version']})")
+                self.driver = webdriver.Chrome(service=Service(executable_path=chromedriver_path), options=options)
+            # 不使用隐式等待，所有等待都是带自适应超时的显式等待，找不到元素时立即返回
+            self.driver.implicitly_wait(0)
             
             # 注入反检测JavaScript
             logger.debug("注入反检测代码...")
@@ -170,21 +348,18 @@ class CourseSelector:
             logger.error(f"加载登录凭证失败: {str(e)}")
             raise
             
-    def check_network(self):
-        """检查网络连接和教务系统可访问性"""
-        logger.info("正在执行深度网络检查...")
+    def open_login_page(self):
+        """打开教务系统（未登录时为登录页面），网络出错时输出排查提示并截图"""
+        logger.info("正在打开教务系统...")
         try:
-            # 记录开始时间
-            start_time = time.time()
-            
             # 设置页面加载超时
-            self.driver.set_page_load_timeout(15)
-            self.driver.set_script_timeout(15)
+            self.driver.set_page_load_timeout(TIMEOUTS["page_load"])
+            self.driver.set_script_timeout(TIMEOUTS["script"])
             
             # 新增DNS解析检查
             try:
                 dns_start = time.time()
-                socket.gethostbyname("jwxt.sztu.edu.cn")
+                socket.gethostbyname(urlparse(BASE_URL).hostname)
                 logger.debug(f"DNS解析成功，耗时: {(time.time()-dns_start)*1000:.2f}ms")
             except socket.gaierror as e:
                 logger.error("DNS解析失败，请检查网络连接")
@@ -192,27 +367,9 @@ class CourseSelector:
             
             # 尝试访问教务系统
             logger.debug("正在初始化网络请求...")
-            self.driver.get("https://jwxt.sztu.edu.cn")
-            
-            # 等待页面加载完成
-            WebDriverWait(self.driver, 10).until(
-                lambda driver: driver.execute_script('return document.readyState') == 'complete'
-            )
-            
-            # 获取页面标题和URL
-            current_url = self.driver.current_url
-            page_title = self.driver.title
-            
-            logger.debug(f"当前页面URL: {current_url}")
-            logger.debug(f"页面标题: {page_title}")
-            
-            # 检查是否被重定向到登录页面
-            if "jioawu" in current_url.lower() or "系统登录" in page_title:
-                logger.success("成功访问登录页面")
-                return True
-            else:
-                logger.warning(f"页面内容异常，当前URL: {current_url}")
-                raise Exception(f"页面内容异常，当前URL: {current_url}")
+            self.limiter.acquire("login")
+            self.driver.get(BASE_URL)
+            return True
                 
         except WebDriverException as e:
             error_msg = str(e).lower()
@@ -228,136 +385,253 @@ class CourseSelector:
             
             # 保存错误截图
             try:
-                timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-                screenshot_path = f"network_error_{timestamp}.png"
-                self.driver.save_screenshot(screenshot_path)
+                screenshot_path = self.save_screenshot("network_error")
                 logger.info(f"网络错误截图已保存: {screenshot_path}")
             except Exception as se:
                 logger.error(f"保存错误截图失败: {str(se)}")
                 
             raise
             
+    @contextmanager
+    def phase(self, name):
+        """标记当前所处阶段（login/navigate/search/verify/confirm），用于分阶段统计"""
+        previous = self.current_phase
+        self.current_phase = name
+        start = time.time()
+        try:
+            yield
+        finally:
+            self.metrics.observe("phase_duration_seconds", time.time() - start, phase=name)
+            if self.net_timing:
+                self.net_timing.drain(self.driver, name)
+            self.current_phase = previous
+
+    @contextmanager
+    def course_context(self, key):
+        """标记当前处理的课程（写入存档日志），continue或异常退出时同样恢复"""
+        previous = self.current_course
+        self.current_course = key
+        try:
+            yield
+        finally:
+            self.current_course = previous
+
+    def on_command(self, phase, command, seconds):
+        """每个WebDriver命令执行后更新指标（每个命令都是一次发给chromedriver的HTTP请求）"""
+        self.metrics.inc("webdriver_commands_total", phase=phase)
+
+    def sample_browser_memory(self):
+        """读取当前页面的JS堆内存（每轮一次）"""
+        try:
+            self.driver.execute_cdp_cmd("Performance.enable", {})
+            result = self.driver.execute_cdp_cmd("Performance.getMetrics", {})
+            values = {m["name"]: m["value"] for m in result.get("metrics", [])}
+            self.metrics.set("chrome_js_heap_used_bytes", values.get("JSHeapUsedSize", 0))
+        except Exception as e:
+            logger.debug(f"读取浏览器内存失败: {str(e)}")
+
+    def log_run_summary(self):
+        """输出本次运行的统计汇总"""
+        if self.net_timing:
+            self.net_timing.log_summary()
+        self.command_stats.log_summary()
+        limiter = self.limiter.describe()
+        logger.info(f"请求限流: 每分钟{limiter['rate_per_minute']:g}个，突发{limiter['burst']}个，"
+                    f"共{limiter['requests']}个请求，等待令牌 {limiter['waited']:.1f}s")
+        for kind, stats in sorted(limiter["by_kind"].items()):
+            logger.info(f"  {kind}: {stats['count']} 个，等待 {stats['waited']:.1f}s")
+        if self.entry_times:
+            logger.info(f"进入选课系统 {len(self.entry_times)} 次，耗时 "
+                        + "、".join(f"{t:.2f}s" for t in self.entry_times))
+        latency = self.latency.summary()
+        if latency:
+            logger.info("等待耗时统计 (样本数 P50/P99, s):")
+            for key, stats in sorted(latency.items()):
+                default = TIMEOUTS.get(key, TIMEOUTS["element"])
+                logger.info(f"  {key}: {stats['count']} {stats['p50']:.2f}/{stats['p99']:.2f} "
+                            f"-> 超时 {self.latency.timeout_for(key, default):.2f}")
+
+    def save_screenshot(self, prefix):
+        """保存当前页面截图到运行目录，返回文件路径"""
+        path = os.path.join(self.run_dir, f"{prefix}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.png")
+        self.driver.save_screenshot(path)
+        return path
+
     def random_sleep(self, min_time=0.1, max_time=1):
         """Add random delay to simulate human behavior"""
         delay = random.uniform(min_time, max_time)
         logger.debug(f"等待 {delay:.2f} 秒...")
         time.sleep(delay)
         
-    def wait_for_element(self, by, value, timeout=10):
-        """Wait for element to be present and clickable"""
+    def wait_for_element(self, by, value, timeout=None, key=None):
+        """Wait for element to be present and clickable
+
+        未指定timeout时按该等待对象(key，默认为定位符)的历史耗时计算自适应超时
+        """
+        key = key or f"{by}={value}"
+        if timeout is None:
+            timeout = self.latency.timeout_for(key, TIMEOUTS["element"])
         try:
-            logger.debug(f"等待元素出现: {by}={value}")
-            element = WebDriverWait(self.driver, timeout).until(
-                EC.element_to_be_clickable((by, value))
-            )
+            logger.debug(f"等待元素出现: {by}={value} (超时{timeout:.1f}s)")
+            start = time.time()
+            with self.command_stats.polling():
+                element = WebDriverWait(self.driver, timeout, poll_frequency=0.1).until(
+                    EC.element_to_be_clickable((by, value))
+                )
+            self.latency.record(key, time.time() - start)
             logger.debug("元素已找到")
             return element
         except TimeoutException:
+            self.latency.record_timeout(key, timeout)
             logger.error(f"等待元素超时: {by}={value}")
             # 保存页面截图以便调试
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            screenshot_path = f"error_screenshot_{timestamp}.png"
-            self.driver.save_screenshot(screenshot_path)
+            screenshot_path = self.save_screenshot("error_screenshot")
             logger.info(f"错误截图已保存: {screenshot_path}")
             raise
             
     def login(self):
         """Login to the SZTU educational system"""
+        if self.attach_address and self.find_selection_page():
+            logger.success("已连接的浏览器仍在选课页面，跳过登录")
+            self.session_probe.logged_in()
+            return True
         logger.info("开始登录教务系统...")
+        with self.phase("login"):
+            ok = self._login()
+        if ok:
+            self.session_probe.logged_in()
+        return ok
+
+    def _login(self):
+        """登录并进入选课页面（在login阶段内执行）
+
+        每一步都等待"任一预期状态出现"（见login_flow），已知选课地址时从首页直接打开，
+        跳过逐级点击。
+        """
+        start = time.time()
+        steps = []
+        deep_link = False
         try:
-            # 首先检查网络连接
-            if not self.check_network():
+            if not self.open_login_page():
                 return False
-                
-            logger.debug("开始输入登录信息...")
-            username_input = self.wait_for_element(By.XPATH, "//*[@id='j_username']")
-            password_input = self.wait_for_element(By.XPATH, "//*[@id='j_password']")
-            login_button = self.wait_for_element(By.XPATH, "//*[@id='loginButton']")
-            
-            # 清除输入框并输入凭证
-            username_input.clear()
-            username_input.send_keys(self.username)
-            logger.debug("已输入用户名")
-            self.random_sleep()
-            
-            password_input.clear()
-            password_input.send_keys(self.password)
-            logger.debug("已输入密码")
-            self.random_sleep()
-            
-            # 点击登录按钮
-            login_button.click()
-            logger.info("已点击登录按钮")
-            
-            # 检查登录结果
-            try:
-                error_message = self.driver.find_element(By.XPATH, "//div[contains(@class,'el-message--error')]")
-                logger.error(f"登录失败，错误信息: {error_message.text}")
-                return False
-            except NoSuchElementException:
-                logger.success("登录成功")
-                return self.enter_course_selection()
-                
+            state = self.wait_login_state((login_flow.LOGIN_FORM,) + ENTRY_STATES)
+            for _ in range(8):
+                if state is None and deep_link:
+                    # 保存的选课地址已失效（如换了选课轮次），改回从首页逐级进入
+                    logger.warning(f"选课地址已失效，改为从首页进入: {self.selection_url}")
+                    self.selection_url = None
+                    deep_link = False
+                    self.limiter.acquire("login")
+                    self.driver.get(self.session_probe.url)
+                    state = self.wait_login_state(ENTRY_STATES)
+                    continue
+                if state is None:
+                    logger.error(f"等待页面超时，已完成: {' -> '.join(steps) or '无'}，当前URL: {self.driver.current_url}")
+                    return False
+
+                name = state["state"]
+                steps.append(name)
+                if name == login_flow.SELECTION:
+                    elapsed = time.time() - start
+                    self.entry_times.append(elapsed)
+                    self.metrics.observe("time_to_selection_seconds", elapsed)
+                    logger.success(f"成功进入选课系统，耗时 {elapsed:.2f}s（{' -> '.join(steps)}）")
+                    return True
+                if name == login_flow.ERROR:
+                    logger.error(f"登录失败，错误信息: {state.get('message')}")
+                    return False
+
+                self.limiter.acquire("login")
+                if name == login_flow.LOGIN_FORM:
+                    self.submit_login()
+                    logger.info("已提交登录信息")
+                elif name == login_flow.MAIN and self.selection_url:
+                    deep_link = True
+                    self.driver.get(self.selection_url)
+                else:
+                    if name == login_flow.ROUNDS and login_flow.is_link(state.get("href"), state.get("page")):
+                        self.selection_url = state["href"]
+                    self.follow(state)
+                state = self.wait_login_state(tuple(other for other in ENTRY_STATES if other != name))
+            logger.error(f"进入选课系统的步骤过多: {' -> '.join(steps)}")
+            return False
+
         except Exception as e:
             logger.error(f"登录过程出现错误: {str(e)}")
             return False
 
-    def enter_course_selection(self):
-        """进入选课系统的完整流程"""
+    def wait_login_state(self, accept, timeout=None):
+        """等待页面进入accept中的任一状态，返回状态信息；超时返回None"""
+        if timeout is None:
+            timeout = self.latency.timeout_for("page", TIMEOUTS["element"])
+        start = time.time()
+
+        def probe(driver):
+            result = driver.execute_script(LOGIN_STATE_JS)
+            return result if result and result.get("state") in accept else False
+
         try:
-            logger.info("正在进入选课系统...")
-            
-            # 第一次点击"进入选课"
-            enter_btn1 = self.wait_for_element(
-                By.XPATH, "//a[contains(text(),'进入选课') or contains(text(),'选课')]"
-            )
-            enter_btn1.click()
-            self.random_sleep()
-            
-            # 第二次点击"进入选课"
-            enter_btn2 = self.wait_for_element(
-                By.XPATH, "//*[@id='attend_class']/tbody/tr[2]/td[4]/a"
-            )
-            enter_btn2.click()
-            self.random_sleep()
-            
-            # 第三次点击"进入选课"（如果存在）
-            try:
-                enter_btn3 = self.wait_for_element(
-                    By.XPATH, "/html/body/form/div/div/input[2]",
-                    timeout=5
-                )
-                enter_btn3.click()
-                self.random_sleep()
-            except TimeoutException:
-                logger.info("已经在选课操作页面")
-                
-            logger.success("成功进入选课系统")
-            return True
-            
-        except Exception as e:
-            logger.error(f"进入选课系统失败: {str(e)}")
-            return False
-        
+            # 页面跳转中执行脚本可能出错，继续等待即可
+            with self.command_stats.polling():
+                result = WebDriverWait(self.driver, timeout, poll_frequency=0.1,
+                                       ignored_exceptions=(WebDriverException,)).until(probe)
+        except TimeoutException:
+            self.latency.record_timeout("page", timeout)
+            return None
+        self.latency.record("page", time.time() - start)
+        logger.debug(f"页面状态: {result['state']} ({time.time() - start:.2f}s)")
+        return result
+
+    def submit_login(self):
+        """一次脚本填写并提交登录表单，页面结构不符时退回逐个输入"""
+        if self.driver.execute_script(LOGIN_SUBMIT_JS, self.username, self.password):
+            return
+        logger.debug("登录表单结构不符，改为逐个输入")
+        username_input = self.wait_for_element(By.XPATH, "//*[@id='j_username']", key="page")
+        password_input = self.wait_for_element(By.XPATH, "//*[@id='j_password']")
+        username_input.clear()
+        username_input.send_keys(self.username)
+        password_input.clear()
+        password_input.send_keys(self.password)
+        self.wait_for_element(By.XPATH, "//*[@id='loginButton']").click()
+
+    def follow(self, state):
+        """进入下一步：普通链接直接打开，其他（按钮、javascript:链接）点击"""
+        if login_flow.is_link(state.get("href"), state.get("page")):
+            self.driver.get(state["href"])
+        else:
+            state["target"].click()
+
+    def find_selection_page(self):
+        """在已连接浏览器的各窗口中查找已登录的选课页面，找到则切换过去"""
+        try:
+            current = self.driver.current_window_handle
+            handles = [current] + [h for h in self.driver.window_handles if h != current]
+            for handle in handles:
+                if handle != self.driver.current_window_handle:
+                    self.driver.switch_to.window(handle)
+                url = self.driver.current_url
+                # 选课页面在 /jsxsd/xsxk/ 和 /jsxsd/xsxkkc/ 下；会话过期时会显示登录表单
+                if "/jsxsd/xsxk" in url and not self.driver.find_elements(By.ID, "j_username"):
+                    logger.info(f"找到选课页面: {url}")
+                    return True
+            self.driver.switch_to.window(current)
+        except WebDriverException as e:
+            logger.debug(f"检查已有页面失败: {str(e)}")
+        return False
+
     def navigate_to_tab(self, tab_type):
         """导航到指定选课选项卡"""
         try:
-            # 等待页面加载完成
-            self.driver.implicitly_wait(10)
-            self.random_sleep(2, 3)  # 增加等待时间
-            
-            # 使用更精确的URL映射
-            url_map = {
-                "plan": "/jsxsd/xsxkkc/comeInBxqjhxk",  # 本学期计划选课
-                "public": "/jsxsd/xsxkkc/comeInGgxxkxk",  # 公选课选课
-                "cross_grade": "/jsxsd/xsxkkc/comeInKnjxk",  # 专业内跨年级选课
-                "cross_major": "/jsxsd/xsxkkc/comeInFawxk"  # 跨专业选课
-            }
-            
+            url_map = TAB_URLS
             if tab_type not in url_map:
                 raise ValueError(f"不支持的选课类型: {tab_type}")
-                
+
+            if self.multi_window:
+                return self.switch_to_tab_window(tab_type)
+
             # 直接通过JavaScript点击对应链接
+            self.limiter.acquire("navigate")
             js_script = f"""
             var links = document.querySelectorAll('a[href*="{url_map[tab_type]}"]');
             if (links.length > 0) {{
@@ -371,11 +645,15 @@ class CourseSelector:
             result = self.driver.execute_script(js_script)
             if result is False:
                 # 如果JavaScript点击失败，尝试直接访问URL
-                base_url = "https://jwxt.sztu.edu.cn"
-                self.driver.get(f"{base_url}{url_map[tab_type]}")
+                self.driver.get(f"{BASE_URL}{url_map[tab_type]}")
                 
-            # 等待页面加载
-            self.random_sleep(1, 2)
+            # 等待跳转到选项卡页面
+            try:
+                with self.command_stats.polling():
+                    WebDriverWait(self.driver, self.latency.timeout_for("page", TIMEOUTS["element"]),
+                                  poll_frequency=0.1).until(lambda driver: url_map[tab_type] in driver.current_url)
+            except TimeoutException:
+                pass
             
             # 验证是否成功切换
             current_url = self.driver.current_url
@@ -389,35 +667,79 @@ class CourseSelector:
         except Exception as e:
             logger.error(f"切换选项卡失败: {str(e)}")
             # 保存错误截图
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            screenshot_path = f"tab_error_{timestamp}.png"
-            self.driver.save_screenshot(screenshot_path)
+            screenshot_path = self.save_screenshot("tab_error")
             logger.info(f"错误截图已保存: {screenshot_path}")
             raise
 
+    def switch_to_tab_window(self, tab_type):
+        """多窗口模式下切换到选课类型对应的窗口，首次使用时打开该窗口"""
+        handle = self.tab_windows.get(tab_type)
+        if handle:
+            try:
+                self.driver.switch_to.window(handle)
+            except NoSuchWindowException:
+                logger.warning(f"{tab_type}窗口已关闭，将重新打开")
+                self.tab_windows.pop(tab_type, None)
+                handle = None
+
+        if handle is None:
+            self.driver.switch_to.new_window("tab")
+            self.limiter.acquire("navigate")
+            self.driver.get(f"{BASE_URL}{TAB_URLS[tab_type]}")
+            if TAB_URLS[tab_type] not in self.driver.current_url:
+                logger.warning(f"打开{tab_type}窗口失败，实际URL: {self.driver.current_url}")
+                self.driver.close()
+                self.driver.switch_to.window(self.driver.window_handles[0])
+                return False
+            self.tab_windows[tab_type] = self.driver.current_window_handle
+            self.stale_tabs.discard(tab_type)
+            logger.success(f"已为{tab_type}打开独立窗口")
+        elif tab_type in self.stale_tabs:
+            # 只重新打开状态已过期的窗口，其余窗口保留已填写的查询条件。
+            # 不用refresh：重新登录可能在该窗口中进行，窗口已不在选课类型页面上
+            logger.debug(f"重新打开{tab_type}窗口")
+            self.limiter.acquire("refresh")
+            self.driver.get(f"{BASE_URL}{TAB_URLS[tab_type]}")
+            if TAB_URLS[tab_type] not in self.driver.current_url:
+                logger.warning(f"重新打开{tab_type}窗口失败，实际URL: {self.driver.current_url}")
+                return False
+            self.stale_tabs.discard(tab_type)
+        else:
+            logger.debug(f"切换到{tab_type}窗口")
+        return True
+
     def search_course(self, course_info):
-        """执行课程搜索（支持任意单个条件）"""
+        """执行课程搜索：优先一次脚本调用填写并提交查询表单，不成功时逐步操作"""
+        if self.batch_search:
+            try:
+                table_mark = self.table_watcher.snapshot()
+                self.limiter.acquire("query")
+                ok, result = fill_search_form(self.driver, course_info)
+                if ok:
+                    self.wait_for_results(table_mark)
+                    return True
+                logger.debug(f"一次填写查询表单未完成: {result['problems']}，改为逐步操作")
+            except WebDriverException as e:
+                logger.debug(f"一次填写查询表单失败: {str(e)}，改为逐步操作")
+        return self._search_course_stepwise(course_info)
+
+    def _search_course_stepwise(self, course_info):
+        """逐个字段等待并操作的查询方式（支持任意单个条件）"""
         try:
-            # 等待页面加载完成
-            self.random_sleep(1, 2)
-            
             # 1. 输入课程名称
-            course_input = self.wait_for_element(By.ID, "kcxx")
+            course_input = self.wait_for_element(By.ID, "kcxx", key="page")
             course_input.clear()
-            course_input.send_keys(course_info["course_name"])
+            course_input.send_keys(query_text(course_info["course_name"]))
             self.random_sleep(0.1, 0.5)
             
             # 2. 输入教师姓名
             teacher_input = self.wait_for_element(By.ID, "skls")
             teacher_input.clear()
-            teacher_input.send_keys(course_info["teacher"].replace(" ", ""))
+            teacher_input.send_keys(query_text(course_info["teacher"]))
             self.random_sleep(0.1, 0.5)
             
             # 3. 选择星期
-            weekday_map = {
-                "周一": "1", "周二": "2", "周三": "3",
-                "周四": "4", "周五": "5", "周六": "6", "周日": "7"
-            }
+            weekday_map = WEEKDAY_VALUES
             weekday_select = self.wait_for_element(By.ID, "skxq")
             weekday_select.click()
             self.random_sleep(0.1, 0.5)
@@ -444,11 +766,17 @@ class CourseSelector:
             Select(end_select).select_by_value(str(end_section))
             self.random_sleep(0.5, 1)
 
-            # 5. 选择是否过滤已满课程
+            # 5. 选择是否过滤已满课程（窗口复用时复选框可能已勾选，避免重复点击取消）
             guolv = self.driver.find_element(By.XPATH, "//label[contains(span, '过滤已满课程')]")
-            guolv.click()
+            guolv_checkbox = guolv.find_elements(By.XPATH, ".//input[@type='checkbox']")
+            if not (guolv_checkbox and guolv_checkbox[0].is_selected()):
+                guolv.click()
 
-            # 6. 尝试多种方式定位查询按钮
+            # 6. 记录查询前的表格状态，用于等待结果刷新
+            table_mark = self.table_watcher.snapshot()
+
+            # 7. 尝试多种方式定位查询按钮
+            self.limiter.acquire("query")
             search_button = None
             try_count = 0
             max_tries = 4
@@ -476,12 +804,12 @@ class CourseSelector:
                             }
                             return false;
                         """)
-                        self.random_sleep(2, 3)
+                        self.wait_for_results(table_mark)
                         return True
                         
                     if search_button and search_button.is_displayed() and search_button.is_enabled():
                         search_button.click()
-                        self.random_sleep(2, 3)
+                        self.wait_for_results(table_mark)
                         return True
                         
                 except Exception as e:
@@ -498,6 +826,21 @@ class CourseSelector:
             logger.error(f"搜索课程失败: {str(e)}")
             return False
 
+    def wait_for_results(self, mark):
+        """等待查询结果表格刷新（由页面内MutationObserver通知）"""
+        timeout = self.latency.timeout_for("results", TIMEOUTS["results"])
+        start = time.time()
+        with self.command_stats.polling():
+            state = self.table_watcher.wait_for_change(mark, timeout=timeout)
+        if not state or not state.get("present"):
+            self.latency.record_timeout("results", timeout)
+            logger.debug("未检测到结果表格刷新")
+            self.random_sleep(1, 2)
+        elif state["count"] != (mark or {}).get("count") or state.get("fresh"):
+            self.latency.record("results", time.time() - start)
+        else:
+            self.latency.record_timeout("results", timeout)
+
     def verify_course(self, course_info):
         """查找可选课程"""
         try:
@@ -505,124 +848,307 @@ class CourseSelector:
             self.wait_for_element(
                 By.XPATH, "//table[@id='dataView']"
             )
-            self.random_sleep(0.1, 0.3)
+
+            # 表格内容与上次解析时相同，直接跳过解析和匹配
+            key = course_key(course_info)
+            table_state = self.table_watcher.snapshot()
+            if self.table_watcher.unchanged(key, table_state):
+                logger.info("结果表格未变化，跳过解析")
+                # 余量与上次解析时相同，仍按本次查询的时间记录
+                self.record_seats(course_info.get("tab_type"), self.seat_rows.get(key, []), key)
+                return None
             
-            # 查找所有包含"选课"按钮的行
-            rows = self.driver.find_elements(By.XPATH, "//table[@id='dataView']/tbody/tr[.//a[contains(text(), '选课')]]")
+            # 一次读取整张表格，只在带"选课"按钮的行中匹配
+            all_rows = read_table(self.driver)
+            self.seat_rows[key] = all_rows
+            self.record_seats(course_info.get("tab_type"), all_rows, key)
+            rows = [row for row in all_rows if row["selectable"]]
             logger.info(f"找到 {len(rows)} 个可选课程")
-            
-            for row in rows:
-                try:
-                    # 获取课程基本信息用于日志记录
-                    course_id = row.find_element(By.XPATH, ".//td[1]").text
-                    course_name = row.find_element(By.XPATH, ".//td[3]").text
-                    teacher = row.find_element(By.XPATH, ".//td[contains(@class, 'center')]/preceding-sibling::td[1]").text
-                    
-                    # 直接查找选课按钮
-                    select_button = row.find_element(By.XPATH, ".//a[contains(text(), '选课')]")
-                    
-                    if select_button and select_button.is_displayed() and select_button.is_enabled():
-                        logger.success(f"找到可选课程: {course_name} - {teacher}")
-                        return select_button
-                        
-                except Exception as e:
-                    logger.debug(f"处理课程行时出错: {str(e)}")
-                    continue
-                    
-            logger.warning("未找到任何可选课程")
+
+            # 课程名称、教师和上课时间必须同时可信才点击
+            index = MatchIndex(rows)
+            match = index.best(course_info)
+            if match is None:
+                for candidate in index.rank(course_info, limit=3):
+                    logger.debug(
+                        f"候选课程: {candidate.row['course_name']} - {candidate.row['teacher']} "
+                        f"{candidate.row['time_text']} (名称{candidate.name_score:.2f} "
+                        f"教师{candidate.teacher_score:.2f} 时间{candidate.time_score})"
+                    )
+                logger.warning("未找到与配置匹配的可选课程")
+                self.table_watcher.remember(key, table_state)
+                return None
+
+            row = match.row
+            buttons = self.driver.find_elements(
+                By.XPATH, f"(//table[@id='dataView']/tbody/tr)[{row['index'] + 1}]//a[contains(text(), '选课')]"
+            )
+            for select_button in buttons:
+                if select_button.is_displayed() and select_button.is_enabled():
+                    logger.success(f"找到可选课程: {row['course_name']} - {row['teacher']} (匹配度{match.score:.2f})")
+                    self.table_watcher.forget(key)
+                    if self.section_cache is not None:
+                        self.section_cache.remember(key, course_info.get("tab_type"), row)
+                    return select_button
+
+            logger.warning(f"匹配课程的选课按钮不可用: {row['course_name']}")
             return None
             
         except Exception as e:
             logger.error(f"查找可选课程失败: {str(e)}")
             return None
 
+    def record_seats(self, tab_type, rows, query=None):
+        """把结果表格中的余量追加到余量历史，写入失败不影响选课
+
+        query为选课循环中（过滤已满课程的）查询所对应的课程标识
+        """
+        if not self.seat_history:
+            return
+        try:
+            self.seat_history.record(tab_type, rows, query=query)
+        except Exception as e:
+            logger.debug(f"记录余量历史失败: {str(e)}")
+
+    def wait_for_alert(self, timeout=None):
+        """在限定时间内等待弹窗出现，超时返回None"""
+        if timeout is None:
+            timeout = self.latency.timeout_for("alert", TIMEOUTS["alert"])
+        try:
+            start = time.time()
+            with self.command_stats.polling():
+                alert = WebDriverWait(self.driver, timeout, poll_frequency=0.05).until(EC.alert_is_present())
+            self.latency.record("alert", time.time() - start)
+            return alert
+        except TimeoutException:
+            self.latency.record_timeout("alert", timeout)
+            return None
+
+    def fast_reselect(self, course):
+        """直接执行已知教学班的选课操作，返回结果类别；没有缓存或操作已失效时返回None"""
+        key = course_key(course)
+        entry = self.section_cache.get(key, course["tab_type"]) if self.section_cache is not None else None
+        if entry is None:
+            return None
+        logger.info(f"直接提交已知教学班: {course['course_name']} ({entry['section_id']})")
+        with self.phase("confirm"):
+            try:
+                self.limiter.acquire("select")
+                self.driver.execute_script(SectionCache.script(entry["action"]))
+            except WebDriverException as e:
+                logger.debug(f"执行缓存的选课操作失败: {str(e)}")
+                outcome = None
+            else:
+                outcome = self.handle_confirmation()
+        if outcome is None or outcome == UNKNOWN:
+            # 没有弹出确认框或结果无法识别：教学班标识或页面已变化，改回完整查询
+            logger.info("缓存的选课操作已失效，改为完整查询")
+            self.section_cache.forget(key)
+            return None
+        if outcome == FULL and self.section_cache.note_full(key):
+            logger.info(f"已知教学班连续{self.section_cache.max_full}次人数已满，之后改为完整查询")
+        return outcome
+
     def handle_confirmation(self):
-        """处理选课确认弹窗和结果验证"""
+        """处理选课确认弹窗和结果弹窗，返回结果类别（见outcomes.py）"""
         try:
             # 等待并处理第一个确认弹窗（是否选课）
-            try:
-                alert = self.driver.switch_to.alert
-                alert_text = alert.text
-                logger.debug(f"选课确认弹窗: {alert_text}")
-                alert.accept()  # 点击确定
-                self.random_sleep(0.1, 0.2)
-            except:
+            alert = self.wait_for_alert()
+            if alert is None:
                 logger.warning("未检测到选课确认弹窗")
-                return False
+                return UNKNOWN
+            logger.debug(f"选课确认弹窗: {alert.text}")
+            alert.accept()  # 点击确定
 
             # 等待并处理结果弹窗
-            try:
-                result_alert = self.driver.switch_to.alert
-                result_text = result_alert.text
-                logger.debug(f"选课结果弹窗: {result_text}")
-                result_alert.accept()  # 点击确定
-                
-                # 判断选课结果
-                if "成功" in result_text:
-                    logger.success(f"选课成功: {result_text}")
-                    return True
-                else:
-                    logger.warning(f"选课失败: {result_text}")
-                    return False
-            except:
+            result_alert = self.wait_for_alert()
+            if result_alert is None:
                 logger.warning("未检测到选课结果弹窗")
-                return False
+                return UNKNOWN
+            result_text = result_alert.text
+            logger.debug(f"选课结果弹窗: {result_text}")
+            result_alert.accept()  # 点击确定
+
+            # 判断选课结果
+            outcome = classify_result(result_text)
+            if outcome == SUCCESS:
+                logger.success(f"选课成功: {result_text}")
+            else:
+                logger.warning(f"选课失败[{outcome}]: {result_text}")
+            return outcome
 
         except Exception as e:
             logger.error(f"处理选课确认弹窗时出错: {str(e)}")
+            return UNKNOWN
+
+    def apply_outcome(self, course, outcome):
+        """按结果类别的重试策略更新课程状态"""
+        key = course_key(course)
+        policy = retry_policy(outcome)
+        self.metrics.inc("course_outcomes_total", course=key, outcome=outcome)
+        if self.archive:
+            self.archive.note_outcome(key, outcome)
+        if policy == DONE:
+            logger.success(f"成功选中课程：{course['course_name']}" + ("" if outcome == SUCCESS else f"[{outcome}]"))
+            self.selected_courses.add(key)
+            self.metrics.set("courses_selected", len(self.selected_courses))
+        elif policy == STOP:
+            logger.warning(f"{course['course_name']} 永久失败[{outcome}]，不再重试")
+            self.failed_courses[key] = outcome
+        elif policy == RELOGIN:
+            self.relogin()
+
+    def relogin(self, expired=True, confirmed=False):
+        """会话失效（或即将过期）时重新登录，已打开的选课窗口全部标记为过期
+
+        confirmed表示失效由登录状态检查确认（而不是根据选课结果的文字判断）
+        """
+        if expired:
+            logger.warning("登录状态已失效，正在重新登录...")
+            self.session_probe.expired_seen(confirmed=confirmed)
+        else:
+            logger.info("登录状态即将过期，提前重新登录...")
+            # 清除旧会话，否则访问教务系统不会回到登录页面
+            self.driver.delete_all_cookies()
+        self.metrics.inc("relogins_total", reason="expired" if expired else "expiring")
+        self.stale_tabs.update(self.tab_windows)
+        if not self.login():
+            logger.error("重新登录失败")
             return False
+        return True
 
-    def select_multiple_courses(self):
-        """选择多个课程"""
+    def ensure_session(self):
+        """课程之间检查登录状态，失效或即将过期时重新登录一次，返回会话是否可用"""
         try:
-            config_path = "courses.json"
-            if not os.path.exists(config_path):
-                logger.error(f"未找到课程配置文件: {config_path}")
-                return False
-            
-            with open(config_path, 'r', encoding='utf-8') as f:
-                courses = json.load(f)
+            state = self.session_probe.check(self.driver)
+        except WebDriverException as e:
+            logger.debug(f"检查登录状态失败: {str(e)}")
+            return True
+        if state not in (EXPIRED, EXPIRING):
+            return True
+        if self.relogin(expired=state == EXPIRED, confirmed=state == EXPIRED):
+            return True
+        # 重新登录失败，下一门课程之前再检查一次
+        self.session_probe.last_check = 0
+        return False
+
+    def select_multiple_courses(self, config_path="courses.json", max_retries=100, courses=None):
+        """选择多个课程（courses为已加载的课程列表时不再读取config_path）"""
+        try:
+            if courses is None:
+                if not os.path.exists(config_path):
+                    logger.error(f"未找到课程配置文件: {config_path}")
+                    return False
+                
+                with open(config_path, 'r', encoding='utf-8') as f:
+                    courses = json.load(f)
+            self.courses = courses
+            if self.archive:
+                self.archive.note_courses(course_key(c) for c in courses)
             
             if not courses:
                 logger.warning("课程配置为空")
                 return False
+
+            # 按优先级/截止时间/历史空位安排每轮的检查顺序（请求速率由限流器控制）
+            self.scheduler = CourseScheduler(courses, course_key)
+            for key in self.scheduler.invalid:
+                self.failed_courses[key] = "invalid"
             
             retry_count = 0
-            max_retries = 100
             
             while retry_count < max_retries:
                 retry_count += 1
                 logger.info(f"第 {retry_count} 轮选课开始...")
-                
-                for course in courses:
-                    try:
-                        # 跳过已选中的课程
-                        if course["course_id"] in self.selected_courses:
-                            continue
-                            
-                        # 切换到对应选课类型的页面
-                        if not self.navigate_to_tab(course["tab_type"]):
-                            continue
+                round_commands = self.command_stats.total
+
+                for key in self.scheduler.expired():
+                    if key not in self.selected_courses and key not in self.failed_courses:
+                        logger.warning(f"{key} 已过截止时间，不再检查")
+                        self.failed_courses[key] = "deadline"
+
+                done = self.selected_courses | set(self.failed_courses)
+                for course in self.scheduler.plan_round(skip=done):
+                    with self.course_context(course_key(course)):
+                        # 页面状态是否被改变（点击选课或出错后需要刷新）
+                        page_dirty = False
+                        checked = False
+                        opened = False
+                        try:
+                            # 跳过已选中或永久失败的课程（同一轮中可能被安排多次）
+                            key = course_key(course)
+                            if key in self.selected_courses or key in self.failed_courses:
+                                continue
+
+                            if not self.ensure_session():
+                                continue
+
+                            checked = True
+                            self.metrics.inc("course_attempts_total", course=key)
+                            self.command_stats.course_checked()
+
+                            # 切换到对应选课类型的页面
+                            with self.phase("navigate"):
+                                if not self.navigate_to_tab(course["tab_type"]):
+                                    continue
+
+                            # 已知教学班：直接提交选课，省去查询和匹配
+                            outcome = self.fast_reselect(course)
+                            if outcome is not None:
+                                page_dirty = True
+                                opened = retry_policy(outcome) == DONE
+                                self.last_poll_at = time.time()
+                                self.apply_outcome(course, outcome)
+                                continue
                             
-                        # 搜索并选择课程
-                        if self.search_course(course):
-                            if select_btn := self.verify_course(course):
-                                select_btn.click()
-                                if self.handle_confirmation():
-                                    logger.success(f"成功选中课程：{course['course_name']}")
-                                    self.selected_courses.add(course["course_id"])
+                            # 搜索并选择课程
+                            with self.phase("search"):
+                                searched = self.search_course(course)
+                            if searched:
+                                with self.phase("verify"):
+                                    select_btn = self.verify_course(course)
+                                self.last_poll_at = time.time()
+                                if not select_btn:
+                                    self.metrics.inc("course_outcomes_total", course=key, outcome="not_found")
+                                    if self.archive:
+                                        self.archive.note_outcome(key, "not_found")
+                                else:
+                                    page_dirty = True
+                                    opened = True
+                                    with self.phase("confirm"):
+                                        self.limiter.acquire("select")
+                                        select_btn.click()
+                                        outcome = self.handle_confirmation()
+                                    self.apply_outcome(course, outcome)
                                     
-                    except Exception as e:
-                        logger.error(f"{course['course_name']} 选课失败：{str(e)}")
+                        except Exception as e:
+                            page_dirty = True
+                            logger.error(f"{course['course_name']} 选课失败：{str(e)}")
                         
-                    finally:
-                        self.random_sleep(2, 3)
-                        self.driver.refresh()
-                        self.random_sleep(1, 2)
+                        finally:
+                            if checked:
+                                self.scheduler.record(course, opened)
+                            if self.multi_window:
+                                # 多窗口模式下只标记过期窗口，下次切换到该窗口时再刷新
+                                if page_dirty:
+                                    self.stale_tabs.add(course["tab_type"])
+                            else:
+                                with self.phase("refresh"):
+                                    self.limiter.acquire("refresh")
+                                    self.driver.refresh()
                 
-                # 检查是否所有课程都已选中
-                if all(course["course_id"] in self.selected_courses for course in courses):
-                    logger.success("所有课程已选择完成！")
+                self.metrics.inc("rounds_completed_total")
+                self.metrics.set("webdriver_commands_last_round", self.command_stats.total - round_commands)
+                self.sample_browser_memory()
+
+                # 检查是否所有课程都已处理完（选中或永久失败）
+                pending = [c for c in courses
+                           if course_key(c) not in self.selected_courses and course_key(c) not in self.failed_courses]
+                if not pending:
+                    if self.failed_courses:
+                        logger.warning(f"以下课程无法选择: {self.failed_courses}")
+                    else:
+                        logger.success("所有课程已选择完成！")
                     break
                     
                 # 达到最大重试次数
@@ -630,8 +1156,7 @@ class CourseSelector:
                     logger.warning("已达到最大重试次数，程序将退出")
                     break
                     
-                logger.info(f"第 {retry_count} 轮选课完成，等待下一轮...")
-                self.random_sleep(3, 5)
+                logger.info(f"第 {retry_count} 轮选课完成，开始下一轮...")
                 
         except Exception as e:
             logger.error(f"选课过程出错: {str(e)}")
@@ -639,12 +1164,121 @@ class CourseSelector:
             
         return True
 
+    def selection_summary(self):
+        """本次选课的结果：已选中、无法选择（及原因）、仍未选中的课程标识"""
+        keys = [course_key(c) for c in getattr(self, "courses", [])]
+        return {
+            "selected": [k for k in keys if k in self.selected_courses],
+            "failed": {k: self.failed_courses[k] for k in keys if k in self.failed_courses},
+            "pending": [k for k in keys if k not in self.selected_courses and k not in self.failed_courses],
+        }
+
+    def query_all_courses(self):
+        """清空查询条件后查询当前选项卡的全部课程，返回解析后的课程列表"""
+        table_mark = self.table_watcher.snapshot()
+        self.limiter.acquire("query")
+        clicked = self.driver.execute_script("""
+            ['kcxx', 'skls'].forEach(function (id) {
+                var el = document.getElementById(id);
+                if (el) { el.value = ''; }
+            });
+            ['skxq', 'skjc', 'endJc'].forEach(function (id) {
+                var el = document.getElementById(id);
+                if (el) { el.selectedIndex = 0; el.dispatchEvent(new Event('change', {bubbles: true})); }
+            });
+            var labels = document.getElementsByTagName('label');
+            for (var i = 0; i < labels.length; i++) {
+                var box = labels[i].querySelector('input[type="checkbox"]');
+                if (box && labels[i].innerText.indexOf('过滤已满课程') >= 0 && box.checked) { box.click(); }
+            }
+            var buttons = document.querySelectorAll('input[type="button"]');
+            for (var j = 0; j < buttons.length; j++) {
+                if (buttons[j].value === '查询') { buttons[j].click(); return true; }
+            }
+            return false;
+        """)
+        if not clicked:
+            logger.warning("未找到查询按钮")
+            return []
+        self.wait_for_results(table_mark)
+
+        # 分页表格一次显示全部记录
+        table_mark = self.table_watcher.snapshot()
+        expanded = self.driver.execute_script("""
+            var select = document.querySelector("select[name='dataView_length']");
+            if (!select || !select.options.length) { return false; }
+            select.selectedIndex = select.options.length - 1;
+            select.dispatchEvent(new Event('change', {bubbles: true}));
+            return true;
+        """)
+        if expanded:
+            self.wait_for_results(table_mark)
+        return read_table(self.driver)
+
+    def sync_catalog(self, tab_types=None, path=CATALOG_DB):
+        """把各选课类型的完整课程列表同步到本地课程库"""
+        catalog = CourseCatalog(path)
+        try:
+            for tab_type in tab_types or TAB_URLS:
+                logger.info(f"正在同步{tab_type}课程列表...")
+                with self.phase("navigate"):
+                    if not self.navigate_to_tab(tab_type):
+                        logger.warning(f"无法进入{tab_type}选项卡，跳过")
+                        continue
+                with self.phase("search"):
+                    rows = self.query_all_courses()
+                catalog.save_sync(tab_type, rows)
+                self.record_seats(tab_type, rows)
+                logger.success(f"{tab_type} 同步完成，共 {len(rows)} 条课程记录")
+                changes = catalog.diff(tab_type)
+                if changes:
+                    logger.info(f"{tab_type} 与上次同步相比: 新增{len(changes['added'])} "
+                                f"删除{len(changes['removed'])} 变更{len(changes['changed'])}")
+            return True
+        except Exception as e:
+            logger.error(f"同步课程库失败: {str(e)}")
+            return False
+        finally:
+            catalog.close()
+
     def close(self):
         """Close the browser and clean up"""
+        try:
+            self.latency.save()
+        except Exception as e:
+            logger.debug(f"保存等待耗时样本失败: {str(e)}")
+        if self.metrics_server:
+            self.metrics_server.shutdown()
+        if getattr(self, "seat_history", None):
+            self.seat_history.close()
         if hasattr(self, 'driver'):
-            self.driver.quit()
+            if self.attach_address:
+                # 只结束chromedriver，保留浏览器和登录状态供下次连接
+                self.driver.service.stop()
+            else:
+                self.driver.quit()
+        if self.archive:
+            self.archive.close(summary=self.selection_summary())
             
+def parse_args():
+    """命令行参数"""
+    parser = argparse.ArgumentParser(description="深圳技术大学自动选课程序")
+    parser.add_argument("--sync-catalog", nargs="*", metavar="TAB", choices=list(TAB_URLS),
+                        help="同步本地课程库后退出（不指定选课类型则同步全部）")
+    parser.add_argument("--attach", nargs="?", const="127.0.0.1:9222", metavar="HOST:PORT",
+                        help="连接已运行的Chrome（远程调试地址，默认127.0.0.1:9222），也可在.env中设置CHROME_DEBUGGER_ADDRESS")
+    parser.add_argument("--launch-chrome", nargs="?", type=int, const=9222, metavar="PORT",
+                        help="启动带远程调试端口和固定用户目录的Chrome后退出，之后用 --attach 连接")
+    parser.add_argument("--profile", action="store_true",
+                        help="采样分析本次运行的耗时，结果写入 runs/<运行编号>/")
+    return parser.parse_args()
+
 def main():
+    args = parse_args()
+    with profiled(args.profile, run_dir, log=logger.info):
+        run_main(args)
+
+def run_main(args):
     selector = None
     try:
         logger.info("="*50)
@@ -656,15 +1290,25 @@ def main():
         logger.info(f"操作系统: {sys.platform}")
         logger.info(f"当前时间: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
         
-        # 检查网络环境
-        logger.info("正在检查网络环境...")
-        if not check_basic_network() or not check_vpn_network():
-            logger.error("网络环境检查失败，程序终止")
+        if args.launch_chrome:
+            address = launch_debug_chrome(args.launch_chrome)
+            logger.success(f"Chrome已启动，调试地址: {address}，请在其中登录后使用 --attach 运行")
             return
+
+        attach = args.attach or os.getenv("CHROME_DEBUGGER_ADDRESS")
+        # 检查网络环境（连接已运行的浏览器时跳过）
+        if not attach:
+            logger.info("正在检查网络环境...")
+            if not check_basic_network() or not check_vpn_network():
+                logger.error("网络环境检查失败，程序终止")
+                return
             
-        selector = CourseSelector()
+        selector = CourseSelector(attach=attach)
         if selector.login():
-            selector.select_multiple_courses()
+            if args.sync_catalog is not None:
+                selector.sync_catalog(args.sync_catalog or None)
+            else:
+                selector.select_multiple_courses()
         else:
             logger.error("登录失败，程序终止")
             
@@ -674,6 +1318,7 @@ def main():
         logger.error(f"详细错误信息:\n{traceback.format_exc()}")
     finally:
         if selector:
+            selector.log_run_summary()
             selector.close()
         logger.info("="*50)
         logger.info("程序结束")
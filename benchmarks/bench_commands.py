@@ -0,0 +1,87 @@
+# -*- coding: utf-8 -*-
+"""选课循环的WebDriver命令数检查
+
+在本地模拟教务系统（fault_server.py 的 baseline 配置）上运行完整的选课流程，
+统计平均每检查一门课程在各阶段发出的WebDriver命令数，与 command_budget.json
+中的预算比较。某个阶段的命令数超过预算时返回1，用于防止选课循环的请求越改越多。
+
+预算只包括确定的命令：轮询等待（等待元素、页面跳转、弹窗、结果表格刷新）发出的命令数
+取决于响应快慢，单独列出但不参与比较（见command_stats.py）。
+
+用法:
+    python benchmarks/bench_commands.py                  # 运行并与预算比较
+    python benchmarks/bench_commands.py --update-budget  # 用本次结果更新预算
+"""
+import argparse
+import json
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fault_runner import DEFAULT_COURSE, run_profile  # noqa: E402
+
+BUDGET_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "command_budget.json")
+
+
+def report(stats):
+    print(f"检查课程 {stats['checks']} 次")
+    polled = stats.get("per_check_polled", {})
+    print(f"{'阶段':<12}{'每门课程命令数':>16}{'轮询等待(不计入)':>20}")
+    for phase, count in stats["per_check"].items():
+        print(f"{phase:<14}{count:>16.2f}{polled.get(phase, 0):>22.2f}")
+    print(f"\n{'阶段/命令':<40}{'次数':>8}{'平均耗时(ms)':>16}")
+    for item in sorted(stats["commands"], key=lambda item: -item["count"]):
+        print(f"{item['phase'] + '/' + item['command']:<42}{item['count']:>8}"
+              f"{item['seconds'] / item['count'] * 1000:>16.2f}")
+
+
+def check(per_check, budget):
+    """返回超出预算的 (阶段, 实际, 预算)"""
+    return [(phase, per_check.get(phase, 0), limit) for phase, limit in sorted(budget.items())
+            if per_check.get(phase, 0) > limit]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="选课循环WebDriver命令数检查")
+    parser.add_argument("--max-rounds", type=int, default=5)
+    parser.add_argument("--update-budget", action="store_true", help="用本次结果更新预算")
+    parser.add_argument("--json", help="把统计结果写入JSON文件")
+    args = parser.parse_args()
+
+    os.environ.setdefault("STUDENT_ID", "fault-test")
+    os.environ.setdefault("PASSWORD", "fault-test")
+
+    result = run_profile("baseline", [DEFAULT_COURSE], args.max_rounds)
+    stats = result.get("commands")
+    if not stats or not stats["checks"]:
+        print(f"选课流程没有运行: {result.get('error', '未检查任何课程')}")
+        return 1
+    report(stats)
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(stats, f, ensure_ascii=False, indent=2)
+
+    if args.update_budget:
+        with open(BUDGET_PATH, "w", encoding="utf-8") as f:
+            json.dump(stats["per_check"], f, indent=2, sort_keys=True)
+        print(f"预算已更新: {BUDGET_PATH}")
+        return 0
+
+    if not os.path.exists(BUDGET_PATH):
+        print(f"未找到预算文件 {BUDGET_PATH}，请先运行 --update-budget")
+        return 1
+    with open(BUDGET_PATH, "r", encoding="utf-8") as f:
+        budget = json.load(f)
+    over = check(stats["per_check"], budget)
+    for phase, count, limit in over:
+        print(f"[超出预算] {phase}: 每门课程 {count:.2f} 个命令，预算 {limit:.2f}")
+    if over:
+        return 1
+    print("命令数检查通过")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
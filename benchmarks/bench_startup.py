@@ -0,0 +1,115 @@
+# -*- coding: utf-8 -*-
+"""启动耗时测试：从启动进程到显示第一个输入提示（"请输入学号"）的时间
+
+分别测试源码运行、onefile打包和onedir启动优化打包（python build.py --fast）三种方式，
+已构建的才会测试。每种方式连续启动多次：第一次为"首次启动"（刚构建完或重启后，
+onefile每次都要解压，差别最明显），其余取中位数作为"再次启动"。
+首次启动超过预算时返回1，build.py --fast 用它检查构建结果。
+
+用法:
+    python benchmarks/bench_startup.py                          # 测试所有已构建的方式
+    python benchmarks/bench_startup.py --variant onedir --budget 1.5
+"""
+import argparse
+import os
+import queue
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+EXE = ".exe" if sys.platform == "win32" else ""
+
+VARIANTS = {
+    "source": [sys.executable, os.path.join(ROOT, "run.py")],
+    "onefile": [os.path.join(ROOT, "dist", "SZTU_Course_Helper_Console" + EXE)],
+    "onedir": [os.path.join(ROOT, "dist", "SZTU_Course_Helper_Fast", "SZTU_Course_Helper_Fast" + EXE)],
+}
+
+# 第一个输入提示；打包后的程序可能不理会PYTHONIOENCODING，两种编码都认
+PROMPT = "请输入学号"
+MARKERS = (PROMPT.encode("utf-8"), PROMPT.encode("gbk"))
+
+STARTUP_BUDGET = 2.0
+
+
+def time_to_prompt(command, timeout=60):
+    """启动一次，返回出现输入提示的秒数；超时或提前退出时返回None"""
+    env = dict(os.environ, PYTHONIOENCODING="utf-8")
+    env.pop("NON_INTERACTIVE", None)
+    # 在空目录中运行，避免读到当前目录的.env和课程配置
+    with tempfile.TemporaryDirectory() as cwd:
+        start = time.perf_counter()
+        process = subprocess.Popen(command, cwd=cwd, env=env, stdin=subprocess.PIPE,
+                                   stdout=subprocess.PIPE, stderr=subprocess.DEVNULL)
+        # os.read会阻塞，放到后台线程中读取，主线程按截止时间等待输出
+        chunks = queue.Queue()
+        fd = process.stdout.fileno()
+
+        def pump():
+            for chunk in iter(lambda: os.read(fd, 4096), b""):
+                chunks.put(chunk)
+            chunks.put(b"")
+
+        threading.Thread(target=pump, daemon=True).start()
+        output = b""
+        try:
+            while True:
+                remaining = timeout - (time.perf_counter() - start)
+                if remaining <= 0:
+                    return None
+                try:
+                    chunk = chunks.get(timeout=remaining)
+                except queue.Empty:
+                    return None
+                if not chunk:
+                    return None
+                output += chunk
+                if any(marker in output for marker in MARKERS):
+                    return time.perf_counter() - start
+        finally:
+            process.kill()
+            process.wait()
+
+
+def measure(command, runs):
+    times = [time_to_prompt(command) for _ in range(runs)]
+    if None in times:
+        return None
+    return {"cold": times[0], "warm": statistics.median(times[1:]) if runs > 1 else times[0], "runs": times}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="启动耗时测试")
+    parser.add_argument("--variant", action="append", choices=list(VARIANTS),
+                        help="只测试指定方式（可重复，默认测试所有已构建的方式）")
+    parser.add_argument("--runs", type=int, default=5, help="每种方式启动次数")
+    parser.add_argument("--budget", type=float, default=STARTUP_BUDGET, help="首次启动的预算（秒）")
+    args = parser.parse_args()
+
+    names = args.variant or list(VARIANTS)
+    failed = False
+    print(f"{'方式':<10}{'首次启动(s)':>14}{'再次启动(s)':>14}")
+    for name in names:
+        command = VARIANTS[name]
+        if not os.path.exists(command[-1]):
+            print(f"{name:<12}{'未构建':>14}")
+            failed = failed or bool(args.variant)
+            continue
+        result = measure(command, args.runs)
+        if result is None:
+            print(f"{name:<12}{'未出现输入提示':>14}")
+            failed = True
+            continue
+        over = result["cold"] > args.budget
+        failed = failed or over
+        print(f"{name:<12}{result['cold']:>14.2f}{result['warm']:>14.2f}" + ("  [超出预算]" if over else ""))
+    print(f"\n预算: 首次启动 {args.budget:.2f}s")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
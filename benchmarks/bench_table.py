@@ -0,0 +1,239 @@
+# -*- coding: utf-8 -*-
+"""结果表格解析与匹配的微基准测试
+
+生成包含100/1k/10k行的dataView页面，比较以下几种方式的耗时和峰值内存：
+    webdriver_elements  原来逐行逐列调用WebDriver的方式（需要Chrome）
+    single_script       一次execute_script提取整张表（需要Chrome，当前选课流程使用）
+    page_source         解析page_source（lxml可用时使用lxml，否则用标准库）
+    match               对解析结果建立匹配索引并查找目标课程
+
+用法:
+    python benchmarks/bench_table.py                  # 只跑不需要浏览器的项目
+    python benchmarks/bench_table.py --browser        # 同时跑需要Chrome的项目
+    python benchmarks/bench_table.py --check          # 与基线比较，变慢超过阈值时返回1
+    python benchmarks/bench_table.py --update-baseline
+
+不同机器、不同负载下的绝对耗时差别很大，--check 比较的是各项目耗时与同一次运行中
+参考操作（reference，固定的纯Python计算）耗时的比值，而不是绝对耗时。
+"""
+import argparse
+import json
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from table_parser import parse_html, read_table, lxml  # noqa: E402
+from matcher import MatchIndex  # noqa: E402
+
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline.json")
+
+# 选课流程实际使用的路径，--check 只对这些项目做回归判断
+CHOSEN_PATHS = ("single_script", "page_source", "match")
+# 其中需要Chrome的项目
+BROWSER_PATHS = ("single_script",)
+
+# 耗时很短的项目波动大，差值小于该值(秒)时不算回归
+MIN_DELTA = 0.005
+
+# 参考操作的重复次数（取中位数）
+REFERENCE_REPEAT = 9
+
+# 逐元素方式太慢，默认只测到这个行数
+ELEMENT_MAX_ROWS = 1000
+
+HEADERS = ["课程编号", "课程名称", "学分", "上课老师", "上课时间", "上课地点", "剩余量", "操作"]
+NAMES = ["高等数学A2", "大学物理B2", "大学物理实验B2", "操作系统", "面向对象程序设计",
+         "大学生心理健康", "线性代数", "概率论与数理统计", "数据结构", "大学英语Ⅱ"]
+TEACHERS = ["李瑞", "蒋长勇", "吴海娜", "姚双雁", "李金鑫", "沈小乐", "王芳", "张伟"]
+WEEKDAYS = ["一", "二", "三", "四", "五"]
+SECTIONS = [(1, 2), (3, 5), (6, 7), (8, 9), (11, 12), (13, 14)]
+
+TARGET = {"course_id": "", "course_name": "大学物理B2", "teacher": "吴海娜",
+          "time": "周三", "start_section": "3", "end_section": "5"}
+
+
+def generate_html(rows, seed=0):
+    """生成与教务系统结构相同的结果表格页面"""
+    rng = random.Random(seed)
+    body = []
+    for i in range(rows):
+        start, end = rng.choice(SECTIONS)
+        remaining = rng.choice([0, 0, 0, 1, 3, 12])
+        action = (f'<a href="javascript:void(0);" onclick="xsxkOper(\'2024{i:08d}\')">选课</a>'
+                  if remaining else "")
+        body.append(
+            f"<tr><td>CP{i % 900:05d}</td><td>{rng.choice(NAMES)}</td><td>3</td>"
+            f"<td>{rng.choice(TEACHERS)}</td>"
+            f"<td>1-16周 星期{rng.choice(WEEKDAYS)} [{start:02d}-{end:02d}节]</td>"
+            f"<td>C{rng.randint(1, 5)}-{rng.randint(101, 520)}</td><td>{remaining}</td>"
+            f"<td class=\"center\">{action}</td></tr>"
+        )
+    head = "".join(f"<th>{h}</th>" for h in HEADERS)
+    return ("<!DOCTYPE html><html><head><meta charset=\"utf-8\"><title>选课</title></head><body>"
+            f"<table id=\"dataView\"><thead><tr>{head}</tr></thead><tbody>{''.join(body)}</tbody></table>"
+            "</body></html>")
+
+
+def measure(func, repeat):
+    """返回 (耗时中位数秒, Python侧峰值内存字节)；内存单独测一次，避免tracemalloc影响计时"""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    tracemalloc.start()
+    func()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return statistics.median(timings), peak
+
+
+def reference():
+    """参考操作：固定的字符串处理、排序和字典操作，用来折算机器和负载的速度差异"""
+    rng = random.Random(1)
+    rows = [f"CP{rng.randint(0, 99999):05d}|{rng.choice(NAMES)}|{rng.choice(TEACHERS)}" for _ in range(20000)]
+    index = {}
+    for row in sorted(rows):
+        index.setdefault(row.split("|")[1], []).append(row)
+    return len(json.dumps(index, ensure_ascii=False))
+
+
+def webdriver_elements(driver):
+    """原verify_course的方式：每行每列一次WebDriver请求"""
+    from selenium.webdriver.common.by import By
+    found = []
+    rows = driver.find_elements(By.XPATH, "//table[@id='dataView']/tbody/tr[.//a[contains(text(), '选课')]]")
+    for row in rows:
+        course_id = row.find_element(By.XPATH, ".//td[1]").text
+        course_name = row.find_element(By.XPATH, ".//td[2]").text
+        teacher = row.find_element(By.XPATH, ".//td[contains(@class, 'center')]/preceding-sibling::td[1]").text
+        button = row.find_element(By.XPATH, ".//a[contains(text(), '选课')]")
+        if button.is_displayed() and button.is_enabled():
+            found.append((course_id, course_name, teacher))
+    return found
+
+
+def make_driver():
+    from selenium import webdriver
+    from selenium.webdriver.chrome.options import Options
+    from selenium.webdriver.chrome.service import Service
+    from browser_discovery import discover
+    info = discover()
+    options = Options()
+    options.binary_location = info["chrome"]
+    options.add_argument("--headless=new")
+    options.add_argument("--no-sandbox")
+    options.add_argument("--disable-dev-shm-usage")
+    return webdriver.Chrome(service=Service(executable_path=info["driver"]), options=options)
+
+
+def run(sizes, repeat, browser):
+    results = {"reference": measure(reference, max(repeat, REFERENCE_REPEAT))}
+    driver = make_driver() if browser else None
+    try:
+        for size in sizes:
+            html = generate_html(size)
+            rows = parse_html(html)
+            results[f"page_source@{size}"] = measure(lambda: parse_html(html), repeat)
+            results[f"match@{size}"] = measure(lambda: MatchIndex(rows).best(TARGET), repeat)
+            if driver:
+                with tempfile.NamedTemporaryFile("w", suffix=".html", delete=False, encoding="utf-8") as f:
+                    f.write(html)
+                try:
+                    driver.get("file://" + f.name)
+                    results[f"single_script@{size}"] = measure(lambda: read_table(driver), repeat)
+                    results[f"page_source_browser@{size}"] = measure(
+                        lambda: parse_html(driver.page_source), repeat)
+                    if size <= ELEMENT_MAX_ROWS:
+                        results[f"webdriver_elements@{size}"] = measure(lambda: webdriver_elements(driver), 1)
+                finally:
+                    os.unlink(f.name)
+    finally:
+        if driver:
+            driver.quit()
+    return results
+
+
+def report(results):
+    print(f"HTML解析器: {'lxml' if lxml is not None else 'html.parser'}")
+    print(f"{'项目':<32}{'耗时(ms)':>12}{'峰值内存(KB)':>16}")
+    for key, (seconds, peak) in results.items():
+        print(f"{key:<34}{seconds * 1000:>12.2f}{peak / 1024:>16.1f}")
+
+
+def missing_baseline(results, baseline):
+    """本次测到、但基线中没有的回归检查项目（基线需要用 --update-baseline 补上）"""
+    return [key for key in results if key.split("@")[0] in CHOSEN_PATHS and key not in baseline]
+
+
+def check(results, baseline, margin, min_delta=MIN_DELTA):
+    """与基线比较，返回变慢超过阈值的项目 (项目, 本次耗时, 折算到本机的基线耗时)
+
+    基线耗时按两次参考操作耗时的比值折算，基线中没有参考操作时按绝对耗时比较。"""
+    scale = 1.0
+    if baseline.get("reference") and "reference" in results:
+        scale = results["reference"][0] / baseline["reference"]
+    regressions = []
+    for key, (seconds, _) in results.items():
+        if key.split("@")[0] not in CHOSEN_PATHS or key not in baseline:
+            continue
+        expected = baseline[key] * scale
+        if seconds > expected * (1 + margin) and seconds - expected > min_delta:
+            regressions.append((key, seconds, expected))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="结果表格解析与匹配基准测试")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 1000, 10000])
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--browser", action="store_true", help="同时测试需要Chrome的项目")
+    parser.add_argument("--check", action="store_true", help="与基线比较")
+    parser.add_argument("--margin", type=float, default=None, help="允许变慢的比例（相对参考操作折算后的基线），默认取基线文件中的值")
+    parser.add_argument("--update-baseline", action="store_true", help="用本次结果更新基线")
+    parser.add_argument("--json", help="把结果写入JSON文件")
+    args = parser.parse_args()
+
+    results = run(args.sizes, args.repeat, args.browser)
+    report(results)
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({k: {"seconds": v[0], "peak_bytes": v[1]} for k, v in results.items()}, f, indent=2)
+
+    baseline = {"margin": 0.5, "results": {}}
+    if os.path.exists(BASELINE_PATH):
+        with open(BASELINE_PATH, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+
+    if args.update_baseline:
+        baseline["results"].update({k: round(v[0], 6) for k, v in results.items()
+                                    if k == "reference" or k.split("@")[0] in CHOSEN_PATHS})
+        with open(BASELINE_PATH, "w", encoding="utf-8") as f:
+            json.dump(baseline, f, indent=2, sort_keys=True)
+        print(f"基线已更新: {BASELINE_PATH}")
+
+    if args.check:
+        margin = baseline.get("margin", 0.5) if args.margin is None else args.margin
+        regressions = check(results, baseline["results"], margin)
+        for key, seconds, base in regressions:
+            print(f"[回归] {key}: {seconds * 1000:.2f}ms，基线折算 {base * 1000:.2f}ms (允许+{margin:.0%})")
+        missing = missing_baseline(results, baseline["results"])
+        for key in missing:
+            print(f"[缺少基线] {key}：请在有Chrome的机器上运行 --browser --update-baseline")
+        if not args.browser:
+            print(f"提示: 未测试{'、'.join(BROWSER_PATHS)}（选课流程实际使用，需要 --browser）")
+        if regressions or missing:
+            return 1
+        print("基准检查通过")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
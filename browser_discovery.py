@@ -0,0 +1,253 @@
+# -*- coding: utf-8 -*-
+"""查找本机的Chrome/Chromium和匹配的chromedriver
+
+按以下顺序查找，支持Windows、Linux和macOS：
+    1. 环境变量 CHROME_PATH / CHROMEDRIVER_PATH
+    2. PATH 中的可执行文件
+    3. 常见安装位置（chromedriver还会查找Chrome安装目录和webdriver_manager的缓存目录）
+    4. 都找不到匹配的chromedriver时，用webdriver_manager联网下载
+
+Chrome和chromedriver的主版本号必须一致。结果（路径、版本、文件修改时间）缓存在
+browser_paths.json 中，之后启动时只检查文件是否变化，不再运行 --version，也不需要联网。
+
+用法:
+    python browser_discovery.py            # 查看检测结果
+    python browser_discovery.py --refresh  # 忽略缓存重新检测
+"""
+import argparse
+import glob
+import json
+import os
+import re
+import shutil
+import subprocess
+import sys
+import time
+
+DEFAULT_CACHE = "browser_paths.json"
+
+VERSION_RE = re.compile(r"(\d+)\.\d+\.\d+(?:\.\d+)?")
+
+CHROME_NAMES = ("google-chrome", "google-chrome-stable", "chromium", "chromium-browser", "chrome")
+DRIVER_NAMES = ("chromedriver", "chromium.chromedriver")
+
+
+def _windows_dirs():
+    return [os.environ.get(name) for name in ("PROGRAMFILES", "PROGRAMFILES(X86)", "LOCALAPPDATA")
+            if os.environ.get(name)]
+
+
+def chrome_candidates():
+    """可能的Chrome路径（按优先级，可能不存在）"""
+    candidates = [os.getenv("CHROME_PATH")]
+    candidates += [shutil.which(name) for name in CHROME_NAMES]
+    if sys.platform == "win32":
+        candidates += [os.path.join(base, "Google", "Chrome", "Application", "chrome.exe") for base in _windows_dirs()]
+        candidates.append(r"C:\Program Files\Google\Chrome\Application\chrome.exe")
+    elif sys.platform == "darwin":
+        candidates += ["/Applications/Google Chrome.app/Contents/MacOS/Google Chrome",
+                       "/Applications/Chromium.app/Contents/MacOS/Chromium"]
+    else:
+        candidates += ["/usr/bin/google-chrome", "/usr/bin/google-chrome-stable", "/opt/google/chrome/chrome",
+                       "/usr/bin/chromium", "/usr/bin/chromium-browser", "/snap/bin/chromium"]
+    return _unique(candidates)
+
+
+def driver_candidates(chrome_path=None):
+    """可能的chromedriver路径（按优先级，可能不存在）"""
+    exe = "chromedriver.exe" if sys.platform == "win32" else "chromedriver"
+    candidates = [os.getenv("CHROMEDRIVER_PATH")]
+    candidates += [shutil.which(name) for name in DRIVER_NAMES]
+    if chrome_path:
+        # 原来的约定：chromedriver放在Chrome安装目录中
+        candidates.append(os.path.join(os.path.dirname(chrome_path), exe))
+    if sys.platform == "win32":
+        candidates.append(r"C:\Program Files\Google\Chrome\Application\chromedriver.exe")
+    else:
+        candidates += ["/usr/bin/chromedriver", "/usr/local/bin/chromedriver",
+                       "/usr/lib/chromium/chromedriver", "/usr/lib/chromium-browser/chromedriver",
+                       "/snap/bin/chromium.chromedriver"]
+    # webdriver_manager 下载过的驱动
+    candidates += sorted(glob.glob(os.path.join(os.path.expanduser("~"), ".wdm", "drivers", "chromedriver",
+                                                "**", exe), recursive=True), reverse=True)
+    return _unique(candidates)
+
+
+def _unique(paths):
+    seen = []
+    for path in paths:
+        if path and path not in seen and os.path.isfile(path):
+            seen.append(path)
+    return seen
+
+
+def version_of(path):
+    """读取版本号，失败返回None
+
+    Windows上的chrome.exe --version没有输出（还会启动浏览器），直接从安装目录或注册表读取，
+    其余程序运行 --version。
+    """
+    if path.lower().endswith("chrome.exe"):
+        return _windows_chrome_version(path)
+    try:
+        output = subprocess.run([path, "--version"], capture_output=True, text=True, timeout=15).stdout
+    except (OSError, subprocess.SubprocessError):
+        output = ""
+    match = VERSION_RE.search(output or "")
+    return match.group(0) if match else None
+
+
+def _windows_chrome_version(path):
+    """chrome.exe所在目录下的版本目录（如 120.0.6099.110），没有时读取注册表"""
+    try:
+        versions = [name for name in os.listdir(os.path.dirname(path)) if VERSION_RE.fullmatch(name)]
+    except OSError:
+        versions = []
+    if versions:
+        return max(versions, key=lambda v: [int(x) for x in v.split(".")])
+    try:
+        import winreg
+    except ImportError:
+        return None
+    for root in (winreg.HKEY_CURRENT_USER, winreg.HKEY_LOCAL_MACHINE):
+        try:
+            with winreg.OpenKey(root, r"Software\Google\Chrome\BLBeacon") as key:
+                return winreg.QueryValueEx(key, "version")[0]
+        except OSError:
+            continue
+    return None
+
+
+def major(version):
+    return int(version.split(".")[0]) if version else None
+
+
+def _overrides():
+    return {name: os.getenv(name) or "" for name in ("CHROME_PATH", "CHROMEDRIVER_PATH")}
+
+
+def _fingerprint(path):
+    """文件实际位置及其所在目录的大小和修改时间
+
+    Linux上找到的路径常是符号链接或启动脚本（如/usr/bin/google-chrome），Chrome更新时它本身不变，
+    而实际安装目录中的文件被替换，目录的修改时间随之改变。
+    """
+    real = os.path.realpath(path)
+    stat = os.stat(real)
+    return [real, stat.st_size, int(stat.st_mtime), int(os.stat(os.path.dirname(real)).st_mtime)]
+
+
+def load_cache(path=DEFAULT_CACHE):
+    """读取缓存，文件已被替换（如Chrome自动更新）或路径设置改变时视为无效"""
+    if not os.path.exists(path):
+        return None
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            info = json.load(f)
+        for key in ("chrome", "driver"):
+            if info.get(key) and _fingerprint(info[key]) != info["fingerprints"][key]:
+                return None
+        if not info.get("driver") or info.get("overrides") != _overrides():
+            return None
+        return info
+    except (OSError, ValueError, KeyError, TypeError):
+        return None
+
+
+def save_cache(info, path=DEFAULT_CACHE):
+    data = dict(info)
+    data.pop("source", None)
+    data.pop("seconds", None)
+    data["overrides"] = _overrides()
+    data["fingerprints"] = {key: _fingerprint(info[key]) for key in ("chrome", "driver") if info.get(key)}
+    try:
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False, indent=2)
+    except OSError:
+        pass
+
+
+def download_driver(chrome_version):
+    """用webdriver_manager下载与Chrome匹配的chromedriver（需要联网），失败返回None"""
+    try:
+        from webdriver_manager.chrome import ChromeDriverManager
+        manager = ChromeDriverManager(driver_version=chrome_version) if chrome_version else ChromeDriverManager()
+        return manager.install()
+    except Exception:
+        return None
+
+
+def probe(need_chrome=True):
+    """实际查找Chrome和chromedriver，返回检测结果；找不到可用组合时抛出FileNotFoundError"""
+    chrome = chrome_version = None
+    for path in chrome_candidates():
+        chrome_version = version_of(path)
+        if chrome_version:
+            chrome = path
+            break
+    if chrome is None and need_chrome:
+        raise FileNotFoundError(
+            "未找到Chrome浏览器，请安装Chrome/Chromium，或在.env中设置CHROME_PATH为chrome可执行文件路径"
+        )
+
+    found = []
+    for path in driver_candidates(chrome):
+        version = version_of(path)
+        if not version:
+            continue
+        found.append((path, version))
+        if chrome_version is None or major(version) == major(chrome_version):
+            return {"chrome": chrome, "chrome_version": chrome_version, "driver": path, "driver_version": version}
+
+    path = download_driver(chrome_version)
+    version = version_of(path) if path else None
+    if version and (chrome_version is None or major(version) == major(chrome_version)):
+        return {"chrome": chrome, "chrome_version": chrome_version, "driver": path, "driver_version": version}
+
+    detail = "，".join(f"{p} ({v})" for p, v in found) or "无"
+    raise FileNotFoundError(
+        f"未找到与Chrome {chrome_version} 主版本一致的chromedriver（已找到: {detail}）。\n"
+        "请下载对应版本: https://googlechromelabs.github.io/chrome-for-testing/ ，"
+        "放入PATH或在.env中设置CHROMEDRIVER_PATH"
+    )
+
+
+def discover(cache_path=DEFAULT_CACHE, refresh=False, need_chrome=True):
+    """返回 {"chrome", "chrome_version", "driver", "driver_version", "source", "seconds"}
+
+    source为cache（使用缓存）或probe（重新检测）；need_chrome=False时允许找不到Chrome
+    （如连接已运行的浏览器），此时不检查版本是否一致。
+    """
+    start = time.perf_counter()
+    info = None if refresh else load_cache(cache_path)
+    # 只要求驱动的缓存不能用于需要启动Chrome的场景
+    if info and need_chrome and not info.get("chrome"):
+        info = None
+    if info:
+        info["source"] = "cache"
+    else:
+        info = probe(need_chrome)
+        save_cache(info, cache_path)
+        info["source"] = "probe"
+    info["seconds"] = time.perf_counter() - start
+    return info
+
+
+def main():
+    parser = argparse.ArgumentParser(description="查找Chrome和chromedriver")
+    parser.add_argument("--refresh", action="store_true", help="忽略缓存重新检测")
+    parser.add_argument("--cache", default=DEFAULT_CACHE, help="缓存文件路径")
+    args = parser.parse_args()
+    try:
+        info = discover(args.cache, refresh=args.refresh)
+    except FileNotFoundError as e:
+        print(str(e))
+        return 1
+    print(f"Chrome:       {info['chrome']} ({info['chrome_version']})")
+    print(f"chromedriver: {info['driver']} ({info['driver_version']})")
+    print(f"来源: {info['source']}，耗时 {info['seconds'] * 1000:.1f}ms")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -1,15 +1,20 @@
 import os
+import argparse
 import shutil
 import subprocess
 import sys
 from pathlib import Path
 
-def clean_build_files():
+FAST_SPEC = "SZTU_Course_Helper_Fast.spec"
+
+def clean_build_files(keep=()):
     """清理旧的构建文件"""
     print("清理旧的构建文件...")
     paths_to_remove = ['build', 'dist', '*.spec']
     for path in paths_to_remove:
         for p in Path('.').glob(path):
+            if p.name in keep:
+                continue
             if p.is_dir():
                 shutil.rmtree(p, ignore_errors=True)
             else:
@@ -67,12 +72,40 @@ def build_executable():
         print(f"\n打包失败: {e}")
         sys.exit(1)
 
+def build_fast(budget=None):
+    """按启动优化的spec打包（onedir），并检查启动耗时"""
+    print("开始打包启动优化版本...")
+    try:
+        subprocess.check_call(["pyinstaller", "--clean", "--noconfirm", FAST_SPEC])
+    except subprocess.CalledProcessError as e:
+        print(f"\n打包失败: {e}")
+        sys.exit(1)
+    print("\n打包成功！程序位置: " + os.path.join("dist", "SZTU_Course_Helper_Fast"))
+
+    print("\n检查启动耗时...")
+    cmd = [sys.executable, os.path.join("benchmarks", "bench_startup.py"), "--variant", "onedir"]
+    if budget:
+        cmd += ["--budget", str(budget)]
+    if subprocess.call(cmd) != 0:
+        print("\n启动耗时超出预算")
+        sys.exit(1)
+
 def main():
+    parser = argparse.ArgumentParser(description="SZTU选课助手打包工具")
+    parser.add_argument("--fast", action="store_true",
+                        help=f"按 {FAST_SPEC} 打包启动优化的onedir版本，并检查启动耗时")
+    parser.add_argument("--startup-budget", type=float, help="首次启动耗时预算（秒）")
+    args = parser.parse_args()
+
     print("=== SZTU选课助手打包工具 ===\n")
     
     try:
-        clean_build_files()
+        # FAST_SPEC是手写并纳入版本管理的文件，无法重新生成，清理时总是保留
+        clean_build_files(keep=(FAST_SPEC,))
         check_requirements()
+        if args.fast:
+            build_fast(args.startup_budget)
+            return
         build_executable()
     except Exception as e:
         print(f"\n发生错误: {e}")
@@ -0,0 +1,212 @@
+# -*- coding: utf-8 -*-
+"""本地课程库
+
+把每个选课类型的完整课程列表保存到本地SQLite文件，按课程编号、名称、
+教师和上课时间建立索引。配置课程时可以离线查找并自动填写，
+也可以比较两次同步之间课程列表的变化。
+
+用法:
+    python auto_course.py --sync-catalog [plan public ...]   # 联网同步
+    python catalog.py search 关键字 [--tab plan]
+    python catalog.py diff plan
+    python catalog.py stats
+"""
+import argparse
+import os
+import sqlite3
+from datetime import datetime
+
+DEFAULT_DB = "catalog.db"
+
+# 每个选课类型保留的同步快照数量
+KEEP_SYNCS = 5
+
+COURSE_FIELDS = ("course_id", "course_name", "teacher", "weekday", "start_section", "end_section",
+                 "time_text", "place", "credit", "section_id", "remaining", "capacity")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS syncs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    tab_type TEXT NOT NULL,
+    synced_at TEXT NOT NULL,
+    row_count INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS courses (
+    sync_id INTEGER NOT NULL REFERENCES syncs(id) ON DELETE CASCADE,
+    tab_type TEXT NOT NULL,
+    course_id TEXT,
+    course_name TEXT,
+    teacher TEXT,
+    weekday TEXT,
+    start_section INTEGER,
+    end_section INTEGER,
+    time_text TEXT,
+    place TEXT,
+    credit TEXT,
+    section_id TEXT,
+    remaining INTEGER,
+    capacity INTEGER
+);
+CREATE INDEX IF NOT EXISTS idx_courses_sync ON courses(sync_id);
+CREATE INDEX IF NOT EXISTS idx_courses_id ON courses(course_id);
+CREATE INDEX IF NOT EXISTS idx_courses_name ON courses(course_name);
+CREATE INDEX IF NOT EXISTS idx_courses_teacher ON courses(teacher);
+CREATE INDEX IF NOT EXISTS idx_courses_slot ON courses(weekday, start_section, end_section);
+"""
+
+
+class CourseCatalog:
+    """本地课程库（SQLite）"""
+
+    def __init__(self, path=DEFAULT_DB):
+        self.path = path
+        self.conn = sqlite3.connect(path)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute("PRAGMA foreign_keys = ON")
+        self.conn.executescript(SCHEMA)
+
+    @staticmethod
+    def exists(path=DEFAULT_DB):
+        return os.path.exists(path)
+
+    def close(self):
+        self.conn.close()
+
+    def save_sync(self, tab_type, rows):
+        """保存一次同步结果，返回同步编号"""
+        with self.conn:
+            cursor = self.conn.execute(
+                "INSERT INTO syncs (tab_type, synced_at, row_count) VALUES (?, ?, ?)",
+                (tab_type, datetime.now().isoformat(timespec="seconds"), len(rows))
+            )
+            sync_id = cursor.lastrowid
+            self.conn.executemany(
+                f"INSERT INTO courses (sync_id, tab_type, {', '.join(COURSE_FIELDS)}) "
+                f"VALUES (?, ?, {', '.join('?' * len(COURSE_FIELDS))})",
+                [(sync_id, tab_type) + tuple(row.get(field) for field in COURSE_FIELDS) for row in rows]
+            )
+            # 只保留最近几次快照
+            self.conn.execute(
+                "DELETE FROM syncs WHERE tab_type = ? AND id NOT IN "
+                "(SELECT id FROM syncs WHERE tab_type = ? ORDER BY id DESC LIMIT ?)",
+                (tab_type, tab_type, KEEP_SYNCS)
+            )
+        return sync_id
+
+    def latest_syncs(self):
+        """每个选课类型最近一次同步的信息"""
+        return [dict(row) for row in self.conn.execute(
+            "SELECT s.* FROM syncs s JOIN (SELECT tab_type, MAX(id) AS id FROM syncs GROUP BY tab_type) m "
+            "ON s.id = m.id ORDER BY s.tab_type"
+        )]
+
+    def search(self, keyword=None, tab_type=None, teacher=None, weekday=None, limit=20):
+        """在最新快照中查找课程，关键字匹配课程编号、名称或教师"""
+        sql = ("SELECT c.* FROM courses c WHERE c.sync_id IN "
+               "(SELECT MAX(id) FROM syncs GROUP BY tab_type)")
+        params = []
+        if keyword:
+            sql += " AND (c.course_id = ? OR c.course_name LIKE ? OR c.teacher LIKE ?)"
+            params += [keyword, f"%{keyword}%", f"%{keyword}%"]
+        if tab_type:
+            sql += " AND c.tab_type = ?"
+            params.append(tab_type)
+        if teacher:
+            sql += " AND c.teacher LIKE ?"
+            params.append(f"%{teacher}%")
+        if weekday:
+            sql += " AND c.weekday = ?"
+            params.append(weekday)
+        sql += " ORDER BY (c.course_id = ?) DESC, (c.course_name = ?) DESC, c.course_name, c.teacher LIMIT ?"
+        params += [keyword or "", keyword or "", limit]
+        return [dict(row) for row in self.conn.execute(sql, params)]
+
+    def diff(self, tab_type):
+        """比较某选课类型最近两次同步的差异"""
+        sync_ids = [row["id"] for row in self.conn.execute(
+            "SELECT id FROM syncs WHERE tab_type = ? ORDER BY id DESC LIMIT 2", (tab_type,)
+        )]
+        if len(sync_ids) < 2:
+            return None
+        new, old = (self._snapshot(sync_id) for sync_id in sync_ids)
+        changed = []
+        for key in new.keys() & old.keys():
+            fields = [f for f in ("course_name", "teacher", "time_text", "place", "capacity")
+                      if new[key].get(f) != old[key].get(f)]
+            if fields:
+                changed.append({"old": old[key], "new": new[key], "fields": fields})
+        return {
+            "added": [new[k] for k in sorted(new.keys() - old.keys())],
+            "removed": [old[k] for k in sorted(old.keys() - new.keys())],
+            "changed": changed,
+        }
+
+    def _snapshot(self, sync_id):
+        rows = {}
+        for row in self.conn.execute("SELECT * FROM courses WHERE sync_id = ?", (sync_id,)):
+            row = dict(row)
+            key = (row["course_id"], row["section_id"] or f"{row['teacher']}|{row['time_text']}")
+            rows[key] = row
+        return rows
+
+
+def to_course_config(row):
+    """把课程库记录转换成courses.json中的课程配置"""
+    return {
+        "course_id": row.get("course_id") or "",
+        "course_name": row.get("course_name") or "",
+        "teacher": row.get("teacher") or "",
+        "time": row.get("weekday") or "",
+        "start_section": str(row["start_section"]) if row.get("start_section") else "",
+        "end_section": str(row["end_section"]) if row.get("end_section") else "",
+        "tab_type": row.get("tab_type") or "",
+    }
+
+
+def format_row(row):
+    slot = row.get("time_text") or "时间未知"
+    return f"{row.get('course_id') or '-'} {row.get('course_name')} | {row.get('teacher')} | {slot} | {row.get('tab_type')}"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="本地课程库查询")
+    parser.add_argument("--db", default=DEFAULT_DB, help="课程库文件路径")
+    sub = parser.add_subparsers(dest="command", required=True)
+    search = sub.add_parser("search", help="查找课程")
+    search.add_argument("keyword", nargs="?", help="课程编号/名称/教师关键字")
+    search.add_argument("--tab", help="选课类型")
+    search.add_argument("--limit", type=int, default=20)
+    diff = sub.add_parser("diff", help="比较最近两次同步")
+    diff.add_argument("tab", help="选课类型")
+    sub.add_parser("stats", help="查看同步情况")
+    args = parser.parse_args()
+
+    if not CourseCatalog.exists(args.db):
+        print(f"未找到课程库 {args.db}，请先运行: python auto_course.py --sync-catalog")
+        return 1
+    catalog = CourseCatalog(args.db)
+    try:
+        if args.command == "search":
+            for row in catalog.search(args.keyword, tab_type=args.tab, limit=args.limit):
+                print(format_row(row))
+        elif args.command == "diff":
+            result = catalog.diff(args.tab)
+            if result is None:
+                print(f"{args.tab} 的同步次数不足两次，无法比较")
+                return 1
+            for row in result["added"]:
+                print(f"+ {format_row(row)}")
+            for row in result["removed"]:
+                print(f"- {format_row(row)}")
+            for item in result["changed"]:
+                print(f"~ {format_row(item['new'])} ({', '.join(item['fields'])})")
+        else:
+            for sync in catalog.latest_syncs():
+                print(f"{sync['tab_type']:<12} {sync['synced_at']} 共{sync['row_count']}门")
+    finally:
+        catalog.close()
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
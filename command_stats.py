@@ -0,0 +1,133 @@
+# -*- coding: utf-8 -*-
+"""WebDriver命令统计
+
+每个find_element、is_displayed、click、send_keys、execute_script都是一次发给
+chromedriver的HTTP请求。包装driver的命令执行器，按阶段（navigate/search/verify/
+confirm等）和命令类型统计次数与耗时，用于找出请求过多的代码路径。
+
+轮询等待（WebDriverWait、等待表格刷新等）发出的命令数取决于页面响应快慢，
+在 polling() 中发出的命令单独计数，不计入每门课程的命令数（per_check），
+使per_check在同样的流程下保持不变，可以作为预算检查。
+"""
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+
+from loguru import logger
+
+# 不在任何阶段内发出的命令归入这一类
+NO_PHASE = "other"
+
+# 每检查一门课程都会经过的阶段（登录等一次性阶段不计入每门课程的命令数）
+COURSE_PHASES = ("navigate", "search", "verify", "confirm", "refresh")
+
+
+class CommandStats:
+    """按 (阶段, 命令类型) 统计WebDriver命令的次数和耗时"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.counts = defaultdict(int)     # (phase, command) -> 次数
+        self.seconds = defaultdict(float)  # (phase, command) -> 总耗时
+        self.polled = defaultdict(int)     # (phase, command) -> 其中轮询等待发出的次数
+        self.checks = 0                    # 检查过的课程次数，用于计算每门课程的命令数
+        self.polling_depth = 0
+
+    def install(self, driver, phase_getter, listener=None):
+        """包装driver的命令执行器；phase_getter返回当前阶段，listener(phase, command, seconds)可选"""
+        executor = driver.command_executor
+        original_execute = executor.execute
+
+        def execute(command, params):
+            start = time.perf_counter()
+            try:
+                return original_execute(command, params)
+            finally:
+                elapsed = time.perf_counter() - start
+                phase = phase_getter() or NO_PHASE
+                self.add(phase, command, elapsed, polled=self.polling_depth > 0)
+                if listener:
+                    listener(phase, command, elapsed)
+
+        executor.execute = execute
+
+    def add(self, phase, command, seconds, polled=False):
+        key = (phase, command)
+        with self.lock:
+            self.counts[key] += 1
+            self.seconds[key] += seconds
+            if polled:
+                self.polled[key] += 1
+
+    @contextmanager
+    def polling(self):
+        """标记其中发出的命令为轮询等待"""
+        self.polling_depth += 1
+        try:
+            yield
+        finally:
+            self.polling_depth -= 1
+
+    def course_checked(self):
+        self.checks += 1
+
+    @property
+    def total(self):
+        with self.lock:
+            return sum(self.counts.values())
+
+    def by_phase(self):
+        """各阶段的 {"count": 次数, "seconds": 耗时}"""
+        result = defaultdict(lambda: {"count": 0, "seconds": 0.0})
+        with self.lock:
+            for (phase, _), count in self.counts.items():
+                result[phase]["count"] += count
+            for (phase, _), seconds in self.seconds.items():
+                result[phase]["seconds"] += seconds
+        return dict(result)
+
+    def top_commands(self, limit=10):
+        """次数最多的 (阶段, 命令, 次数, 耗时)"""
+        with self.lock:
+            items = [(phase, command, count, self.seconds[(phase, command)])
+                     for (phase, command), count in self.counts.items()]
+        return sorted(items, key=lambda item: item[2], reverse=True)[:limit]
+
+    def per_check(self, polled=False):
+        """平均每检查一门课程各阶段发出的命令数，total为这些阶段之和
+
+        默认不含轮询等待的命令；polled=True时只统计轮询等待的命令
+        """
+        if not self.checks:
+            return {}
+        counts = defaultdict(int)
+        with self.lock:
+            for key, count in self.counts.items():
+                if key[0] in COURSE_PHASES:
+                    waits = self.polled.get(key, 0)
+                    counts[key[0]] += waits if polled else count - waits
+        result = {phase: round(count / self.checks, 2) for phase, count in counts.items()}
+        result["total"] = round(sum(counts.values()) / self.checks, 2)
+        return result
+
+    def snapshot(self):
+        """可写入JSON的统计数据"""
+        with self.lock:
+            commands = [{"phase": phase, "command": command, "count": count,
+                         "seconds": round(self.seconds[(phase, command)], 4)}
+                        for (phase, command), count in sorted(self.counts.items())]
+        return {"checks": self.checks, "per_check": self.per_check(),
+                "per_check_polled": self.per_check(polled=True), "commands": commands}
+
+    def log_summary(self):
+        phases = self.by_phase()
+        if not phases:
+            return
+        logger.info(f"WebDriver命令统计 (共{self.total}次，检查课程{self.checks}次):")
+        per_check = self.per_check()
+        for phase, stats in sorted(phases.items(), key=lambda item: -item[1]["count"]):
+            average = f"，每门课程 {per_check[phase]:.1f} 次" if phase in per_check else ""
+            logger.info(f"  {phase}: {stats['count']} 次 {stats['seconds']:.2f}s{average}")
+        for phase, command, count, seconds in self.top_commands(5):
+            logger.info(f"  {phase}/{command}: {count} 次，平均 {seconds / count * 1000:.1f}ms")
@@ -1,7 +1,13 @@
 # -*- coding: utf-8 -*-
 import json
 import os
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
+from catalog import CourseCatalog, to_course_config, format_row
+from scheduler import parse_deadline
+
+TAB_TYPES = ("plan", "public", "cross_grade", "cross_major")
+WEEKDAYS = ("周一", "周二", "周三", "周四", "周五", "周六", "周日")
+REQUIRED_FIELDS = ("course_name", "teacher", "time", "start_section", "end_section", "tab_type")
 
 class CourseConfig:
     def __init__(self):
@@ -109,6 +115,31 @@ class CourseConfig:
                 return tab_options[choice][0]
             print("❌ 错误: 请输入1-4之间的数字")
             
+    @staticmethod
+    def lookup_catalog(tab_type: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        """从本地课程库查找课程，返回自动填写的课程配置（未选择时返回None）"""
+        if not CourseCatalog.exists():
+            return None
+        keyword = input("\n🔍 从本地课程库查找 (课程名/教师/编号，回车跳过): ").strip()
+        if not keyword:
+            return None
+
+        catalog = CourseCatalog()
+        try:
+            rows = catalog.search(keyword, tab_type=tab_type, limit=10)
+        finally:
+            catalog.close()
+        if not rows:
+            print("ℹ️ 课程库中没有匹配的课程，请手动输入")
+            return None
+
+        for i, row in enumerate(rows, 1):
+            print(f"  [{i}] {format_row(row)}")
+        choice = input("\n👉 请选择课程 (回车手动输入): ").strip()
+        if choice.isdigit() and 1 <= int(choice) <= len(rows):
+            return to_course_config(rows[int(choice) - 1])
+        return None
+
     def create_course(self) -> Dict[str, Any]:
         """交互式创建单个课程配置"""
         self.print_header("📚 添加新课程")
@@ -135,34 +166,40 @@ class CourseConfig:
                 break
             print("❌ 请输入有效的选项")
         
-        # 2. 输入课程信息
+        # 2. 输入课程信息（可从本地课程库自动填写）
         print("\n[2/4] 输入课程信息")
         print("─" * 40)
-        course["course_id"] = input("👉 课程编号 (可选): ").strip()
-        
-        while True:
-            course["course_name"] = input("👉 课程名称 (必填): ").strip()
-            if course["course_name"]:
-                break
-            print("❌ 课程名称不能为空")
+        found = self.lookup_catalog(course["tab_type"])
+        if found:
+            course.update({k: v for k, v in found.items() if k != "tab_type"})
+            print(f"✅ 已从课程库填写: {course['course_name']} - {course['teacher']}")
+        else:
+            course["course_id"] = input("👉 课程编号 (可选): ").strip()
             
-        while True:
-            course["teacher"] = input("👉 教师姓名 (必填): ").strip()
-            if course["teacher"]:
-                break
-            print("❌ 教师姓名不能为空")
+            while True:
+                course["course_name"] = input("👉 课程名称 (必填): ").strip()
+                if course["course_name"]:
+                    break
+                print("❌ 课程名称不能为空")
+                
+            while True:
+                course["teacher"] = input("👉 教师姓名 (必填): ").strip()
+                if course["teacher"]:
+                    break
+                print("❌ 教师姓名不能为空")
             
         # 3. 选择上课时间
-        print("\n[3/4] 选择上课时间")
-        print("─" * 40)
-        course["time"] = self.get_weekday()
+        if not course.get("time"):
+            print("\n[3/4] 选择上课时间")
+            print("─" * 40)
+            course["time"] = self.get_weekday()
         
         # 4. 选择上课节次
-        print("\n[4/4] 选择上课节次")
-        print("─" * 40)
-        start, end = self.get_section()
-        course["start_section"] = start
-        course["end_section"] = end
+        if not course.get("start_section") or not course.get("end_section"):
+            print("\n[4/4] 选择上课节次")
+            print("─" * 40)
+            course["start_section"], course["end_section"] = self.get_section()
+        start, end = course["start_section"], course["end_section"]
         
         # 显示确认信息
         self.print_header("✅ 确认课程信息")
@@ -222,6 +259,50 @@ class CourseConfig:
             print(f"错误: 配置文件 {json_file} 格式不正确")
             return None
             
+    @staticmethod
+    def validate(courses: Any) -> List[str]:
+        """检查课程配置，返回错误说明列表（为空表示通过）"""
+        if not isinstance(courses, list) or not courses:
+            return ["课程配置应为非空的课程列表"]
+        errors = []
+        seen = set()
+        for i, course in enumerate(courses, 1):
+            if not isinstance(course, dict):
+                errors.append(f"第{i}门课程: 应为对象")
+                continue
+            name = course.get("course_name") or course.get("course_id") or f"第{i}门课程"
+            missing = [field for field in REQUIRED_FIELDS if field not in course]
+            if missing:
+                errors.append(f"{name}: 缺少字段 {', '.join(missing)}")
+            if not course.get("course_name"):
+                errors.append(f"{name}: 课程名称不能为空")
+            if course.get("tab_type") not in TAB_TYPES:
+                errors.append(f"{name}: 选课类型应为 {'/'.join(TAB_TYPES)}")
+            if course.get("time") and course["time"] not in WEEKDAYS:
+                errors.append(f"{name}: 上课时间应为 周一~周日")
+            sections = []
+            for field in ("start_section", "end_section"):
+                value = str(course.get(field) or "")
+                if value and not (value.isdigit() and 1 <= int(value) <= 15):
+                    errors.append(f"{name}: {field} 应为1~15之间的数字")
+                elif value:
+                    sections.append(int(value))
+            if len(sections) == 2 and sections[0] > sections[1]:
+                errors.append(f"{name}: 开始节次不能大于结束节次")
+            try:
+                float(course.get("priority", 1) or 1)
+            except (TypeError, ValueError):
+                errors.append(f"{name}: priority 应为数字")
+            try:
+                parse_deadline(course.get("deadline"))
+            except (TypeError, ValueError):
+                errors.append(f"{name}: deadline 格式应为 YYYY-MM-DD HH:MM")
+            key = course.get("course_id") or f"{course.get('course_name')}|{course.get('teacher')}"
+            if key in seen:
+                errors.append(f"{name}: 与前面的课程重复")
+            seen.add(key)
+        return errors
+
     def save_to_json(self, json_file: str) -> bool:
         """保存课程配置到JSON文件"""
         try:
@@ -0,0 +1,156 @@
+# -*- coding: utf-8 -*-
+"""在各故障配置下运行选课流程并统计耗时
+
+对 fault_server.py 中的每个故障配置启动一个本地模拟教务系统，
+用真实的 CourseSelector 跑完整的登录和选课循环，报告：
+    - 从开始到选课成功的时间
+    - 注入的故障次数
+    - 与无故障对照相比，平均每次故障多花的时间
+
+用法:
+    python fault_runner.py                                  # 全部故障配置
+    python fault_runner.py --profiles baseline intermittent-502
+    python fault_runner.py --timeouts timeouts.json         # 用另一组超时设置对比
+"""
+import argparse
+import json
+import os
+import shutil
+import tempfile
+import time
+from contextlib import contextmanager
+
+import runs
+from fault_server import FaultServer, PROFILES
+
+DEFAULT_COURSE = {
+    "course_id": "CP00006", "course_name": "大学物理B2", "teacher": "吴海娜",
+    "time": "周三", "start_section": "3", "end_section": "5", "tab_type": "cross_major",
+}
+
+
+# 故障测试不能使用的.env设置：连接用户正在使用的浏览器、打开真实的选课页面、占用指标端口。
+# 设为空字符串而不是删除，auto_course再次调用load_dotenv()时不会从.env重新读入
+DETACHED_OPTIONS = ("CHROME_DEBUGGER_ADDRESS", "SELECTION_URL", "METRICS_PORT")
+
+
+@contextmanager
+def isolated_run():
+    """让一次故障测试的选课程序只写临时目录：等待耗时样本、余量历史和运行目录都不进入正式文件"""
+    temp = tempfile.mkdtemp(prefix="fault-run-")
+    overrides = {name: "" for name in DETACHED_OPTIONS}
+    # 本地模拟服务的毫秒级耗时不能写入正式的 latency_samples.json
+    overrides["LATENCY_SAMPLES"] = os.path.join(temp, "latency_samples.json")
+    overrides["SEAT_HISTORY"] = "0"
+    saved = {name: os.environ.get(name) for name in overrides}
+    runs_dir = runs.RUNS_DIR
+    os.environ.update(overrides)
+    runs.RUNS_DIR = os.path.join(temp, "runs")
+    try:
+        yield temp
+    finally:
+        runs.RUNS_DIR = runs_dir
+        for name, value in saved.items():
+            if value is None:
+                os.environ.pop(name, None)
+            else:
+                os.environ[name] = value
+        shutil.rmtree(temp, ignore_errors=True)
+
+
+def run_profile(profile, courses, max_rounds):
+    """在一个故障配置下运行一次选课流程"""
+    with isolated_run():
+        return _run_profile(profile, courses, max_rounds)
+
+
+def _run_profile(profile, courses, max_rounds):
+    import auto_course
+
+    server = FaultServer(profile, courses).start()
+    # 让选课程序访问本地模拟服务
+    auto_course.BASE_URL = server.url
+    auto_course.AUTH_CHECK_URL = server.url + "/"
+
+    with tempfile.NamedTemporaryFile("w", suffix=".json", delete=False, encoding="utf-8") as f:
+        json.dump(courses, f, ensure_ascii=False)
+    selector = None
+    started = time.time()
+    result = {"profile": profile, "success": False, "time_to_success": None, "elapsed": None}
+    try:
+        selector = auto_course.CourseSelector()
+        if selector.login():
+            selector.select_multiple_courses(f.name, max_retries=max_rounds)
+        selected = server.stats["selected"]
+        result["success"] = len(selected) == len(courses)
+        if selected:
+            result["time_to_success"] = max(selected.values()) - started
+    except Exception as e:
+        result["error"] = str(e)
+    finally:
+        result["elapsed"] = time.time() - started
+        if selector:
+            result["commands"] = selector.command_stats.snapshot()
+            selector.close()
+        server.stop()
+        os.unlink(f.name)
+    result["faults"] = dict(server.stats["faults"])
+    result["requests"] = server.stats["requests"]
+    return result
+
+
+def report(results):
+    baseline = next((r for r in results if r["profile"] == "baseline" and r["time_to_success"]), None)
+    print(f"\n{'故障配置':<20}{'成功':>6}{'选中耗时(s)':>14}{'总耗时(s)':>12}{'请求数':>8}{'故障数':>8}{'每次故障浪费(s)':>18}")
+    for r in results:
+        faults = sum(r["faults"].values())
+        wasted = "-"
+        if baseline and r["time_to_success"] and faults:
+            wasted = f"{(r['time_to_success'] - baseline['time_to_success']) / faults:.2f}"
+        tts = f"{r['time_to_success']:.1f}" if r["time_to_success"] else "-"
+        print(f"{r['profile']:<24}{'是' if r['success'] else '否':>4}{tts:>14}{r['elapsed']:>12.1f}"
+              f"{r['requests']:>8}{faults:>8}{wasted:>18}")
+        if r["faults"]:
+            print(f"{'':<24}故障明细: {r['faults']}")
+        if r.get("commands", {}).get("per_check"):
+            print(f"{'':<24}每门课程WebDriver命令数: {r['commands']['per_check']}")
+        if r.get("error"):
+            print(f"{'':<24}错误: {r['error']}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="故障注入下的选课流程测试")
+    parser.add_argument("--profiles", nargs="+", choices=list(PROFILES), default=list(PROFILES))
+    parser.add_argument("--courses", help="目标课程配置文件（默认使用一门示例课程）")
+    parser.add_argument("--timeouts", help="超时设置JSON文件，覆盖auto_course.TIMEOUTS")
+    parser.add_argument("--max-rounds", type=int, default=10)
+    parser.add_argument("--json", help="把结果写入JSON文件")
+    args = parser.parse_args()
+
+    # 模拟服务不校验账号，没有配置时使用占位凭证
+    os.environ.setdefault("STUDENT_ID", "fault-test")
+    os.environ.setdefault("PASSWORD", "fault-test")
+
+    import auto_course
+    if args.timeouts:
+        auto_course.load_timeouts(args.timeouts)
+    print(f"超时设置: {auto_course.TIMEOUTS}")
+
+    courses = [DEFAULT_COURSE]
+    if args.courses:
+        with open(args.courses, "r", encoding="utf-8") as f:
+            courses = json.load(f)
+
+    # 对照组放在最前面，用于计算每次故障的浪费时间
+    profiles = sorted(args.profiles, key=lambda p: p != "baseline")
+    results = [run_profile(profile, courses, args.max_rounds) for profile in profiles]
+    report(results)
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({"timeouts": auto_course.TIMEOUTS, "results": results}, f, ensure_ascii=False, indent=2)
+    return 0 if all(r["success"] for r in results) else 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
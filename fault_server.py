@@ -0,0 +1,370 @@
+# -*- coding: utf-8 -*-
+"""本地模拟教务系统（带故障注入）
+
+提供与教务系统结构一致的登录页、选课入口、四个选课选项卡和选课操作，
+并按命名的故障配置注入延迟、502错误、会话过期、弹窗丢失和请求卡死，
+用于离线调整超时和重试参数。配合 fault_runner.py 使用，也可以单独启动：
+
+    python fault_server.py --profile peak-hour-slow --port 8765
+"""
+import argparse
+import json
+import random
+import threading
+import time
+import uuid
+from http.cookies import SimpleCookie
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+
+TAB_PATHS = {
+    "plan": "/jsxsd/xsxkkc/comeInBxqjhxk",
+    "public": "/jsxsd/xsxkkc/comeInGgxxkxk",
+    "cross_grade": "/jsxsd/xsxkkc/comeInKnjxk",
+    "cross_major": "/jsxsd/xsxkkc/comeInFawxk",
+}
+
+# 故障配置
+PROFILES = {
+    # 无故障，作为对照
+    "baseline": {},
+    # 选课高峰：每个请求都有较大延迟
+    "peak-hour-slow": {"latency": (0.8, 2.5)},
+    # 间歇性502
+    "intermittent-502": {"error_rate": 0.2},
+    # 运行途中会话过期
+    "session-expiry": {"session_ttl": 30},
+    # 选课结果弹窗丢失
+    "dropped-alert": {"drop_alert_rate": 0.5},
+    # 偶发请求卡死
+    "stalled-response": {"stall_rate": 0.1, "stall_seconds": 20},
+}
+
+# 不注入错误/卡死的路径（保证模拟服务本身可以登录）
+SAFE_PATHS = ("/", "/login", "/favicon.ico")
+
+HEADERS = ["课程编号", "课程名称", "学分", "上课老师", "上课时间", "上课地点", "剩余量", "操作"]
+WEEKDAY_NUMBERS = {"周一": "1", "周二": "2", "周三": "3", "周四": "4", "周五": "5", "周六": "6", "周日": "7"}
+WEEKDAY_NAMES = {v: "星期" + "一二三四五六日"[int(v) - 1] for v in WEEKDAY_NUMBERS.values()}
+
+PAGE = """<!DOCTYPE html><html><head><meta charset="utf-8"><title>{title}</title></head><body>{body}</body></html>"""
+
+LOGIN_BODY = """
+<form method="post" action="/login">
+  <input id="j_username" name="j_username">
+  <input id="j_password" name="j_password" type="password">
+  <button id="loginButton" type="submit">登录</button>
+</form>{error}"""
+
+MAIN_BODY = """<a href="/jsxsd/xsxk/xklc_list">进入选课</a>"""
+
+XKLC_BODY = """
+<table id="attend_class"><tbody>
+  <tr><th>序号</th><th>学年学期</th><th>选课名称</th><th>操作</th></tr>
+  <tr><td>1</td><td>2024-2025-2</td><td>正选</td><td><a href="/jsxsd/xsxk/xsxk_index">进入选课</a></td></tr>
+</tbody></table>"""
+
+INDEX_BODY = "".join(f'<a href="{path}">{tab}</a><br>' for tab, path in TAB_PATHS.items())
+
+TAB_BODY = """
+<div>
+  课程: <input id="kcxx"> 教师: <input id="skls">
+  <select id="skxq"><option value="">--</option>{weekdays}</select>
+  <select id="skjc"><option value="">--</option>{sections}</select>
+  <select id="endJc"><option value="">--</option>{sections}</select>
+  <label><input type="checkbox" id="sfym"><span>过滤已满课程</span></label>
+  <input type="button" class="button" value="查询" onclick="doQuery()">
+</div>
+<table id="dataView"><thead><tr>{headers}</tr></thead><tbody></tbody></table>
+<script>
+var TAB = "{tab}";
+function val(id) {{ return document.getElementById(id).value; }}
+function doQuery() {{
+  var params = new URLSearchParams({{tab: TAB, kcxx: val('kcxx'), skls: val('skls'), skxq: val('skxq'),
+    skjc: val('skjc'), endJc: val('endJc'), sfym: document.getElementById('sfym').checked ? '1' : '0'}});
+  fetch('/jsxsd/xsxkkc/query?' + params).then(function (r) {{
+    if (!r.ok) {{ throw new Error(r.status); }}
+    return r.json();
+  }}).then(function (data) {{
+    if (data.expired) {{ alert('登录超时，请重新登录'); return; }}
+    render(data.rows);
+  }}).catch(function () {{}});
+}}
+function render(rows) {{
+  var html = '';
+  rows.forEach(function (row) {{
+    var op = row.remaining > 0 ? '<a href="javascript:void(0);" onclick="xsxkOper(\\'' + row.id + '\\')">选课</a>' : '';
+    html += '<tr><td>' + row.course_id + '</td><td>' + row.course_name + '</td><td>' + row.credit + '</td><td>'
+      + row.teacher + '</td><td>' + row.time_text + '</td><td>' + row.place + '</td><td>' + row.remaining
+      + '</td><td class="center">' + op + '</td></tr>';
+  }});
+  document.querySelector('#dataView tbody').innerHTML = html;
+}}
+function xsxkOper(id) {{
+  if (!confirm('确定选课？')) {{ return; }}
+  fetch('/jsxsd/xsxkkc/oper?jx0404id=' + id).then(function (r) {{
+    return r.ok ? r.json() : {{message: '服务器错误(' + r.status + ')'}};
+  }}).then(function (data) {{
+    if (data.drop) {{ return; }}
+    alert(data.message);
+  }});
+}}
+</script>"""
+
+
+def make_catalog(targets, fillers=20, seed=0):
+    """根据目标课程生成课程列表：每个目标课程一个初始已满的教学班，另加若干干扰课程"""
+    rng = random.Random(seed)
+    rows = []
+    for i, course in enumerate(targets):
+        weekday = WEEKDAY_NUMBERS.get(course.get("time"), "1")
+        start, end = course.get("start_section") or "1", course.get("end_section") or "2"
+        rows.append({
+            "id": f"9000{i:04d}", "tab": course.get("tab_type", "plan"), "target": True,
+            "course_id": course.get("course_id") or f"TG{i:05d}", "course_name": course["course_name"],
+            "teacher": course["teacher"], "credit": 3, "weekday": weekday, "start": int(start), "end": int(end),
+            "time_text": f"1-16周 {WEEKDAY_NAMES[weekday]} [{int(start):02d}-{int(end):02d}节]",
+            "place": "C1-101", "remaining": 0,
+        })
+    for i in range(fillers):
+        weekday = str(rng.randint(1, 5))
+        start = rng.choice([1, 3, 6, 8, 11])
+        rows.append({
+            "id": f"8000{i:04d}", "tab": rng.choice(list(TAB_PATHS)), "target": False,
+            "course_id": f"FL{i:05d}", "course_name": f"干扰课程{i}", "teacher": f"教师{i}", "credit": 2,
+            "weekday": weekday, "start": start, "end": start + 1,
+            "time_text": f"1-16周 {WEEKDAY_NAMES[weekday]} [{start:02d}-{start + 1:02d}节]",
+            "place": "C2-202", "remaining": rng.randint(0, 5),
+        })
+    return rows
+
+
+class FaultServer:
+    """带故障注入的模拟教务系统"""
+
+    def __init__(self, profile="baseline", courses=None, port=0, open_after=3, seed=0):
+        if profile not in PROFILES:
+            raise ValueError(f"未知的故障配置: {profile}")
+        self.profile_name = profile
+        self.profile = PROFILES[profile]
+        self.rng = random.Random(seed)
+        self.catalog = make_catalog(courses or [], seed=seed)
+        # 目标课程在被查询 open_after 次后放出名额
+        self.open_after = open_after
+        self.queries = 0
+        self.sessions = {}
+        self.lock = threading.Lock()
+        self.stats = {"requests": 0, "faults": {}, "selected": {}, "started_at": None}
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", port), self._handler())
+        self.thread = None
+
+    @property
+    def url(self):
+        return f"http://127.0.0.1:{self.httpd.server_address[1]}"
+
+    def start(self):
+        self.stats["started_at"] = time.time()
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def fault(self, kind):
+        with self.lock:
+            self.stats["faults"][kind] = self.stats["faults"].get(kind, 0) + 1
+
+    def chance(self, key):
+        rate = self.profile.get(key, 0)
+        with self.lock:
+            return rate > 0 and self.rng.random() < rate
+
+    def session_state(self, sid):
+        """返回 None(未登录) / "expired" / "ok" """
+        created = self.sessions.get(sid)
+        if created is None:
+            return None
+        ttl = self.profile.get("session_ttl")
+        if ttl and time.time() - created > ttl:
+            return "expired"
+        return "ok"
+
+    def query(self, params):
+        with self.lock:
+            self.queries += 1
+            if self.queries >= self.open_after:
+                for row in self.catalog:
+                    if row["target"] and row["remaining"] == 0 and row["id"] not in self.stats["selected"]:
+                        row["remaining"] = 1
+        get = lambda key: (params.get(key) or [""])[0]
+        rows = []
+        for row in self.catalog:
+            if row["tab"] != get("tab"):
+                continue
+            if get("kcxx") and get("kcxx") not in row["course_name"] and get("kcxx") != row["course_id"]:
+                continue
+            if get("skls") and get("skls") not in row["teacher"]:
+                continue
+            if get("skxq") and get("skxq") != row["weekday"]:
+                continue
+            if get("skjc") and int(get("skjc")) != row["start"]:
+                continue
+            if get("endJc") and int(get("endJc")) != row["end"]:
+                continue
+            if get("sfym") == "1" and row["remaining"] <= 0:
+                continue
+            rows.append(row)
+        return rows
+
+    def select(self, section_id):
+        with self.lock:
+            for row in self.catalog:
+                if row["id"] != section_id:
+                    continue
+                if row["id"] in self.stats["selected"]:
+                    return "选课失败：该课程已选，不能重复选择"
+                if row["remaining"] <= 0:
+                    return "选课失败：该课程人数已满"
+                row["remaining"] -= 1
+                self.stats["selected"][row["id"]] = time.time()
+                return "选课成功"
+        return "选课失败：参数错误"
+
+    def _handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, format, *args):
+                pass
+
+            def send(self, status, body, content_type="text/html; charset=utf-8", headers=None):
+                data = body.encode("utf-8")
+                try:
+                    self.send_response(status)
+                    self.send_header("Content-Type", content_type)
+                    self.send_header("Content-Length", str(len(data)))
+                    for key, value in (headers or {}).items():
+                        self.send_header(key, value)
+                    self.end_headers()
+                    self.wfile.write(data)
+                except (BrokenPipeError, ConnectionResetError):
+                    pass
+
+            def page(self, title, body):
+                self.send(200, PAGE.format(title=title, body=body))
+
+            def redirect(self, location, headers=None):
+                self.send(302, "", headers=dict(headers or {}, Location=location))
+
+            def sid(self):
+                cookie = SimpleCookie(self.headers.get("Cookie", ""))
+                return cookie["JSESSIONID"].value if "JSESSIONID" in cookie else None
+
+            def inject(self, path):
+                """按故障配置注入延迟/错误/卡死，返回True表示已直接响应"""
+                with server.lock:
+                    server.stats["requests"] += 1
+                latency = server.profile.get("latency")
+                if latency:
+                    time.sleep(server.rng.uniform(*latency))
+                if path in SAFE_PATHS:
+                    return False
+                if server.chance("stall_rate"):
+                    server.fault("stall")
+                    time.sleep(server.profile.get("stall_seconds", 20))
+                if server.chance("error_rate"):
+                    server.fault("http_502")
+                    self.send(502, "Bad Gateway")
+                    return True
+                return False
+
+            def do_POST(self):
+                path = urlparse(self.path).path
+                if self.inject(path):
+                    return
+                if path != "/login":
+                    self.send(404, "Not Found")
+                    return
+                length = int(self.headers.get("Content-Length", 0))
+                form = parse_qs(self.rfile.read(length).decode("utf-8"))
+                if not form.get("j_username") or not form.get("j_password"):
+                    self.redirect("/?error=1")
+                    return
+                sid = uuid.uuid4().hex
+                server.sessions[sid] = time.time()
+                self.redirect("/jsxsd/framework/xsMain.jsp", {"Set-Cookie": f"JSESSIONID={sid}; Path=/"})
+
+            def do_GET(self):
+                parsed = urlparse(self.path)
+                path, params = parsed.path, parse_qs(parsed.query)
+                if self.inject(path):
+                    return
+                if path in ("/", "/jsxsd/"):
+                    error = '<div class="el-message el-message--error">用户名或密码错误</div>' if "error" in params else ""
+                    self.page("系统登录", LOGIN_BODY.format(error=error))
+                    return
+
+                state = server.session_state(self.sid())
+                if state != "ok":
+                    if state == "expired":
+                        server.fault("session_expired")
+                    if path.startswith("/jsxsd/xsxkkc/query") or path.startswith("/jsxsd/xsxkkc/oper"):
+                        self.send(200, json.dumps({"expired": True, "rows": [], "message": "登录超时，请重新登录"}),
+                                  "application/json; charset=utf-8")
+                    else:
+                        self.redirect("/")
+                    return
+
+                if path == "/jsxsd/framework/xsMain.jsp":
+                    self.page("学生首页", MAIN_BODY)
+                elif path == "/jsxsd/xsxk/xklc_list":
+                    self.page("选课轮次", XKLC_BODY)
+                elif path == "/jsxsd/xsxk/xsxk_index":
+                    self.page("学生选课", INDEX_BODY)
+                elif path in TAB_PATHS.values():
+                    tab = next(t for t, p in TAB_PATHS.items() if p == path)
+                    self.page("学生选课", TAB_BODY.format(
+                        tab=tab,
+                        weekdays="".join(f'<option value="{v}">{n}</option>' for v, n in WEEKDAY_NAMES.items()),
+                        sections="".join(f'<option value="{i}">{i}</option>' for i in range(1, 16)),
+                        headers="".join(f"<th>{h}</th>" for h in HEADERS),
+                    ))
+                elif path == "/jsxsd/xsxkkc/query":
+                    self.send(200, json.dumps({"rows": server.query(params)}, ensure_ascii=False),
+                              "application/json; charset=utf-8")
+                elif path == "/jsxsd/xsxkkc/oper":
+                    message = server.select((params.get("jx0404id") or [""])[0])
+                    drop = server.chance("drop_alert_rate")
+                    if drop:
+                        server.fault("dropped_alert")
+                    self.send(200, json.dumps({"message": message, "drop": drop}, ensure_ascii=False),
+                              "application/json; charset=utf-8")
+                else:
+                    self.send(404, "Not Found")
+
+        return Handler
+
+
+def main():
+    parser = argparse.ArgumentParser(description="本地模拟教务系统（带故障注入）")
+    parser.add_argument("--profile", default="baseline", choices=list(PROFILES))
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--courses", default="courses.json", help="作为目标课程的配置文件")
+    args = parser.parse_args()
+
+    with open(args.courses, "r", encoding="utf-8") as f:
+        courses = json.load(f)
+    server = FaultServer(args.profile, courses, port=args.port).start()
+    print(f"模拟教务系统已启动: {server.url} (故障配置: {args.profile})")
+    print(f"运行选课程序前设置: JWXT_BASE_URL={server.url} JWXT_AUTH_URL={server.url}/")
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        server.stop()
+
+
+if __name__ == "__main__":
+    main()
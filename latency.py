@@ -0,0 +1,103 @@
+# -*- coding: utf-8 -*-
+"""自适应等待超时
+
+为每个逻辑等待（某个元素、结果表格刷新、弹窗等）维护一个滚动的耗时样本窗口，
+超时时间取 P99 × 安全系数，并限制在下限和上限（默认值）之间。
+样本不足时使用默认超时。
+
+等待超时说明实际耗时至少为超时时间（删失样本），按超时时间计入样本，
+使后续超时相应变长；连续超时达到 backoff_after 次时直接使用默认超时，
+直到再次成功等到为止。
+"""
+import json
+import os
+import threading
+from collections import deque
+
+# 样本在多次运行之间保存在这里，启动时即可使用历史数据
+DEFAULT_PATH = "latency_samples.json"
+
+
+def percentile(values, pct):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+class LatencyTracker:
+    """按等待对象记录实际耗时，给出自适应超时"""
+
+    def __init__(self, window=200, pct=99, factor=3.0, floor=0.5, min_samples=5, backoff_after=2,
+                 path=DEFAULT_PATH):
+        self.window = window
+        self.pct = pct
+        self.factor = factor
+        self.floor = floor
+        self.min_samples = min_samples
+        self.backoff_after = backoff_after
+        # 样本文件，为空时不加载也不保存
+        self.path = path
+        self.samples = {}
+        self.misses = {}
+        self.lock = threading.Lock()
+
+    def record(self, key, seconds, timed_out=False):
+        with self.lock:
+            samples = self.samples.get(key)
+            if samples is None:
+                samples = self.samples[key] = deque(maxlen=self.window)
+            samples.append(seconds)
+            if timed_out:
+                self.misses[key] = self.misses.get(key, 0) + 1
+            else:
+                self.misses.pop(key, None)
+
+    def record_timeout(self, key, timeout):
+        """记录一次超时（实际耗时不小于timeout）"""
+        self.record(key, timeout, timed_out=True)
+
+    def timeout_for(self, key, default):
+        """返回该等待对象的超时时间；default同时作为上限"""
+        with self.lock:
+            samples = list(self.samples.get(key, ()))
+            misses = self.misses.get(key, 0)
+        if len(samples) < self.min_samples or misses >= self.backoff_after:
+            return default
+        timeout = percentile(samples, self.pct) * self.factor
+        return min(default, max(self.floor, timeout))
+
+    def load(self, path=None):
+        """加载历史样本，文件不存在或损坏时忽略"""
+        path = path or self.path
+        if not path or not os.path.exists(path):
+            return False
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return False
+        for key, samples in data.items():
+            for seconds in samples[-self.window:]:
+                self.record(key, float(seconds))
+        return True
+
+    def save(self, path=None):
+        path = path or self.path
+        if not path:
+            return
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({k: [round(v, 4) for v in samples] for k, samples in self.snapshot().items()}, f)
+
+    def snapshot(self):
+        """各等待对象的样本副本"""
+        with self.lock:
+            return {key: list(samples) for key, samples in self.samples.items()}
+
+    def summary(self):
+        """各等待对象的样本数、P50、P99(秒)"""
+        return {
+            key: {"count": len(samples), "p50": percentile(samples, 50), "p99": percentile(samples, 99)}
+            for key, samples in self.snapshot().items()
+        }
@@ -0,0 +1,296 @@
+# -*- coding: utf-8 -*-
+"""按运行分段、压缩存档的日志和查询工具
+
+每次运行的日志以JSON行写入 runs/<运行编号>/events-NNN.jsonl，超过 SEGMENT_BYTES 时换下一段；
+每段写完即压缩为 .jsonl.gz。运行结束时在 runs/<运行编号>/index.json 中记录该次运行的
+时间范围、课程、各课程的选课结果、错误数，以及每一段涉及的课程和错误类别。
+每次运行只写自己的索引文件，同时运行的多个进程不会互相覆盖；查询时合并各次运行的索引
+（以及旧版本写入的 runs/index.json），先挑出相关的运行和分段，只解压这些分段。
+
+错误类别：带异常的日志为异常类型名，其余ERROR日志为发出日志的函数名（如wait_for_element）。
+
+用法:
+    python log_archive.py list                                 # 各次运行概况
+    python log_archive.py query --run 20250220-120000-1234     # 某次运行的全部日志
+    python log_archive.py query --course CP00006 --level WARNING
+    python log_archive.py query --error TimeoutException
+"""
+import argparse
+import atexit
+import gzip
+import json
+import os
+import shutil
+import threading
+import traceback
+from collections import Counter, defaultdict
+from datetime import datetime
+
+from loguru import logger
+
+from runs import RUNS_DIR
+
+# 旧版本的合并索引；各次运行的索引在它所在目录的 <运行编号>/index.json
+INDEX_PATH = os.path.join(RUNS_DIR, "index.json")
+RUN_INDEX = "index.json"
+SEGMENT_BYTES = 20 * 1024 * 1024
+
+LEVELS = {"TRACE": 5, "DEBUG": 10, "INFO": 20, "SUCCESS": 25, "WARNING": 30, "ERROR": 40, "CRITICAL": 50}
+
+
+def error_class(record):
+    """ERROR及以上日志的错误类别，其余返回None"""
+    if record["exception"] is not None and record["exception"].type is not None:
+        return record["exception"].type.__name__
+    if record["level"].no >= LEVELS["ERROR"]:
+        return record["function"]
+    return None
+
+
+def _read_index(path):
+    if not os.path.exists(path):
+        return {}
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def load_index(path=INDEX_PATH):
+    """合并path和同目录下各运行目录中的索引"""
+    index = _read_index(path)
+    base = os.path.dirname(path) or "."
+    if os.path.isdir(base):
+        for name in sorted(os.listdir(base)):
+            run_index = os.path.join(base, name, RUN_INDEX)
+            if os.path.isfile(run_index):
+                index.update(_read_index(run_index))
+    return index
+
+
+def save_index(index, path=INDEX_PATH):
+    """先写临时文件再替换，避免中途退出留下损坏的索引"""
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    temp = path + ".tmp"
+    with open(temp, "w", encoding="utf-8") as f:
+        json.dump(index, f, ensure_ascii=False, indent=1)
+    os.replace(temp, path)
+
+
+class LogArchive:
+    """把一次运行的日志写入运行目录下的分段文件，结束时压缩并写入该运行的索引
+
+    index_path为合并索引的位置，条目中的运行目录相对于它所在的目录
+    """
+
+    def __init__(self, directory, run_id, context=None, segment_bytes=SEGMENT_BYTES, index_path=INDEX_PATH):
+        self.directory = directory
+        self.run_id = run_id
+        # context() 返回 (当前课程标识, 当前阶段)，写入每条日志
+        self.context = context or (lambda: (None, None))
+        self.segment_bytes = segment_bytes
+        self.index_path = index_path
+        self.lock = threading.Lock()
+        self.handler_id = None
+        self.file = None
+        self.segments = []
+        self.segment = None
+        self.courses = []
+        self.outcomes = defaultdict(Counter)
+        self.levels = Counter()
+        self.errors = Counter()
+        self.start_time = None
+        self.end_time = None
+
+    def start(self, level="DEBUG"):
+        self.start_time = datetime.now().timestamp()
+        self._open_segment()
+        self.handler_id = logger.add(self.write, level=level, format="{message}")
+        atexit.register(self.close)
+        return self
+
+    def _open_segment(self):
+        name = f"events-{len(self.segments):03d}.jsonl"
+        self.file = open(os.path.join(self.directory, name), "w", encoding="utf-8")
+        self.segment = {"file": name, "start": None, "end": None, "events": 0, "bytes": 0,
+                        "courses": set(), "errors": set()}
+
+    def _close_segment(self):
+        """关闭当前分段并压缩"""
+        self.file.close()
+        self.file = None
+        path = os.path.join(self.directory, self.segment["file"])
+        if not self.segment["events"]:
+            os.remove(path)
+            return
+        with open(path, "rb") as src, gzip.open(path + ".gz", "wb") as dst:
+            shutil.copyfileobj(src, dst)
+        os.remove(path)
+        segment = dict(self.segment, file=self.segment["file"] + ".gz",
+                       courses=sorted(self.segment["courses"]), errors=sorted(self.segment["errors"]))
+        segment.pop("bytes")
+        self.segments.append(segment)
+
+    def write(self, message):
+        """loguru的sink：每条日志写成一行JSON"""
+        record = message.record
+        course, phase = self.context()
+        event = {
+            "t": record["time"].timestamp(),
+            "level": record["level"].name,
+            "msg": record["message"],
+            "fn": record["function"],
+            "line": record["line"],
+            "course": course,
+            "phase": phase,
+        }
+        cls = error_class(record)
+        if cls:
+            event["error"] = cls
+        if record["exception"] is not None:
+            exc = record["exception"]
+            event["exc"] = "".join(traceback.format_exception(exc.type, exc.value, exc.traceback))
+        line = json.dumps(event, ensure_ascii=False) + "\n"
+
+        with self.lock:
+            if self.file is None:
+                return
+            self.file.write(line)
+            self.file.flush()
+            segment = self.segment
+            segment["start"] = segment["start"] or event["t"]
+            segment["end"] = event["t"]
+            segment["events"] += 1
+            segment["bytes"] += len(line.encode("utf-8"))
+            if course:
+                segment["courses"].add(course)
+            self.levels[event["level"]] += 1
+            if cls:
+                segment["errors"].add(cls)
+                self.errors[cls] += 1
+            if segment["bytes"] >= self.segment_bytes:
+                self._close_segment()
+                self._open_segment()
+
+    def note_courses(self, keys):
+        self.courses = list(keys)
+
+    def note_outcome(self, key, outcome):
+        with self.lock:
+            self.outcomes[key][outcome] += 1
+
+    def close(self, summary=None):
+        """停止记录、压缩最后一段并写入运行目录下的索引；可重复调用"""
+        if self.handler_id is None:
+            return
+        logger.remove(self.handler_id)
+        self.handler_id = None
+        with self.lock:
+            self._close_segment()
+        self.end_time = datetime.now().timestamp()
+        entry = {
+            # 相对于索引文件所在目录
+            "dir": os.path.relpath(self.directory, os.path.dirname(os.path.abspath(self.index_path))),
+            "start": self.start_time,
+            "end": self.end_time,
+            "courses": self.courses,
+            "outcomes": {key: dict(counts) for key, counts in self.outcomes.items()},
+            "summary": summary,
+            "levels": dict(self.levels),
+            "errors": dict(self.errors),
+            "segments": self.segments,
+        }
+        try:
+            save_index({self.run_id: entry}, os.path.join(self.directory, RUN_INDEX))
+        except OSError as e:
+            logger.warning(f"写入日志索引失败: {str(e)}")
+
+
+def read_segment(path):
+    opener = gzip.open if path.endswith(".gz") else open
+    with opener(path, "rt", encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
+
+
+def query(index, run=None, course=None, error=None, level=None, index_path=INDEX_PATH):
+    """按条件返回 (运行编号, 日志) ；先按索引跳过不含该课程/错误类别的运行和分段"""
+    base = os.path.dirname(os.path.abspath(index_path))
+    min_level = LEVELS.get((level or "TRACE").upper(), 0)
+    for run_id, entry in sorted(index.items(), key=lambda item: item[1]["start"]):
+        if run and run_id != run:
+            continue
+        if course and not any(course in key for key in entry["courses"]):
+            continue
+        if error and error not in entry["errors"]:
+            continue
+        for segment in entry["segments"]:
+            if course and not any(course in key for key in segment["courses"]):
+                continue
+            if error and error not in segment["errors"]:
+                continue
+            for event in read_segment(os.path.join(base, entry["dir"], segment["file"])):
+                if course and course not in (event.get("course") or ""):
+                    continue
+                if error and event.get("error") != error:
+                    continue
+                if LEVELS.get(event["level"], 0) < min_level:
+                    continue
+                yield run_id, event
+
+
+def format_time(timestamp):
+    return datetime.fromtimestamp(timestamp).strftime("%Y-%m-%d %H:%M:%S")
+
+
+def print_runs(index):
+    print(f"{'运行编号':<26}{'开始时间':<21}{'时长':>8}{'课程':>6}  {'选中':>4}{'错误':>6}  主要错误")
+    for run_id, entry in sorted(index.items(), key=lambda item: item[1]["start"]):
+        duration = entry["end"] - entry["start"]
+        selected = len((entry.get("summary") or {}).get("selected", []))
+        errors = sum(entry["errors"].values())
+        top = "，".join(f"{cls}×{n}" for cls, n in Counter(entry["errors"]).most_common(3))
+        print(f"{run_id:<26}{format_time(entry['start']):<21}{duration:>7.0f}s{len(entry['courses']):>6}  "
+              f"{selected:>4}{errors:>6}  {top}")
+
+
+def print_event(run_id, event, show_run):
+    prefix = f"{run_id} " if show_run else ""
+    course = f"[{event['course']}] " if event.get("course") else ""
+    time_text = datetime.fromtimestamp(event["t"]).strftime("%Y-%m-%d %H:%M:%S.%f")[:-3]
+    print(f"{prefix}{time_text} {event['level']:<8} {course}{event['msg']}")
+    if event.get("exc"):
+        print(event["exc"].rstrip())
+
+
+def main():
+    parser = argparse.ArgumentParser(description="按运行存档的日志查询")
+    parser.add_argument("--index", default=INDEX_PATH, help="合并索引路径，同时读取同目录下各运行目录中的索引")
+    sub = parser.add_subparsers(dest="command", required=True)
+    sub.add_parser("list", help="列出各次运行")
+    q = sub.add_parser("query", help="按运行、课程、错误类别查询日志")
+    q.add_argument("--run", help="运行编号")
+    q.add_argument("--course", help="课程标识（课程编号或 名称|教师，可只写一部分）")
+    q.add_argument("--error", help="错误类别（见list中的主要错误）")
+    q.add_argument("--level", help="最低日志级别，如WARNING")
+    args = parser.parse_args()
+
+    index = load_index(args.index)
+    if not index:
+        print(f"没有已存档的运行: {args.index}")
+        return 1
+    if args.command == "list":
+        print_runs(index)
+        return 0
+    count = 0
+    for run_id, event in query(index, args.run, args.course, args.error, args.level, args.index):
+        print_event(run_id, event, show_run=not args.run)
+        count += 1
+    print(f"\n共 {count} 条")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
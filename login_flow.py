@@ -0,0 +1,77 @@
+# -*- coding: utf-8 -*-
+"""登录和进入选课系统的页面状态
+
+原来的流程按固定顺序逐个等待元素：登录表单的三个元素、点击后立刻检查错误提示、
+再依次等待三个"进入选课"按钮，其中可选的第三步不存在时总要等满超时。
+这里改为每次用一个脚本判断页面当前处于哪一步，等待"其中任一状态出现"，
+再执行该状态对应的操作，直到进入选课页面或出现错误：
+
+    login_form  登录表单          -> 填写并提交
+    error       登录错误提示      -> 失败
+    main        学生首页          -> 点击"进入选课"（已知选课地址时直接打开）
+    rounds      选课轮次列表      -> 点击该轮次的"进入选课"，并记住其地址
+    confirm     选课说明页        -> 点击"进入选课"
+    selection   选课页面          -> 完成
+"""
+LOGIN_FORM = "login_form"
+ERROR = "error"
+MAIN = "main"
+ROUNDS = "rounds"
+CONFIRM = "confirm"
+SELECTION = "selection"
+
+# 提交登录或点击进入后等待的状态（不包括刚离开的状态）
+ENTRY_STATES = (ERROR, MAIN, ROUNDS, CONFIRM, SELECTION)
+
+# 页面状态按以下顺序判断：选课轮次页和选课说明页上也有"进入选课"链接，要先于首页判断
+LOGIN_STATE_JS = """
+if (document.readyState === 'loading') { return null; }
+function xpath(path) {
+    return document.evaluate(path, document, null, XPathResult.FIRST_ORDERED_NODE_TYPE, null).singleNodeValue;
+}
+var error = document.querySelector('.el-message--error');
+if (error && error.innerText.trim()) { return {state: 'error', message: error.innerText.trim()}; }
+if (document.getElementById('j_username')) { return {state: 'login_form'}; }
+var rounds = xpath("//*[@id='attend_class']/tbody/tr[2]/td[4]/a");
+if (rounds) { return {state: 'rounds', target: rounds, href: rounds.href, page: location.href}; }
+var confirm = xpath('/html/body/form/div/div/input[2]');
+if (confirm) { return {state: 'confirm', target: confirm}; }
+var path = location.pathname;
+if (path.indexOf('/jsxsd/xsxk/xsxk_index') === 0 || path.indexOf('/jsxsd/xsxkkc/') === 0) {
+    return {state: 'selection'};
+}
+var links = document.getElementsByTagName('a');
+for (var i = 0; i < links.length; i++) {
+    if (links[i].innerText.indexOf('选课') >= 0) {
+        return {state: 'main', target: links[i], href: links[i].href, page: location.href};
+    }
+}
+return null;
+"""
+
+# 填写登录表单并点击登录；点击放到setTimeout中，避免页面跳转打断脚本返回
+LOGIN_SUBMIT_JS = """
+var values = {j_username: arguments[0], j_password: arguments[1]};
+var button = document.getElementById('loginButton');
+if (!button) { return false; }
+for (var id in values) {
+    var el = document.getElementById(id);
+    if (!el) { return false; }
+    el.value = values[id];
+    el.dispatchEvent(new Event('input', {bubbles: true}));
+    el.dispatchEvent(new Event('change', {bubbles: true}));
+}
+setTimeout(function () { button.click(); }, 0);
+return true;
+"""
+
+
+def is_link(href, page=None):
+    """能直接打开的链接
+
+    javascript:链接需要点击；href="#"等指向当前页面（与page只差#后的部分）的链接
+    由页面脚本处理点击，直接打开只会重新加载当前页面，同样需要点击。
+    """
+    if not href or not href.lower().startswith(("http://", "https://")):
+        return False
+    return not page or href.split("#")[0] != page.split("#")[0]
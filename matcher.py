@@ -0,0 +1,134 @@
+# -*- coding: utf-8 -*-
+"""课程名称/教师姓名的归一化模糊匹配
+
+统一全角半角、空白、标点以及罗马数字/阿拉伯数字写法，为结果表格中的
+每一行预先计算n-gram键，按课程名称、教师和上课时间综合打分排序。
+只有三者同时可信时才认为匹配成功，避免点错课程再退课重选。
+"""
+import re
+import unicodedata
+from collections import namedtuple
+from functools import lru_cache
+
+ROMAN_NUMERALS = {"i": "1", "ii": "2", "iii": "3", "iv": "4", "v": "5",
+                  "vi": "6", "vii": "7", "viii": "8", "ix": "9", "x": "10"}
+CHINESE_NUMERALS = {"一": "1", "二": "2", "三": "3", "四": "4", "五": "5",
+                    "六": "6", "七": "7", "八": "8", "九": "9", "十": "10"}
+
+ROMAN_RE = re.compile(r"(?<![a-z])(viii|vii|iii|ix|iv|vi|ii|x|v|i)(?![a-z])")
+BRACKETED_CHINESE_RE = re.compile(r"[(\[]([一二三四五六七八九十])[)\]]")
+STRIP_RE = re.compile(r"[\s\W_]+")
+TEACHER_SPLIT_RE = re.compile(r"[,，、;；/\s]+")
+
+# 可信匹配的阈值
+NAME_THRESHOLD = 0.85
+TEACHER_THRESHOLD = 0.8
+
+# 综合得分中各项的权重
+WEIGHTS = {"name": 0.5, "teacher": 0.3, "time": 0.2}
+
+Match = namedtuple("Match", "score row name_score teacher_score time_score confident")
+
+
+def query_text(text):
+    """提交给教务系统查询的文字：只统一全角半角并去掉空白"""
+    return re.sub(r"\s+", "", unicodedata.normalize("NFKC", text or ""))
+
+
+@lru_cache(maxsize=4096)
+def normalize(text):
+    """归一化课程名称/教师姓名，用于比较"""
+    text = unicodedata.normalize("NFKC", text or "").lower()
+    text = BRACKETED_CHINESE_RE.sub(lambda m: CHINESE_NUMERALS[m.group(1)], text)
+    text = ROMAN_RE.sub(lambda m: ROMAN_NUMERALS[m.group(1)], text)
+    return STRIP_RE.sub("", text)
+
+
+@lru_cache(maxsize=4096)
+def ngrams(text, n=2):
+    if len(text) <= n:
+        return frozenset([text]) if text else frozenset()
+    return frozenset(text[i:i + n] for i in range(len(text) - n + 1))
+
+
+def similarity(a_norm, a_keys, b_norm, b_keys):
+    """Dice系数；归一化后完全相同记为1"""
+    if a_norm == b_norm:
+        return 1.0
+    if not a_keys or not b_keys:
+        return 0.0
+    return 2 * len(a_keys & b_keys) / (len(a_keys) + len(b_keys))
+
+
+def _section(value):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+class MatchIndex:
+    """对一组已解析的课程行建立匹配索引"""
+
+    def __init__(self, rows):
+        self.entries = []
+        for row in rows:
+            name = normalize(row.get("course_name"))
+            teachers = [normalize(t) for t in TEACHER_SPLIT_RE.split(row.get("teacher") or "") if t.strip()]
+            self.entries.append((row, name, ngrams(name), [(t, ngrams(t)) for t in teachers]))
+
+    def __len__(self):
+        return len(self.entries)
+
+    def rank(self, course, limit=5):
+        """返回按综合得分降序排列的候选匹配"""
+        name = normalize(course.get("course_name"))
+        name_keys = ngrams(name)
+        teacher = normalize(course.get("teacher"))
+        teacher_keys = ngrams(teacher)
+        course_id = (course.get("course_id") or "").strip().upper()
+
+        matches = []
+        for row, row_name, row_keys, row_teachers in self.entries:
+            row_id = (row.get("course_id") or "").strip().upper()
+            if course_id and row_id and course_id != row_id:
+                continue
+            name_score = similarity(name, name_keys, row_name, row_keys)
+            if not teacher:
+                teacher_score = 1.0
+            else:
+                teacher_score = max((similarity(teacher, teacher_keys, t, k) for t, k in row_teachers), default=0.0)
+            time_score = self.time_score(course, row)
+            score = (WEIGHTS["name"] * name_score + WEIGHTS["teacher"] * teacher_score
+                     + WEIGHTS["time"] * (0.5 if time_score is None else time_score))
+            confident = (name_score >= NAME_THRESHOLD and teacher_score >= TEACHER_THRESHOLD
+                         and time_score == 1.0)
+            matches.append(Match(score, row, name_score, teacher_score, time_score, confident))
+        matches.sort(key=lambda m: (m.confident, m.score), reverse=True)
+        return matches[:limit]
+
+    def best(self, course):
+        """返回最可信的匹配，没有可信匹配时返回None"""
+        for match in self.rank(course, limit=1):
+            if match.confident:
+                return match
+        return None
+
+    @staticmethod
+    def time_score(course, row):
+        """上课时间一致为1，不一致为0，表格中无法解析时返回None"""
+        weekday = course.get("time")
+        start, end = _section(course.get("start_section")), _section(course.get("end_section"))
+        if not weekday and start is None:
+            return 1.0
+        slots = row.get("slots") or [(row.get("weekday"), row.get("start_section"), row.get("end_section"))]
+        slots = [slot for slot in slots if slot[0] is not None or slot[1] is not None]
+        if not slots:
+            return None
+        for slot_weekday, slot_start, slot_end in slots:
+            if weekday and slot_weekday != weekday:
+                continue
+            if start is not None and (slot_start, slot_end) != (start, end):
+                continue
+            return 1.0
+        return 0.0
@@ -0,0 +1,163 @@
+# -*- coding: utf-8 -*-
+"""本地指标接口（Prometheus文本格式）
+
+选课线程只更新内存中的计数器，HTTP服务在后台线程中读取并输出，
+不会访问浏览器，也不会给选课线程增加负担。只监听127.0.0.1。
+"""
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+DEFAULT_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n")
+
+
+def _labels(labels):
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in labels) + "}"
+
+
+def _number(value):
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Metrics:
+    """计数器、仪表和直方图的线程安全注册表"""
+
+    def __init__(self, prefix="sztu_"):
+        self.prefix = prefix
+        self.lock = threading.Lock()
+        self.types = {}
+        self.help = {}
+        self.values = {}       # (name, labels) -> 数值
+        self.histograms = {}   # (name, labels) -> [各桶计数, 总和, 次数]
+        self.buckets = {}
+        self.callbacks = {}    # name -> 输出时计算的函数
+
+    def describe(self, name, kind, text, buckets=DEFAULT_BUCKETS):
+        self.types[name] = kind
+        self.help[name] = text
+        if kind == "histogram":
+            self.buckets[name] = tuple(buckets)
+
+    def inc(self, name, value=1, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self.lock:
+            self.values[key] = self.values.get(key, 0) + value
+
+    def set(self, name, value, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self.lock:
+            self.values[key] = value
+
+    def set_function(self, name, func):
+        """输出时调用func()得到仪表值（如距上次成功轮询的秒数）"""
+        self.callbacks[name] = func
+
+    def observe(self, name, value, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        buckets = self.buckets.get(name, DEFAULT_BUCKETS)
+        with self.lock:
+            hist = self.histograms.get(key)
+            if hist is None:
+                hist = self.histograms[key] = [[0] * len(buckets), 0.0, 0]
+            for i, bound in enumerate(buckets):
+                if value <= bound:
+                    hist[0][i] += 1
+            hist[1] += value
+            hist[2] += 1
+
+    def get(self, name, **labels):
+        with self.lock:
+            return self.values.get((name, tuple(sorted(labels.items()))), 0)
+
+    def render(self):
+        """输出Prometheus文本格式"""
+        with self.lock:
+            values = dict(self.values)
+            histograms = {k: (list(v[0]), v[1], v[2]) for k, v in self.histograms.items()}
+        for name, func in self.callbacks.items():
+            try:
+                result = func()
+            except Exception:
+                continue
+            if result is not None:
+                values[(name, ())] = result
+
+        lines = []
+        names = sorted({k[0] for k in values} | {k[0] for k in histograms})
+        for name in names:
+            full = self.prefix + name
+            if name in self.help:
+                lines.append(f"# HELP {full} {self.help[name]}")
+            lines.append(f"# TYPE {full} {self.types.get(name, 'untyped')}")
+            for (metric, labels), value in sorted(values.items()):
+                if metric == name:
+                    lines.append(f"{full}{_labels(labels)} {_number(value)}")
+            for (metric, labels), (counts, total, count) in sorted(histograms.items()):
+                if metric != name:
+                    continue
+                for bound, bucket_count in zip(self.buckets.get(name, DEFAULT_BUCKETS), counts):
+                    lines.append(f"{full}_bucket{_labels(labels + (('le', _number(bound)),))} {bucket_count}")
+                lines.append(f"{full}_bucket{_labels(labels + (('le', '+Inf'),))} {count}")
+                lines.append(f"{full}_sum{_labels(labels)} {total}")
+                lines.append(f"{full}_count{_labels(labels)} {count}")
+        return "\n".join(lines) + "\n"
+
+
+def start_server(metrics, port, host="127.0.0.1"):
+    """在后台线程中启动 /metrics 接口，返回HTTP服务对象"""
+
+    class Handler(BaseHTTPRequestHandler):
+        def log_message(self, format, *args):
+            pass
+
+        def do_GET(self):
+            if self.path.split("?")[0] not in ("/", "/metrics"):
+                self.send_response(404)
+                self.end_headers()
+                return
+            body = metrics.render().encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+    httpd = ThreadingHTTPServer((host, port), Handler)
+    threading.Thread(target=httpd.serve_forever, name="metrics-server", daemon=True).start()
+    return httpd
+
+
+def selection_metrics():
+    """选课循环使用的指标定义"""
+    metrics = Metrics()
+    metrics.describe("rounds_completed_total", "counter", "已完成的选课轮数")
+    metrics.describe("course_attempts_total", "counter", "每门课程的尝试次数")
+    metrics.describe("course_outcomes_total", "counter", "每门课程的选课结果（按结果类别）")
+    metrics.describe("phase_duration_seconds", "histogram", "各阶段耗时")
+    metrics.describe("webdriver_commands_total", "counter", "发送给chromedriver的命令数（按阶段）")
+    metrics.describe("webdriver_commands_last_round", "gauge", "上一轮发送的WebDriver命令数")
+    metrics.describe("chrome_js_heap_used_bytes", "gauge", "Chrome页面JS堆已用内存")
+    metrics.describe("courses_selected", "gauge", "已选中的课程数")
+    metrics.describe("relogins_total", "counter", "重新登录次数（按原因）")
+    metrics.describe("time_to_selection_seconds", "histogram", "从打开教务系统到进入选课页面的耗时")
+    metrics.describe("rate_limit_wait_seconds", "histogram", "等待请求令牌的时间（按请求类型）")
+    metrics.describe("rate_limit_tokens", "gauge", "限流器当前可用的令牌数")
+    metrics.describe("seconds_since_last_poll", "gauge", "距上次成功查询结果的秒数")
+    metrics.set("courses_selected", 0)
+    return metrics
+
+
+def since(timestamp_getter):
+    """生成"距某时刻多少秒"的仪表函数"""
+    def value():
+        timestamp = timestamp_getter()
+        return None if timestamp is None else round(time.time() - timestamp, 3)
+    return value
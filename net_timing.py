@@ -0,0 +1,143 @@
+# -*- coding: utf-8 -*-
+"""基于Chrome性能日志的请求级网络耗时统计
+
+开启 goog:loggingPrefs 中的 performance 日志后，chromedriver 会记录CDP的
+Network.* 事件。这里按阶段收集发往教务系统和统一认证的每个请求的
+DNS、建连、TLS、首字节(TTFB)和下载耗时，用于判断慢在服务器还是本地。
+"""
+import json
+from urllib.parse import urlparse
+from loguru import logger
+
+TRACKED_HOSTS = ("jwxt.sztu.edu.cn", "auth.sztu.edu.cn")
+TIMING_FIELDS = ("dns", "connect", "tls", "ttfb", "download", "total")
+
+
+def enable_performance_log(options):
+    """在ChromeOptions中开启性能日志"""
+    options.set_capability("goog:loggingPrefs", {"performance": "ALL"})
+
+
+def _span(timing, start, end):
+    """计算CDP ResourceTiming中两个时间点的差值(ms)，未发生的阶段为0"""
+    if timing.get(start, -1) < 0 or timing.get(end, -1) < 0:
+        return 0.0
+    return max(0.0, timing[end] - timing[start])
+
+
+def _percentile(values, pct):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+class NetworkTimingCollector:
+    """收集并汇总每个请求的网络耗时"""
+
+    def __init__(self, hosts=TRACKED_HOSTS):
+        self.hosts = tuple(hosts)
+        self.pending = {}
+        self.records = []
+
+    def tracked(self, url):
+        host = urlparse(url).hostname or ""
+        return any(host == h or host.endswith("." + h) for h in self.hosts)
+
+    def drain(self, driver, phase):
+        """读取并清空性能日志缓冲区，将其中的请求归入指定阶段"""
+        try:
+            entries = driver.get_log("performance")
+        except Exception as e:
+            logger.debug(f"读取性能日志失败: {str(e)}")
+            return
+        for entry in entries:
+            try:
+                message = json.loads(entry["message"])["message"]
+            except (KeyError, ValueError):
+                continue
+            self.handle_event(message.get("method"), message.get("params", {}), phase)
+
+    def handle_event(self, method, params, phase):
+        request_id = params.get("requestId")
+        if method == "Network.requestWillBeSent" and "redirectResponse" in params:
+            # 重定向的上一跳没有 loadingFinished 事件，直接结算
+            response = params["redirectResponse"]
+            if self.tracked(response.get("url", "")):
+                record = self._record(response, phase)
+                record["download"] = 0.0
+                self._finish(record)
+        elif method == "Network.responseReceived":
+            response = params.get("response", {})
+            if self.tracked(response.get("url", "")):
+                self.pending[request_id] = self._record(response, phase)
+        elif method == "Network.loadingFinished":
+            record = self.pending.pop(request_id, None)
+            if record:
+                if record["request_time"] is not None:
+                    finished_ms = (params.get("timestamp", 0) - record["request_time"]) * 1000
+                    record["download"] = max(0.0, finished_ms - record["headers_end"])
+                self._finish(record)
+        elif method == "Network.loadingFailed":
+            record = self.pending.pop(request_id, None)
+            if record:
+                record["failed"] = params.get("errorText", "failed")
+                self._finish(record)
+
+    def _record(self, response, phase):
+        timing = response.get("timing") or {}
+        tls = _span(timing, "sslStart", "sslEnd")
+        return {
+            "phase": phase,
+            "url": response.get("url", ""),
+            "status": response.get("status"),
+            "request_time": timing.get("requestTime"),
+            "headers_end": timing.get("receiveHeadersEnd", 0.0),
+            "dns": _span(timing, "dnsStart", "dnsEnd"),
+            # connectStart..connectEnd 包含TLS握手，这里只保留TCP部分
+            "connect": max(0.0, _span(timing, "connectStart", "connectEnd") - tls),
+            "tls": tls,
+            "ttfb": _span(timing, "sendEnd", "receiveHeadersEnd"),
+            "download": 0.0,
+        }
+
+    def _finish(self, record):
+        record["total"] = record["headers_end"] + record["download"]
+        self.records.append(record)
+        logger.debug(
+            f"[网络] {record['phase']} {record['status']} {record['url']} "
+            f"dns={record['dns']:.0f} connect={record['connect']:.0f} tls={record['tls']:.0f} "
+            f"ttfb={record['ttfb']:.0f} download={record['download']:.0f}ms"
+        )
+
+    def summary(self):
+        """按阶段汇总：请求数以及各耗时项的平均值/P50/P95(ms)"""
+        phases = {}
+        for record in self.records:
+            phases.setdefault(record["phase"], []).append(record)
+        result = {}
+        for phase, records in phases.items():
+            stats = {"requests": len(records), "failed": sum(1 for r in records if r.get("failed"))}
+            for field in TIMING_FIELDS:
+                values = [r[field] for r in records]
+                stats[field] = {
+                    "mean": sum(values) / len(values),
+                    "p50": _percentile(values, 50),
+                    "p95": _percentile(values, 95),
+                }
+            result[phase] = stats
+        return result
+
+    def log_summary(self):
+        summary = self.summary()
+        if not summary:
+            logger.info("网络耗时统计: 未记录到教务系统请求")
+            return summary
+        logger.info("网络耗时统计 (平均/P95, ms):")
+        for phase, stats in summary.items():
+            parts = " ".join(
+                f"{field}={stats[field]['mean']:.0f}/{stats[field]['p95']:.0f}" for field in TIMING_FIELDS
+            )
+            logger.info(f"  {phase:<10} 请求数={stats['requests']} 失败={stats['failed']} {parts}")
+        return summary
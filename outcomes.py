@@ -0,0 +1,67 @@
+# -*- coding: utf-8 -*-
+"""选课结果分类与重试策略
+
+教务系统的选课结果只以弹窗文字返回，这里把结果文字归入少量类别，
+每个类别对应一种重试策略，避免对永久性失败（时间冲突、学分上限等）反复重试。
+"""
+import re
+
+SUCCESS = "success"                  # 选课成功
+FULL = "full"                        # 人数已满
+CONFLICT = "conflict"                # 时间冲突
+NOT_OPEN = "not_open"                # 不在选课时间/未开放
+LIMIT = "limit"                      # 学分/门数上限、先修要求等限制
+ALREADY_SELECTED = "already_selected"  # 已经选上（如结果弹窗丢失后重复提交）
+SESSION_EXPIRED = "session_expired"  # 登录状态失效
+UNKNOWN = "unknown"                  # 无法识别（含未弹出结果）
+
+ALL_OUTCOMES = (SUCCESS, FULL, CONFLICT, NOT_OPEN, LIMIT, ALREADY_SELECTED, SESSION_EXPIRED, UNKNOWN)
+
+# 重试策略
+DONE = "done"        # 已完成，不再处理
+RETRY = "retry"      # 下一轮继续尝试
+STOP = "stop"        # 永久失败，停止该课程
+RELOGIN = "relogin"  # 重新登录后继续
+
+RETRY_POLICY = {
+    SUCCESS: DONE,
+    FULL: RETRY,
+    CONFLICT: STOP,
+    NOT_OPEN: STOP,
+    LIMIT: STOP,
+    ALREADY_SELECTED: DONE,
+    SESSION_EXPIRED: RELOGIN,
+    UNKNOWN: RETRY,
+}
+
+# 按顺序匹配关键字（正则表达式），先命中的类别优先。
+# 人数类的"超过/上限"属于人数已满（下一轮还可能有空位），要先于学分/门数上限判断；
+# 已选上只认具体说法，且放在学分/门数上限之后，避免"已选学分已达上限"等被当作已选上
+RESULT_KEYWORDS = (
+    (SESSION_EXPIRED, ("登录超时", "重新登录", "未登录", "登录已过期", "会话已过期", "会话失效", "session")),
+    (FULL, ("人数已满", "已满", "选满", "无余量", "没有余量", "容量不足", "超过课程容量", "人数已达上限",
+            "最大可选人数", "人数超过")),
+    (CONFLICT, ("冲突",)),
+    (NOT_OPEN, ("不在选课时间", "未开放", "尚未开始", "已经结束", "已结束", "未到选课时间", "选课时间")),
+    (LIMIT, ("学分上限", "门数上限", "学分超过", "门数超过", "超过学分", "超过门数", "已达上限", "最高限制",
+             "超[出过].{0,10}限制", "先修", "不允许", "限选", "不满足")),
+    (ALREADY_SELECTED, ("已选过", "重复选", "已选择该课程", "已选该课程", "该课程已选")),
+)
+
+
+def classify_result(text):
+    """根据结果弹窗文字判断选课结果类别"""
+    if not text:
+        return UNKNOWN
+    text = text.strip()
+    if "成功" in text and "失败" not in text and "不成功" not in text:
+        return SUCCESS
+    lowered = text.lower()
+    for outcome, keywords in RESULT_KEYWORDS:
+        if any(re.search(keyword, lowered) for keyword in keywords):
+            return outcome
+    return UNKNOWN
+
+
+def retry_policy(outcome):
+    return RETRY_POLICY.get(outcome, RETRY)
@@ -0,0 +1,280 @@
+# -*- coding: utf-8 -*-
+"""选课配置的耗时预估（不启动浏览器）
+
+读取课程配置，按选课循环的实际顺序（scheduler.py排出的检查顺序、rate_limit.py的令牌桶）
+在虚拟时钟上模拟若干轮：每检查一门课程依次是登录状态检查（有最小间隔）、切换选课类型、
+查询、读取表格和刷新页面。每一步的耗时来自延迟模型：
+    latency_samples.json    以往运行记录的页面跳转(page)和查询结果(results)等待耗时
+    --commands FILE         bench_commands.py --json 输出的WebDriver命令数和耗时（可选）
+没有历史数据时使用保守的默认值。输出每轮预计耗时、每轮请求数和每门课程的检查间隔，
+可在选课开始前调整课程顺序、优先级和运行选项。
+
+这里假设没有课程出现空位（不提交选课、没有已知教学班可直接提交），即开放前反复查询的状态。
+
+用法:
+    python planner.py courses.json
+    python planner.py courses.json --rate 60 --multi-window
+    python run.py --config courses.json --dry-run
+"""
+import argparse
+import json
+import os
+import statistics
+import time
+from collections import Counter, defaultdict
+
+from dotenv import load_dotenv
+
+from latency import LatencyTracker, DEFAULT_PATH as LATENCY_PATH, percentile
+from rate_limit import TokenBucket
+from scheduler import CourseScheduler, parse_deadline, course_key
+from settings import env_flag
+
+# 没有历史样本时的等待耗时（秒）
+DEFAULT_LATENCY = {"page": 1.0, "results": 0.6, "probe": 0.2}
+# 每个非页面加载WebDriver命令的耗时（本机chromedriver）
+DEFAULT_COMMAND_SECONDS = 0.02
+# 每检查一门课程各阶段的命令数（一次脚本填写查询表单）
+DEFAULT_COMMANDS = {"navigate": 3, "search": 2, "verify": 2, "refresh": 1}
+# 逐个字段查询（BATCH_SEARCH=0）的命令数和随机等待的平均值
+STEPWISE_COMMANDS = 20
+STEPWISE_SLEEP = 2.95
+# 这些命令会等待页面加载，已计入page耗时
+PAGE_LOAD_COMMANDS = ("get", "refresh")
+
+
+class VirtualClock:
+    """模拟用的时钟，sleep只推进时间"""
+
+    def __init__(self, start):
+        self.now = start
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += seconds
+
+
+class LatencyModel:
+    """各步骤的预计耗时，pct为使用的分位数（50为典型，90为较慢的情况）"""
+
+    def __init__(self, samples=None, commands=None, pct=50):
+        self.pct = pct
+        self.samples = samples or {}
+        self.commands = dict(DEFAULT_COMMANDS)
+        self.command_seconds = DEFAULT_COMMAND_SECONDS
+        self.sources = []
+        if self.samples:
+            self.sources.append("latency_samples")
+        if commands:
+            self._load_commands(commands)
+
+    def _load_commands(self, stats):
+        per_check = {k: v for k, v in stats.get("per_check", {}).items() if k != "total"}
+        if per_check:
+            self.commands.update(per_check)
+        timed = [item for item in stats.get("commands", []) if item["command"] not in PAGE_LOAD_COMMANDS]
+        count = sum(item["count"] for item in timed)
+        if count:
+            self.command_seconds = sum(item["seconds"] for item in timed) / count
+        self.sources.append("commands")
+
+    def wait(self, key):
+        samples = self.samples.get(key)
+        if samples:
+            return percentile(samples, self.pct)
+        return DEFAULT_LATENCY[key]
+
+    def commands_time(self, phase, count=None):
+        return (self.commands.get(phase, 0) if count is None else count) * self.command_seconds
+
+
+def load_samples(path=LATENCY_PATH):
+    tracker = LatencyTracker()
+    tracker.load(path)
+    return tracker.snapshot()
+
+
+def load_commands(path):
+    if not path:
+        return None
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def options_from_env():
+    """与auto_course相同的运行选项"""
+    return {
+        "multi_window": env_flag("MULTI_WINDOW"),
+        "batch_search": env_flag("BATCH_SEARCH", True),
+        "rate": float(os.getenv("REQUEST_RATE") or 30),
+        "burst": int(os.getenv("REQUEST_BURST") or 5),
+        "session_check": float(os.getenv("SESSION_CHECK_INTERVAL") or 30),
+    }
+
+
+def simulate(courses, model, options, rounds=10, start=None):
+    """模拟rounds轮选课循环，返回每轮的耗时、请求数和每门课程的检查时刻"""
+    clock = VirtualClock(start or time.time())
+    limiter = TokenBucket(options["rate"], options["burst"], clock=clock, sleep=clock.sleep)
+    scheduler = CourseScheduler(courses, course_key, clock=clock)
+    open_tabs = set()
+    last_probe = clock()
+    checks = defaultdict(list)
+    results = []
+
+    def request(kind, seconds):
+        waited = limiter.acquire(kind)
+        clock.sleep(seconds)
+        return waited
+
+    for _ in range(rounds):
+        round_start = clock()
+        requests = Counter()
+        waited = 0.0
+        commands = 0.0
+        order = scheduler.plan_round()
+        for course in order:
+            if clock() - last_probe >= options["session_check"]:
+                waited += request("probe", model.wait("probe"))
+                requests["probe"] += 1
+                last_probe = clock()
+            checks[course_key(course)].append(clock())
+
+            tab = course["tab_type"]
+            if not options["multi_window"] or tab not in open_tabs:
+                waited += request("navigate", model.wait("page"))
+                requests["navigate"] += 1
+                open_tabs.add(tab)
+            clock.sleep(model.commands_time("navigate"))
+            commands += model.commands["navigate"]
+
+            waited += request("query", model.wait("results"))
+            requests["query"] += 1
+            if options["batch_search"]:
+                clock.sleep(model.commands_time("search"))
+                commands += model.commands["search"]
+            else:
+                clock.sleep(model.commands_time("search", STEPWISE_COMMANDS) + STEPWISE_SLEEP)
+                commands += STEPWISE_COMMANDS
+            clock.sleep(model.commands_time("verify"))
+            commands += model.commands["verify"]
+
+            if not options["multi_window"]:
+                waited += request("refresh", model.wait("page"))
+                requests["refresh"] += 1
+                clock.sleep(model.commands_time("refresh"))
+                commands += model.commands["refresh"]
+            scheduler.record(course, False)
+
+        results.append({"seconds": clock() - round_start, "checks": len(order), "requests": requests,
+                        "waited": waited, "commands": commands})
+    return {"rounds": results, "checks": checks}
+
+
+def course_rows(courses, checks, rounds):
+    """每门课程每轮的检查次数和平均检查间隔"""
+    rows = []
+    for course in courses:
+        key = course_key(course)
+        times = checks.get(key, [])
+        gaps = [b - a for a, b in zip(times, times[1:])]
+        rows.append({
+            "key": key,
+            "name": course.get("course_name", key),
+            "priority": course.get("priority", 1),
+            "per_round": len(times) / rounds,
+            "interval": statistics.mean(gaps) if gaps else None,
+            "max_interval": max(gaps) if gaps else None,
+        })
+    return rows
+
+
+def plan(courses, options, model, rounds=10, start=None):
+    result = simulate(courses, model, options, rounds, start)
+    steady = result["rounds"][1:] or result["rounds"]
+    requests = Counter()
+    for item in steady:
+        requests.update(item["requests"])
+    return {
+        "first_round": result["rounds"][0]["seconds"],
+        "round_seconds": statistics.mean(item["seconds"] for item in steady),
+        "waited": statistics.mean(item["waited"] for item in steady),
+        "checks": statistics.mean(item["checks"] for item in steady),
+        "commands": statistics.mean(item["commands"] for item in steady),
+        "requests": {kind: count / len(steady) for kind, count in requests.items()},
+        "courses": course_rows(courses, result["checks"], rounds),
+    }
+
+
+def report(courses, options, samples, commands, rounds=10, start=None):
+    """打印预估结果"""
+    tabs = Counter(course.get("tab_type") for course in courses)
+    print(f"课程: {len(courses)}门（" + "，".join(f"{tab} {n}" for tab, n in tabs.items()) + "）")
+    print(f"选项: MULTI_WINDOW={int(options['multi_window'])} BATCH_SEARCH={int(options['batch_search'])} "
+          f"REQUEST_RATE={options['rate']:g}/分钟 REQUEST_BURST={options['burst']} "
+          f"SESSION_CHECK_INTERVAL={options['session_check']:g}s")
+
+    typical = plan(courses, options, LatencyModel(samples, commands, pct=50), rounds, start)
+    slow = plan(courses, options, LatencyModel(samples, commands, pct=90), rounds, start)
+    model = LatencyModel(samples, commands)
+    print("延迟模型: " + ("、".join(model.sources) if model.sources else "默认值（没有历史数据）")
+          + f"，页面 {model.wait('page'):.2f}s，查询结果 {model.wait('results'):.2f}s（P50）")
+
+    requests = typical["requests"]
+    print(f"\n每轮检查 {typical['checks']:.0f} 次，请求 {sum(requests.values()):.1f} 个（"
+          + "，".join(f"{kind} {count:.1f}" for kind, count in sorted(requests.items()))
+          + f"），WebDriver命令约 {typical['commands']:.0f} 个")
+    slower = f"（较慢时 {slow['round_seconds']:.1f}s）" if samples else ""
+    print(f"每轮预计耗时: {typical['round_seconds']:.1f}s{slower}，第一轮 {typical['first_round']:.1f}s")
+    if typical["waited"] > typical["round_seconds"] / 2:
+        print(f"其中等待限流 {typical['waited']:.1f}s：请求速率是瓶颈，"
+              "可提高REQUEST_RATE，或开启MULTI_WINDOW减少每门课程的请求数")
+    else:
+        print(f"其中等待限流 {typical['waited']:.1f}s")
+
+    print(f"\n{'课程':<24}{'优先级':>6}{'每轮检查':>10}{'平均间隔(s)':>14}{'最长间隔(s)':>14}")
+    for row in typical["courses"]:
+        interval = f"{row['interval']:.1f}" if row["interval"] is not None else "-"
+        longest = f"{row['max_interval']:.1f}" if row["max_interval"] is not None else "-"
+        print(f"{row['name'][:20]:<24}{row['priority']:>6}{row['per_round']:>10.2f}{interval:>14}{longest:>14}")
+    return typical
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="选课配置耗时预估（不启动浏览器）")
+    parser.add_argument("config", nargs="?", default="courses.json", help="课程配置文件")
+    parser.add_argument("--rounds", type=int, default=10, help="模拟轮数")
+    parser.add_argument("--samples", help="历史等待耗时样本，默认取LATENCY_SAMPLES或latency_samples.json")
+    parser.add_argument("--commands", help="bench_commands.py --json 输出的命令统计")
+    parser.add_argument("--at", help="模拟开始时间（如选课开放时间，影响截止时间的紧迫度），默认为现在")
+    parser.add_argument("--rate", type=float, help="覆盖REQUEST_RATE")
+    parser.add_argument("--burst", type=int, help="覆盖REQUEST_BURST")
+    parser.add_argument("--multi-window", action="store_true", default=None, help="按开启MULTI_WINDOW预估")
+    parser.add_argument("--stepwise-search", action="store_true", help="按BATCH_SEARCH=0预估")
+    args = parser.parse_args(argv)
+
+    load_dotenv()
+    with open(args.config, "r", encoding="utf-8") as f:
+        courses = json.load(f)
+    if not courses:
+        print("课程配置为空")
+        return 1
+    options = options_from_env()
+    if args.rate is not None:
+        options["rate"] = args.rate
+    if args.burst is not None:
+        options["burst"] = args.burst
+    if args.multi_window:
+        options["multi_window"] = True
+    if args.stepwise_search:
+        options["batch_search"] = False
+    samples = args.samples or os.getenv("LATENCY_SAMPLES") or LATENCY_PATH
+    report(courses, options, load_samples(samples) if samples != "0" else {}, load_commands(args.commands),
+           args.rounds, parse_deadline(args.at) if args.at else None)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
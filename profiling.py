@@ -0,0 +1,143 @@
+# -*- coding: utf-8 -*-
+"""运行时性能分析（采样）
+
+后台线程按固定间隔采样主线程的Python调用栈，按栈底的状态把墙钟时间分为：
+    chromedriver  等待chromedriver返回（调用栈中有selenium的远程调用）
+    network       其他HTTP请求（登录状态检查、网络检查等）
+    sleep         sleep和轮询等待（当前行在调用sleep）
+    compute       我们自己的Python计算
+结果写入运行目录：
+    profile.collapsed     折叠栈，可用 flamegraph.pl 或 speedscope 生成火焰图
+    profile_summary.txt   各类耗时和最耗时的函数
+
+用法:
+    python auto_course.py --profile
+    python run.py --config courses.json --profile
+"""
+import linecache
+import os
+import sys
+import threading
+import time
+from collections import Counter, defaultdict
+from contextlib import contextmanager
+
+CATEGORIES = ("chromedriver", "network", "sleep", "compute")
+
+SELENIUM_REMOTE = os.path.join("selenium", "webdriver", "remote")
+NETWORK_MODULES = tuple(os.path.join(name, "") for name in ("urllib3", "requests", "http")) + ("socket.py", "ssl.py")
+
+
+def frame_label(frame):
+    code = frame.f_code
+    return f"{os.path.splitext(os.path.basename(code.co_filename))[0]}:{code.co_name}"
+
+
+def classify(frames):
+    """根据调用栈（从外到内）判断这次采样属于哪一类"""
+    filenames = [frame.f_code.co_filename for frame in frames]
+    if any(SELENIUM_REMOTE in name for name in filenames):
+        return "chromedriver"
+    if any(module in name for name in filenames for module in NETWORK_MODULES):
+        return "network"
+    leaf = frames[-1]
+    if "sleep(" in linecache.getline(leaf.f_code.co_filename, leaf.f_lineno):
+        return "sleep"
+    return "compute"
+
+
+class SamplingProfiler:
+    """对指定线程（默认为创建者所在线程）做栈采样"""
+
+    def __init__(self, interval=0.01, thread_id=None):
+        self.interval = interval
+        self.thread_id = thread_id or threading.get_ident()
+        self.stacks = Counter()              # (类别, 栈...) -> 采样次数
+        self.seconds = defaultdict(float)    # 类别 -> 墙钟时间
+        self.self_time = Counter()           # 函数 -> 作为栈顶的时间
+        self.total_time = Counter()          # 函数 -> 出现在栈中的时间
+        self.samples = 0
+        self.started = None
+        self.elapsed = 0.0
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        self.started = time.perf_counter()
+        self._thread = threading.Thread(target=self._run, name="profiler", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        if self._thread:
+            self._thread.join()
+        self.elapsed = time.perf_counter() - self.started
+
+    def _run(self):
+        last = time.perf_counter()
+        while not self._stop.wait(self.interval):
+            now = time.perf_counter()
+            # 按实际间隔计时，采样线程被延迟时不会低估
+            self.sample(now - last)
+            last = now
+
+    def sample(self, weight):
+        frame = sys._current_frames().get(self.thread_id)
+        if frame is None:
+            return
+        frames = []
+        while frame is not None:
+            frames.append(frame)
+            frame = frame.f_back
+        frames.reverse()
+        category = classify(frames)
+        labels = [frame_label(f) for f in frames]
+        self.samples += 1
+        self.stacks[(category,) + tuple(labels)] += 1
+        self.seconds[category] += weight
+        self.self_time[labels[-1]] += weight
+        for label in set(labels):
+            self.total_time[label] += weight
+
+    def write_collapsed(self, path):
+        with open(path, "w", encoding="utf-8") as f:
+            for stack, count in self.stacks.most_common():
+                f.write(";".join(stack) + f" {count}\n")
+
+    def summary(self, top=20):
+        lines = [f"总耗时 {self.elapsed:.2f}s，采样 {self.samples} 次（间隔 {self.interval * 1000:.0f}ms）", ""]
+        sampled = sum(self.seconds.values()) or 1.0
+        lines.append("按类别:")
+        for category in CATEGORIES:
+            seconds = self.seconds.get(category, 0.0)
+            lines.append(f"  {category:<14}{seconds:>10.2f}s {seconds / sampled:>7.1%}")
+        for title, counter in (("栈顶时间最多的函数:", self.self_time), ("包含子调用时间最多的函数:", self.total_time)):
+            lines += ["", title]
+            for label, seconds in counter.most_common(top):
+                lines.append(f"  {seconds:>9.2f}s  {label}")
+        return "\n".join(lines) + "\n"
+
+    def write(self, directory, top=20):
+        """写入折叠栈和文字汇总，返回两个文件的路径"""
+        collapsed = os.path.join(directory, "profile.collapsed")
+        summary = os.path.join(directory, "profile_summary.txt")
+        self.write_collapsed(collapsed)
+        with open(summary, "w", encoding="utf-8") as f:
+            f.write(self.summary(top))
+        return collapsed, summary
+
+
+@contextmanager
+def profiled(enabled, directory_func, interval=0.01, log=print):
+    """enabled时对当前线程采样，结束后写入directory_func()返回的目录"""
+    if not enabled:
+        yield None
+        return
+    profiler = SamplingProfiler(interval=interval).start()
+    try:
+        yield profiler
+    finally:
+        profiler.stop()
+        collapsed, summary = profiler.write(directory_func())
+        log(f"性能分析结果: {summary}（火焰图数据: {collapsed}）")
@@ -0,0 +1,75 @@
+# -*- coding: utf-8 -*-
+"""全局请求限流（令牌桶）
+
+所有发往教务系统的请求（页面跳转、查询、刷新、选课操作、登录状态检查）都先从
+同一个令牌桶取令牌：桶中最多积累burst个令牌，按每分钟rate个的速度补充。
+服务器空闲时可以连续发出burst个请求，整体速率不会超过约定的预算。
+每次取令牌等待的时间按请求类型记录。
+"""
+import threading
+import time
+from collections import defaultdict
+
+
+class TokenBucket:
+    """令牌桶限流器；rate_per_minute<=0 表示不限流"""
+
+    def __init__(self, rate_per_minute=30, burst=5, clock=time.monotonic, sleep=time.sleep):
+        self.rate_per_minute = rate_per_minute
+        self.rate = rate_per_minute / 60.0
+        self.burst = max(1, int(burst))
+        self.clock = clock
+        self.sleep = sleep
+        self.tokens = float(self.burst)
+        self.updated = clock()
+        self.lock = threading.Lock()
+        self.stats = defaultdict(lambda: [0, 0.0])  # 请求类型 -> [次数, 等待秒数]
+        # listener(kind, waited) 在每次取到令牌后调用
+        self.listener = None
+
+    def _refill(self, now):
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def acquire(self, kind="other"):
+        """取一个令牌，不够时等待，返回等待的秒数
+
+        令牌不足时先预支（令牌数变为负数），后来的请求排在后面等待更久，多线程下也不会超出速率。
+        """
+        with self.lock:
+            if self.rate > 0:
+                self._refill(self.clock())
+                self.tokens -= 1
+                wait = -self.tokens / self.rate if self.tokens < 0 else 0.0
+            else:
+                wait = 0.0
+            stats = self.stats[kind]
+            stats[0] += 1
+            stats[1] += wait
+        if wait > 0:
+            self.sleep(wait)
+        if self.listener:
+            self.listener(kind, wait)
+        return wait
+
+    def available(self):
+        """当前可立即使用的令牌数"""
+        if self.rate <= 0:
+            return float("inf")
+        with self.lock:
+            self._refill(self.clock())
+            return max(0.0, self.tokens)
+
+    def describe(self):
+        """限流设置和各类请求的次数、等待时间"""
+        with self.lock:
+            by_kind = {kind: {"count": count, "waited": round(waited, 3)}
+                       for kind, (count, waited) in self.stats.items()}
+        return {
+            "rate_per_minute": self.rate_per_minute,
+            "burst": self.burst,
+            "available": self.available(),
+            "requests": sum(item["count"] for item in by_kind.values()),
+            "waited": round(sum(item["waited"] for item in by_kind.values()), 3),
+            "by_kind": by_kind,
+        }
@@ -3,10 +3,23 @@ import sys
 import json
 import argparse
 import tempfile
+import threading
 from getpass import getpass
 from datetime import datetime
-from auto_course import CourseSelector, logger
+from dotenv import load_dotenv
+# auto_course会导入selenium等较重的模块，用到时再导入（见preload_selector），
+# 菜单和第一个输入提示不必等它
+from settings import env_flag
 from config import CourseConfig
+from profiling import profiled
+from runs import run_dir
+
+# 非交互运行的退出码
+EXIT_OK = 0            # 所有课程已选中
+EXIT_INCOMPLETE = 1    # 仍有课程未选中或无法选择
+EXIT_CONFIG = 2        # 登录信息或课程配置有误
+EXIT_STARTUP = 3       # 浏览器启动或登录失败
+EXIT_INTERRUPTED = 130
 
 def get_resource_path(relative_path):
     """获取资源文件的路径（支持打包后的路径）"""
@@ -23,10 +36,89 @@ def setup_argparse():
     parser.add_argument('-c', '--config', help='课程配置文件路径（JSON格式）')
     parser.add_argument('-u', '--username', help='学号')
     parser.add_argument('-p', '--password', help='密码')
-    parser.add_argument('--headless', action='store_true', help='无界面模式运行')
+    parser.add_argument('--headless', action='store_true', help='无界面模式运行（默认，可在.env中用HEADLESS=0关闭）')
     parser.add_argument('--debug', action='store_true', help='调试模式')
+    parser.add_argument('-n', '--non-interactive', action='store_true',
+                        help='非交互运行：不显示菜单，直接用.env和课程配置文件开始选课（指定--config时默认开启）')
+    parser.add_argument('--max-rounds', type=int, default=100, help='最多选课轮数')
+    parser.add_argument('--profile', action='store_true', help='采样分析本次运行的耗时，结果写入 runs/<运行编号>/')
+    parser.add_argument('--dry-run', action='store_true',
+                        help='不启动浏览器，按课程配置和运行选项预估每轮耗时、请求数和各课程的检查间隔')
     return parser.parse_args()
 
+def preload_selector():
+    """在后台线程中导入auto_course，和用户输入登录信息、配置课程同时进行"""
+    def load():
+        try:
+            import auto_course  # noqa: F401
+        except Exception:
+            pass  # 导入失败时在真正用到的地方报错
+    threading.Thread(target=load, name="preload", daemon=True).start()
+
+def is_non_interactive(args):
+    return args.non_interactive or bool(args.config) or env_flag("NON_INTERACTIVE")
+
+def run_dry(args):
+    """预估课程配置的每轮耗时和请求数（见planner.py），返回退出码"""
+    import planner
+    config_path = args.config or "courses.json"
+    config = CourseConfig.from_json(config_path) if os.path.exists(config_path) else None
+    if config is None:
+        print(f"未找到或无法读取课程配置文件: {config_path}")
+        return EXIT_CONFIG
+    errors = CourseConfig.validate(config.courses)
+    for error in errors:
+        print(f"课程配置错误: {error}")
+    if errors:
+        return EXIT_CONFIG
+    planner.report(config.courses, planner.options_from_env(), planner.load_samples(), None)
+    return EXIT_OK
+
+def run_unattended(args):
+    """非交互运行：登录信息来自参数或.env，课程配置来自文件并先校验，返回退出码"""
+    from auto_course import CourseSelector, logger, set_console_level
+    if args.debug:
+        set_console_level("DEBUG")
+    if args.username:
+        os.environ["STUDENT_ID"] = args.username
+    if args.password:
+        os.environ["PASSWORD"] = args.password
+    if not os.getenv("STUDENT_ID") or not os.getenv("PASSWORD"):
+        logger.error("未找到登录信息：请在.env中设置STUDENT_ID和PASSWORD，或使用 -u/-p 参数")
+        return EXIT_CONFIG
+
+    config_path = args.config or "courses.json"
+    if not os.path.exists(config_path):
+        logger.error(f"未找到课程配置文件: {config_path}")
+        return EXIT_CONFIG
+    config = CourseConfig.from_json(config_path)
+    if config is None:
+        return EXIT_CONFIG
+    errors = CourseConfig.validate(config.courses)
+    for error in errors:
+        logger.error(f"课程配置错误: {error}")
+    if errors:
+        return EXIT_CONFIG
+
+    selector = None
+    try:
+        selector = CourseSelector(headless=args.headless or env_flag("HEADLESS", True))
+        if not selector.login():
+            logger.error("登录失败，请检查账号密码和网络")
+            return EXIT_STARTUP
+        selector.select_multiple_courses(courses=config.courses, max_retries=args.max_rounds)
+        summary = selector.selection_summary()
+        logger.info(f"选课结束: 已选中{len(summary['selected'])}门，无法选择{len(summary['failed'])}门，"
+                    f"未选中{len(summary['pending'])}门")
+        return EXIT_OK if not summary["failed"] and not summary["pending"] else EXIT_INCOMPLETE
+    except Exception as e:
+        logger.error(f"程序运行出错: {str(e)}")
+        return EXIT_STARTUP
+    finally:
+        if selector:
+            selector.log_run_summary()
+            selector.close()
+
 def create_env_file(username, password):
     """创建或更新.env文件"""
     try:
@@ -61,6 +153,15 @@ def create_course_config():
     
     while True:
         print("\n添加新课程:")
+        # 优先从本地课程库查找并自动填写
+        found = CourseConfig.lookup_catalog()
+        if found and found["time"] and found["start_section"]:
+            courses.append(found)
+            print(f"已添加: {found['course_name']} - {found['teacher']}")
+            if input("\n是否继续添加课程? (y/n): ").lower() != 'y':
+                break
+            continue
+
         course = {}
         course["course_id"] = input("课程ID (可选): ").strip()
         course["course_name"] = input("课程名称: ").strip()
@@ -186,8 +287,12 @@ def show_instructions():
 """)
     input("\n按回车键返回主菜单...")
 
-def main():
+def main(args=None):
+    if args and args.debug:
+        from auto_course import set_console_level
+        set_console_level("DEBUG")
     show_welcome()
+    preload_selector()
     
     print("\n首次使用需要进行以下配置：")
     
@@ -196,6 +301,9 @@ def main():
         username, password = get_credentials()
         if username and password:
             if create_env_file(username, password):
+                # 后台导入auto_course时可能已经读过旧的.env，这里直接更新环境变量
+                os.environ["STUDENT_ID"] = username
+                os.environ["PASSWORD"] = password
                 break
         print("\n❌ 请重新输入登录信息")
     
@@ -215,27 +323,45 @@ def main():
     
     # 3. 开始选课
     print("\n配置完成，即将开始选课...")
+    from auto_course import CourseSelector, logger
     selector = None
-    try:
-        selector = CourseSelector()
-        if selector.login():
-            selector.select_multiple_courses()
-        else:
-            print("\n❌ 登录失败，请检查账号密码")
-    except Exception as e:
-        print(f"\n❌ 程序出错: {str(e)}")
-    finally:
-        if selector:
-            selector.close()
+    # 只分析选课部分，不包括上面的交互输入
+    with profiled(bool(args and args.profile), run_dir, log=logger.info):
+        try:
+            selector = CourseSelector(headless=bool(args and args.headless) or env_flag("HEADLESS", True))
+            if selector.login():
+                selector.select_multiple_courses()
+            else:
+                print("\n❌ 登录失败，请检查账号密码")
+        except Exception as e:
+            print(f"\n❌ 程序出错: {str(e)}")
+        finally:
+            if selector:
+                selector.log_run_summary()
+                selector.close()
 
 if __name__ == "__main__":
+    args = setup_argparse()
+    load_dotenv()
+    if args.dry_run:
+        sys.exit(run_dry(args))
+    if is_non_interactive(args):
+        from auto_course import logger
+        try:
+            with profiled(args.profile, run_dir, log=logger.info):
+                code = run_unattended(args)
+            sys.exit(code)
+        except KeyboardInterrupt:
+            logger.warning("程序已被用户中断")
+            sys.exit(EXIT_INTERRUPTED)
+
     try:
         # 设置控制台标题和窗口大小
         if os.name == 'nt':
             os.system('title 深圳技术大学选课助手')
             os.system('mode con cols=100 lines=40')
         
-        main()
+        main(args)
     except KeyboardInterrupt:
         print("\n\n程序已被用户中断")
     except Exception as e:
@@ -0,0 +1,28 @@
+# -*- coding: utf-8 -*-
+"""运行目录
+
+每次运行使用一个编号（RUN_ID），本次运行产生的文件（日志存档、错误截图、性能分析结果等）放在 runs/<RUN_ID>/ 下，
+不再和其他运行的文件混在当前目录中。可以用环境变量RUN_ID指定编号。
+"""
+import os
+from datetime import datetime
+
+RUNS_DIR = "runs"
+
+RUN_ID = os.getenv("RUN_ID") or f"{datetime.now().strftime('%Y%m%d-%H%M%S')}-{os.getpid()}"
+
+_claimed = []
+
+
+def claim_run_id():
+    """本进程中每次选课运行的编号：第一次为RUN_ID，之后依次加后缀（如fault_runner在一个进程中运行多次）"""
+    run_id = RUN_ID if not _claimed else f"{RUN_ID}-{len(_claimed) + 1}"
+    _claimed.append(run_id)
+    return run_id
+
+
+def run_dir(run_id=None):
+    """本次（或指定）运行的目录，不存在时创建"""
+    path = os.path.join(RUNS_DIR, run_id or RUN_ID)
+    os.makedirs(path, exist_ok=True)
+    return path
@@ -0,0 +1,122 @@
+# -*- coding: utf-8 -*-
+"""按优先级安排每轮检查的课程
+
+每门课程可在courses.json中设置:
+    "priority": 数字，越大越重要，默认1
+    "deadline": 截止时间（如 "2025-02-20 18:00"），过期后不再检查，临近时提高检查频率
+
+每轮按步进调度(stride scheduling)排出检查顺序：权重越高的课程在一轮中出现得越早、
+越频繁，权重 = 优先级 × 历史出现空位的比例 × 截止时间紧迫度。
+请求速率由 rate_limit.py 的全局限流器控制，这里只决定把检查次数分给哪些课程。
+"""
+import time
+from datetime import datetime
+
+from loguru import logger
+
+
+def course_key(course):
+    """课程唯一标识（课程编号可能为空，此时用名称+教师）"""
+    return course.get("course_id") or f"{course['course_name']}|{course['teacher']}"
+
+
+def parse_deadline(value):
+    """解析截止时间，支持 "YYYY-MM-DD HH:MM[:SS]" 和ISO格式"""
+    if not value:
+        return None
+    for fmt in ("%Y-%m-%d %H:%M:%S", "%Y-%m-%d %H:%M", "%Y-%m-%d"):
+        try:
+            return datetime.strptime(value, fmt).timestamp()
+        except ValueError:
+            continue
+    return datetime.fromisoformat(value).timestamp()
+
+
+class CourseState:
+    """一门课程的调度状态"""
+
+    def __init__(self, key, course):
+        self.key = key
+        self.course = course
+        self.priority = max(0.1, float(course.get("priority", 1) or 1))
+        self.deadline = parse_deadline(course.get("deadline"))
+        self.checks = 0
+        self.openings = 0
+        self.pass_value = 0.0
+
+    def opening_rate(self):
+        """历史检查中出现空位的比例（拉普拉斯平滑，没有历史时为0.5）"""
+        return (self.openings + 1) / (self.checks + 2)
+
+    def urgency(self, now):
+        if self.deadline is None:
+            return 1.0
+        hours_left = (self.deadline - now) / 3600
+        if hours_left <= 0:
+            return 0.0
+        return 1.0 + 2.0 / (1.0 + hours_left)
+
+    def weight(self, now):
+        return self.priority * (0.5 + self.opening_rate()) * self.urgency(now)
+
+
+class CourseScheduler:
+    """决定每轮检查哪些课程、以什么顺序检查"""
+
+    def __init__(self, courses, key_func, clock=time.time):
+        self.key_func = key_func
+        self.states = {}
+        # 优先级或截止时间无效、未参与调度的课程标识 -> 原因
+        self.invalid = {}
+        for course in courses:
+            key = key_func(course)
+            if key in self.states:
+                continue
+            try:
+                self.states[key] = CourseState(key, course)
+            except (TypeError, ValueError) as e:
+                self.invalid[key] = str(e)
+                logger.warning(f"课程 {key} 的优先级或截止时间无效，跳过该课程: {str(e)}")
+        self.clock = clock
+        # 全局pass值：上一轮结束时参与调度的课程中最小的pass值
+        self.global_pass = 0.0
+        self.last_active = set()
+
+    def expired(self):
+        """已过截止时间的课程标识"""
+        now = self.clock()
+        return [s.key for s in self.states.values() if s.deadline is not None and s.deadline <= now]
+
+    def plan_round(self, skip=()):
+        """排出本轮的检查顺序，本轮检查次数等于待选课程数，高权重课程可能出现多次"""
+        now = self.clock()
+        active = [s for s in self.states.values() if s.key not in skip and s.urgency(now) > 0]
+        if not active:
+            return []
+        # 新加入或上一轮未参与调度的课程从全局pass值起步，不因pass值落后太多而连续霸占检查
+        for state in active:
+            if state.key not in self.last_active:
+                state.pass_value = max(state.pass_value, self.global_pass)
+        plan = []
+        for _ in range(len(active)):
+            state = min(active, key=lambda s: (s.pass_value, -s.priority))
+            plan.append(state.course)
+            state.pass_value += 1.0 / state.weight(now)
+        self.global_pass = min(s.pass_value for s in active)
+        self.last_active = {s.key for s in active}
+        return plan
+
+    def record(self, course, opened):
+        """记录一次检查结果：opened表示这次看到了可选的空位"""
+        state = self.states.get(self.key_func(course))
+        if state is None:
+            return
+        state.checks += 1
+        if opened:
+            state.openings += 1
+
+    def describe(self):
+        """各课程的调度状态，用于日志"""
+        now = self.clock()
+        return {s.key: {"priority": s.priority, "checks": s.checks, "openings": s.openings,
+                        "weight": round(s.weight(now), 3)} for s in self.states.values()}
@@ -0,0 +1,93 @@
+# -*- coding: utf-8 -*-
+"""一次execute_script填写并提交查询表单
+
+原来的查询流程对每个输入框、下拉框、复选框和查询按钮分别等待、清空、输入、点击，
+每门课程约15次WebDriver请求。这里在页面内一次完成：设置各字段的值并触发页面监听的
+input/change事件，勾选"过滤已满课程"，核对实际生效的值后点击"查询"。
+页面缺少某个字段或选项、或生效的值与预期不符（如页面脚本改写了输入）时不提交，
+由调用方退回逐步操作的方式，不会多发一次查询请求。
+"""
+from matcher import query_text
+
+WEEKDAY_VALUES = {
+    "周一": "1", "周二": "2", "周三": "3",
+    "周四": "4", "周五": "5", "周六": "6", "周日": "7"
+}
+
+TEXT_FIELDS = ("kcxx", "skls")
+SELECT_FIELDS = ("skxq", "skjc", "endJc")
+
+FILL_SEARCH_FORM_JS = """
+var values = arguments[0], submit = arguments[1];
+var result = {missing: [], problems: [], applied: {}, filter: null, submitted: false};
+function fire(el, type) { el.dispatchEvent(new Event(type, {bubbles: true})); }
+function applied(id, el) {
+    result.applied[id] = el.value;
+    if (el.value !== values[id]) { result.problems.push(id + '=' + JSON.stringify(el.value)); }
+}
+
+['kcxx', 'skls'].forEach(function (id) {
+    var el = document.getElementById(id);
+    if (!el) { result.missing.push(id); return; }
+    el.value = values[id];
+    fire(el, 'input');
+    fire(el, 'change');
+    applied(id, el);
+});
+['skxq', 'skjc', 'endJc'].forEach(function (id) {
+    var el = document.getElementById(id);
+    if (!el) { result.missing.push(id); return; }
+    var exists = false;
+    for (var i = 0; i < el.options.length; i++) {
+        if (el.options[i].value === values[id]) { exists = true; break; }
+    }
+    if (!exists) { result.missing.push(id + '=' + values[id]); return; }
+    el.value = values[id];
+    fire(el, 'change');
+    applied(id, el);
+});
+
+// 过滤已满课程：只在未勾选时点击，避免窗口复用时把已勾选的取消
+var labels = document.getElementsByTagName('label');
+for (var j = 0; j < labels.length; j++) {
+    if (labels[j].innerText.indexOf('过滤已满课程') < 0) { continue; }
+    var box = labels[j].querySelector('input[type="checkbox"]');
+    if (!box) { labels[j].click(); break; }
+    if (!box.checked) { box.click(); }
+    result.filter = box.checked;
+    break;
+}
+
+// 只有各字段都按预期生效时才点击查询
+if (result.missing.length || result.problems.length || !submit) { return result; }
+var buttons = document.querySelectorAll('input[type="button"]');
+for (var k = 0; k < buttons.length; k++) {
+    if (buttons[k].value === '查询') { buttons[k].click(); result.submitted = true; break; }
+}
+if (!result.submitted) { result.missing.push('查询'); }
+return result;
+"""
+
+
+def form_values(course):
+    """课程配置对应的查询表单各字段的值"""
+    return {
+        "kcxx": query_text(course.get("course_name", "")),
+        "skls": query_text(course.get("teacher", "")),
+        "skxq": WEEKDAY_VALUES.get(course.get("time"), ""),
+        "skjc": str(course.get("start_section") or ""),
+        "endJc": str(course.get("end_section") or ""),
+    }
+
+
+def fill_search_form(driver, course, submit=True):
+    """填写并提交查询表单，返回 (是否成功, 页面返回的结果)
+
+    失败（缺少字段/选项、生效的值与预期不符、未找到查询按钮）时result["problems"]说明原因，
+    此时页面脚本没有点击查询。
+    """
+    values = form_values(course)
+    result = driver.execute_script(FILL_SEARCH_FORM_JS, values, submit) or {}
+    problems = list(result.get("missing", [])) + list(result.get("problems", []))
+    result["problems"] = problems
+    return not problems and (result.get("submitted") or not submit), result
@@ -0,0 +1,183 @@
+# -*- coding: utf-8 -*-
+"""课程余量历史
+
+每次解析结果表格时，把各教学班的剩余名额追加到本地SQLite文件（只追加不修改），
+之后可以统计每个教学班什么时候出现空位、空位持续了多久，
+以及空位多出现在一天中的哪些时段，用来决定在哪些时间加密查询。
+
+选课循环查询时勾选了"过滤已满课程"，教学班满员后不再出现在结果中。
+因此记录时按查询区分：同一查询上次有空位、这次不再出现的教学班，按剩余量0记录。
+
+用法:
+    python seat_history.py report [--course CP00006] [--tab plan] [--days 7]
+    python seat_history.py hours [--days 7]
+"""
+import argparse
+import os
+import sqlite3
+import time
+from collections import Counter
+from datetime import datetime
+
+DEFAULT_DB = "seat_history.db"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS samples (
+    ts REAL NOT NULL,
+    tab TEXT,
+    course_id TEXT,
+    section TEXT,
+    remaining INTEGER NOT NULL,
+    capacity INTEGER
+);
+CREATE INDEX IF NOT EXISTS idx_samples_section ON samples(course_id, section, ts);
+"""
+
+
+def section_of(row):
+    """教学班标识：优先使用jx0404id，没有时用教师和上课时间代替"""
+    return row.get("section_id") or f"{row.get('teacher') or ''}|{row.get('time_text') or ''}"
+
+
+def format_ts(ts):
+    return datetime.fromtimestamp(ts).strftime("%m-%d %H:%M:%S")
+
+
+class SeatHistory:
+    """教学班余量时间序列（SQLite）"""
+
+    def __init__(self, path=DEFAULT_DB):
+        self.path = path
+        self.conn = sqlite3.connect(path)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.executescript(SCHEMA)
+        # 查询标识 -> 该查询上次结果中有空位的教学班 {(课程, 教学班): 选课类型}
+        self.open_sections = {}
+
+    @staticmethod
+    def exists(path=DEFAULT_DB):
+        return os.path.exists(path)
+
+    def close(self):
+        self.conn.close()
+
+    def record(self, tab, rows, ts=None, query=None):
+        """追加一次查询结果中各行的余量，没有余量列的行跳过，返回写入条数
+
+        query为过滤了已满课程的查询的标识，该查询上次有空位、这次不在结果中的教学班记为剩余量0
+        """
+        ts = time.time() if ts is None else ts
+        records = [
+            (ts, tab, row.get("course_id") or row.get("course_name"), section_of(row),
+             row["remaining"], row.get("capacity"))
+            for row in rows if row.get("remaining") is not None
+        ]
+        if query is not None:
+            seen = {(record[2], record[3]) for record in records}
+            for (course_id, section), section_tab in self.open_sections.get(query, {}).items():
+                if (course_id, section) not in seen:
+                    records.append((ts, section_tab, course_id, section, 0, None))
+            self.open_sections[query] = {(record[2], record[3]): record[1] for record in records if record[4] > 0}
+        if records:
+            with self.conn:
+                self.conn.executemany(
+                    "INSERT INTO samples (ts, tab, course_id, section, remaining, capacity) "
+                    "VALUES (?, ?, ?, ?, ?, ?)", records
+                )
+        return len(records)
+
+    def samples(self, course_id=None, tab=None, since=None):
+        sql = "SELECT * FROM samples WHERE 1 = 1"
+        params = []
+        if course_id:
+            sql += " AND course_id = ?"
+            params.append(course_id)
+        if tab:
+            sql += " AND tab = ?"
+            params.append(tab)
+        if since:
+            sql += " AND ts >= ?"
+            params.append(since)
+        sql += " ORDER BY course_id, section, ts"
+        return self.conn.execute(sql, params)
+
+    def intervals(self, course_id=None, tab=None, since=None):
+        """各教学班有空位的时间段
+
+        空位从第一次看到剩余量>0开始，到下一次看到剩余量为0结束；
+        至今仍有空位的时间段closed_at为None。
+        """
+        result = []
+        current = None
+        last_key = None
+        for row in self.samples(course_id, tab, since):
+            key = (row["course_id"], row["section"])
+            if key != last_key:
+                if current:
+                    result.append(current)
+                current = None
+                last_key = key
+            if row["remaining"] > 0:
+                if current is None:
+                    current = {"course_id": row["course_id"], "section": row["section"], "tab": row["tab"],
+                               "opened_at": row["ts"], "closed_at": None, "peak": row["remaining"]}
+                else:
+                    current["peak"] = max(current["peak"], row["remaining"])
+            elif current is not None:
+                current["closed_at"] = row["ts"]
+                result.append(current)
+                current = None
+        if current:
+            result.append(current)
+        return result
+
+    def opening_hours(self, course_id=None, tab=None, since=None):
+        """按一天中的小时统计空位出现的次数"""
+        return Counter(datetime.fromtimestamp(item["opened_at"]).hour
+                       for item in self.intervals(course_id, tab, since))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="课程余量历史")
+    parser.add_argument("--db", default=DEFAULT_DB, help="余量历史文件路径")
+    sub = parser.add_subparsers(dest="command", required=True)
+    for name, text in (("report", "各教学班出现空位的时间段"), ("hours", "空位出现的时段分布")):
+        command = sub.add_parser(name, help=text)
+        command.add_argument("--course", help="课程编号")
+        command.add_argument("--tab", help="选课类型")
+        command.add_argument("--days", type=float, help="只统计最近几天")
+    args = parser.parse_args()
+
+    if not SeatHistory.exists(args.db):
+        print(f"未找到余量历史 {args.db}，运行选课程序后会自动记录")
+        return 1
+    since = time.time() - args.days * 86400 if args.days else None
+    history = SeatHistory(args.db)
+    try:
+        if args.command == "report":
+            intervals = history.intervals(args.course, args.tab, since)
+            if not intervals:
+                print("没有出现过空位")
+            for item in intervals:
+                if item["closed_at"] is None:
+                    closed = "至今"
+                    duration = "-"
+                else:
+                    closed = format_ts(item["closed_at"])
+                    duration = f"{item['closed_at'] - item['opened_at']:.0f}s"
+                print(f"{item['course_id']} {item['section']} | {format_ts(item['opened_at'])} -> {closed} "
+                      f"| 持续{duration} | 最多{item['peak']}个空位")
+        else:
+            hours = history.opening_hours(args.course, args.tab, since)
+            total = sum(hours.values())
+            for hour in range(24):
+                if hours[hour]:
+                    print(f"{hour:02d}:00-{hour:02d}:59 {hours[hour]:>5} {'#' * max(1, hours[hour] * 40 // total)}")
+            print(f"共 {total} 次出现空位")
+    finally:
+        history.close()
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
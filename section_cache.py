@@ -0,0 +1,66 @@
+# -*- coding: utf-8 -*-
+"""已知教学班的选课操作缓存
+
+目标课程在结果表格中出现过一次可选的教学班后，记下它的服务端标识（jx0404id）
+和"选课"链接的操作脚本。之后再检查这门课程时可以在选课页面上直接执行该操作，
+省去填写查询条件、查询和匹配表格，从"出现空位"到"提交选课"只需要一次往返。
+操作被拒绝（没有弹出确认框、教学班不存在等）时清除缓存，改回完整查询。
+缓存的教学班距上次在表格中看到可选已超过 max_age 秒，或连续 max_full 次提交都是人数已满时
+同样清除，重新查询以便发现其他出现空位的教学班。
+"""
+import time
+
+
+class SectionCache:
+    """课程标识 -> 已知教学班的选课操作"""
+
+    def __init__(self, max_age=600, max_full=3):
+        self.max_age = max_age
+        self.max_full = max_full
+        self.entries = {}
+
+    def remember(self, key, tab_type, row):
+        """记录匹配到的可选教学班；没有标识或操作的行不记录"""
+        if not row.get("section_id") or not row.get("action"):
+            return
+        self.entries[key] = {
+            "tab_type": tab_type,
+            "section_id": row["section_id"],
+            "action": row["action"],
+            "seen_at": time.time(),
+            "full": 0,
+        }
+
+    def get(self, key, tab_type):
+        entry = self.entries.get(key)
+        if entry and time.time() - entry["seen_at"] > self.max_age:
+            self.forget(key)
+            return None
+        if entry and entry["tab_type"] == tab_type:
+            return entry
+        return None
+
+    def note_full(self, key):
+        """记录一次人数已满，连续达到max_full次时清除缓存；返回是否已清除"""
+        entry = self.entries.get(key)
+        if entry is None:
+            return False
+        entry["full"] += 1
+        if entry["full"] >= self.max_full:
+            self.forget(key)
+            return True
+        return False
+
+    def forget(self, key):
+        self.entries.pop(key, None)
+
+    @staticmethod
+    def script(action):
+        """在页面中执行选课操作的脚本
+
+        操作会弹出confirm()，直接同步执行会让execute_script阻塞在弹窗上，
+        所以放到setTimeout中执行，由调用方像点击按钮后一样等待弹窗。
+        """
+        if action.lower().startswith("javascript:"):
+            action = action[len("javascript:"):]
+        return "setTimeout(function () { " + action + "\n}, 0); return true;"
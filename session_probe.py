@@ -0,0 +1,106 @@
+# -*- coding: utf-8 -*-
+"""登录状态检查
+
+在课程之间用一个很小的请求检查教务系统会话是否仍然有效：带上浏览器的Cookie、
+不跟随重定向请求学生首页，被重定向（到统一认证或登录页）或返回登录表单即视为已失效。
+检查有最小间隔，不会给每门课程都增加一次请求。
+
+同时记录每次会话从登录到失效经过的时间（也可用SESSION_MAX_AGE直接指定），
+会话寿命快用完时提前重新登录，而不是等到查询超时才发现。
+会话寿命只采用本检查确认失效的记录（选课结果误判为登录超时等不计入），取中位数。
+"""
+import statistics
+import time
+
+import requests
+import urllib3
+
+ALIVE = "alive"
+EXPIRING = "expiring"
+EXPIRED = "expired"
+UNKNOWN = "unknown"
+
+DEFAULT_PATH = "/jsxsd/framework/xsMain.jsp"
+
+# 代表登录会话的Cookie；负载均衡、CSRF等Cookie的过期时间与会话无关
+SESSION_COOKIES = ("JSESSIONID",)
+
+
+def is_session_cookie(name):
+    return name.upper() in SESSION_COOKIES or "SESSION" in name.upper()
+
+
+class SessionProbe:
+    """带节流的会话存活检查"""
+
+    def __init__(self, base_url, path=DEFAULT_PATH, interval=30, timeout=3, margin=60, max_age=None, limiter=None):
+        self.url = base_url.rstrip("/") + path
+        self.interval = interval
+        self.timeout = timeout
+        # 距预计失效不足margin秒时提前重新登录
+        self.margin = margin
+        self.max_age = max_age
+        # 检查请求同样计入全局请求限流
+        self.limiter = limiter
+        self.login_at = None
+        self.last_check = 0.0
+        self.lifetimes = []
+        self.session = requests.Session()
+        self.session.verify = False
+        urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
+
+    def logged_in(self):
+        self.login_at = time.time()
+        self.last_check = self.login_at
+
+    def expired_seen(self, confirmed=False):
+        """记录一次会话失效；confirmed表示由本检查确认失效，只有这样的记录用于估计会话寿命"""
+        if self.login_at and confirmed:
+            lifetime = time.time() - self.login_at
+            # 比提前量还短的寿命多半是误判，按它提前重新登录会反复登录
+            if lifetime >= self.margin:
+                self.lifetimes.append(lifetime)
+        self.login_at = None
+
+    def expected_lifetime(self):
+        if self.max_age:
+            return self.max_age
+        return statistics.median(self.lifetimes) if self.lifetimes else None
+
+    def cookie_expiry(self, cookies):
+        """会话Cookie中最早的过期时间（没有过期时间的浏览器会话Cookie不计）"""
+        expiries = [c["expiry"] for c in cookies if c.get("expiry") and is_session_cookie(c.get("name", ""))]
+        return min(expiries) if expiries else None
+
+    def check(self, driver, force=False):
+        """返回 alive/expiring/expired/unknown；未到检查间隔时直接返回alive"""
+        now = time.time()
+        if not force and now - self.last_check < self.interval:
+            return ALIVE
+        self.last_check = now
+
+        cookies = driver.get_cookies()
+        expiry = self.cookie_expiry(cookies)
+        if expiry is not None and expiry - now < self.margin:
+            return EXPIRING
+        lifetime = self.expected_lifetime()
+        if lifetime and self.login_at and now - self.login_at > lifetime - self.margin:
+            return EXPIRING
+
+        if self.limiter:
+            self.limiter.acquire("probe")
+        try:
+            response = self.session.get(
+                self.url, cookies={c["name"]: c["value"] for c in cookies},
+                allow_redirects=False, timeout=self.timeout,
+            )
+        except requests.exceptions.RequestException:
+            # 网络抖动不等于会话失效，交给正常的重试处理
+            return UNKNOWN
+        if response.is_redirect or response.status_code in (301, 302, 303, 307, 308):
+            return EXPIRED
+        if response.status_code == 200:
+            if "j_username" in response.text or "系统登录" in response.text:
+                return EXPIRED
+            return ALIVE
+        return UNKNOWN
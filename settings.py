@@ -0,0 +1,15 @@
+# -*- coding: utf-8 -*-
+"""运行选项（环境变量）的读取
+
+不依赖selenium等较重的模块，run.py启动时可以先读取选项、显示菜单，
+不必等auto_course导入完成。
+"""
+import os
+
+
+def env_flag(name, default=False):
+    """读取布尔型环境变量（1/true/yes/on 视为开启）"""
+    value = os.getenv(name)
+    if value is None or value.strip() == "":
+        return default
+    return value.strip().lower() in ("1", "true", "yes", "on")
@@ -0,0 +1,278 @@
+# -*- coding: utf-8 -*-
+"""选课结果表格(dataView)解析
+
+用一次 execute_script 取回整张表的表头、单元格文字和操作链接，
+再在Python端按表头映射成统一字段，避免逐行逐列调用WebDriver。
+"""
+import re
+from html.parser import HTMLParser
+
+try:
+    import lxml.html
+except ImportError:  # lxml为可选依赖，没有时使用标准库解析器
+    lxml = None
+
+# 一次性提取表格内容
+EXTRACT_TABLE_JS = """
+var table = document.getElementById('dataView');
+if (!table) { return null; }
+var headers = [];
+var headRow = table.tHead && table.tHead.rows.length ? table.tHead.rows[table.tHead.rows.length - 1] : null;
+if (headRow) {
+    for (var i = 0; i < headRow.cells.length; i++) { headers.push(headRow.cells[i].innerText.trim()); }
+}
+var rows = [];
+var body = table.tBodies.length ? table.tBodies[0] : table;
+for (var r = 0; r < body.rows.length; r++) {
+    var tr = body.rows[r], cells = [], actions = [];
+    if (tr.parentNode.tagName === 'THEAD') { continue; }
+    for (var c = 0; c < tr.cells.length; c++) { cells.push(tr.cells[c].innerText.trim()); }
+    var links = tr.getElementsByTagName('a');
+    for (var k = 0; k < links.length; k++) {
+        actions.push({text: links[k].innerText.trim(),
+                      onclick: links[k].getAttribute('onclick') || '',
+                      href: links[k].getAttribute('href') || ''});
+    }
+    rows.push({cells: cells, actions: actions});
+}
+return {headers: headers, rows: rows};
+"""
+
+# 表头关键字 -> 统一字段名（按顺序匹配，先匹配的优先）
+COLUMN_ALIASES = (
+    ("course_id", ("课程编号", "课程号", "课程代码")),
+    ("course_name", ("课程名称", "课程名")),
+    ("teacher", ("上课教师", "授课教师", "任课教师", "上课老师", "教师")),
+    ("time_text", ("上课时间", "时间")),
+    ("place", ("上课地点", "地点")),
+    ("credit", ("学分",)),
+    ("remaining", ("剩余量", "剩余", "余量", "可选人数")),
+    ("capacity", ("课容量", "容量", "限选人数", "人数上限")),
+)
+
+# 没有表头时使用的默认列位置
+DEFAULT_COLUMNS = {"course_id": 0, "course_name": 2}
+
+WEEKDAYS = {"一": "周一", "二": "周二", "三": "周三", "四": "周四", "五": "周五",
+            "六": "周六", "日": "周日", "天": "周日", "七": "周日",
+            "1": "周一", "2": "周二", "3": "周三", "4": "周四", "5": "周五", "6": "周六", "7": "周日"}
+
+WEEKDAY_RE = re.compile(r"(?:星期|周)([一二三四五六日天七1-7])(?!\d)")
+SECTION_RANGE_RE = re.compile(r"(\d{1,2})\s*[-~～至]\s*(\d{1,2})\s*节")
+SECTION_SINGLE_RE = re.compile(r"第\s*(\d{1,2})\s*节")
+SECTION_ID_RE = re.compile(r"jx0404id=([\w-]+)")
+FIRST_ARG_RE = re.compile(r"\(\s*['\"]([^'\"]+)['\"]")
+
+
+def map_columns(headers):
+    """根据表头文字确定各字段所在列"""
+    columns = {}
+    for index, header in enumerate(headers or []):
+        for field, aliases in COLUMN_ALIASES:
+            if field not in columns and any(alias in header for alias in aliases):
+                columns[field] = index
+                break
+    if not columns:
+        columns = dict(DEFAULT_COLUMNS)
+    return columns
+
+
+def parse_time(text):
+    """解析上课时间文字，返回 (星期, 开始节次, 结束节次)，无法解析的部分为None"""
+    if not text:
+        return None, None, None
+    weekday = None
+    match = WEEKDAY_RE.search(text)
+    if match:
+        weekday = WEEKDAYS[match.group(1)]
+    match = SECTION_RANGE_RE.search(text)
+    if match:
+        return weekday, int(match.group(1)), int(match.group(2))
+    match = SECTION_SINGLE_RE.search(text)
+    if match:
+        return weekday, int(match.group(1)), int(match.group(1))
+    return weekday, None, None
+
+
+def parse_slots(text):
+    """解析包含多次上课安排的时间文字（如"星期一 1-2节, 星期三 3-4节"），返回全部时间段"""
+    parts = [p for p in re.split(r"[,，;；\n]+", text or "") if p.strip()]
+    slots = [parse_time(part) for part in parts]
+    return [slot for slot in slots if slot != (None, None, None)]
+
+
+def _to_int(text):
+    match = re.search(r"-?\d+", text or "")
+    return int(match.group()) if match else None
+
+
+def _select_action(actions):
+    for action in actions:
+        if "选课" in action.get("text", "") and "退" not in action.get("text", ""):
+            return action
+    return None
+
+
+def section_id_of(action):
+    """从选课链接中提取教学班的服务端标识"""
+    if not action:
+        return None
+    for source in (action.get("href", ""), action.get("onclick", "")):
+        match = SECTION_ID_RE.search(source)
+        if match:
+            return match.group(1)
+    for source in (action.get("onclick", ""), action.get("href", "")):
+        match = FIRST_ARG_RE.search(source)
+        if match:
+            return match.group(1)
+    return None
+
+
+def parse_rows(headers, raw_rows):
+    """把提取到的原始行转换成统一字段的课程记录列表"""
+    columns = map_columns(headers)
+    rows = []
+    for index, raw in enumerate(raw_rows or []):
+        cells = raw.get("cells", [])
+        if not cells or (len(cells) == 1 and len(columns) > 1):
+            # 跳过"无数据"之类的占位行
+            continue
+
+        def cell(field):
+            position = columns.get(field)
+            if position is None or position >= len(cells):
+                return ""
+            return cells[position]
+
+        action = _select_action(raw.get("actions", []))
+        slots = parse_slots(cell("time_text"))
+        weekday, start, end = slots[0] if slots else (None, None, None)
+        rows.append({
+            "index": index,
+            "course_id": cell("course_id"),
+            "course_name": cell("course_name"),
+            "teacher": cell("teacher"),
+            "time_text": cell("time_text"),
+            "weekday": weekday,
+            "start_section": start,
+            "end_section": end,
+            "slots": slots,
+            "place": cell("place"),
+            "credit": cell("credit"),
+            "remaining": _to_int(cell("remaining")) if "remaining" in columns else None,
+            "capacity": _to_int(cell("capacity")) if "capacity" in columns else None,
+            "section_id": section_id_of(action),
+            "action": (action.get("onclick") or action.get("href")) if action else None,
+            "selectable": action is not None,
+        })
+    return rows
+
+
+def parse_table(data):
+    """解析 EXTRACT_TABLE_JS 的返回值"""
+    if not data:
+        return []
+    return parse_rows(data.get("headers"), data.get("rows"))
+
+
+def read_table(driver):
+    """从当前页面读取并解析结果表格"""
+    return parse_table(driver.execute_script(EXTRACT_TABLE_JS))
+
+
+class _DataViewParser(HTMLParser):
+    """标准库HTML解析器：只收集dataView表格的表头、单元格和链接"""
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.depth = 0          # 位于dataView内的table嵌套层数
+        self.in_head = False
+        self.headers = []
+        self.rows = []
+        self.row = None
+        self.cell = None
+        self.link = None
+
+    def handle_starttag(self, tag, attrs):
+        if tag == "table":
+            if self.depth or dict(attrs).get("id") == "dataView":
+                self.depth += 1
+            return
+        if self.depth != 1:
+            return
+        if tag == "thead":
+            self.in_head = True
+        elif tag == "tr":
+            self.row = {"cells": [], "actions": []}
+        elif tag in ("td", "th") and self.row is not None:
+            self.cell = []
+        elif tag == "a" and self.row is not None:
+            attrs = dict(attrs)
+            self.link = {"text": [], "onclick": attrs.get("onclick") or "", "href": attrs.get("href") or ""}
+
+    def handle_endtag(self, tag):
+        if tag == "table" and self.depth:
+            self.depth -= 1
+            return
+        if self.depth != 1:
+            return
+        if tag == "thead":
+            self.in_head = False
+        elif tag in ("td", "th") and self.cell is not None and self.row is not None:
+            self.row["cells"].append(" ".join("".join(self.cell).split()))
+            self.cell = None
+        elif tag == "a" and self.link is not None:
+            self.link["text"] = "".join(self.link["text"]).strip()
+            self.row["actions"].append(self.link)
+            self.link = None
+        elif tag == "tr" and self.row is not None:
+            if self.in_head:
+                self.headers = self.row["cells"]
+            else:
+                self.rows.append(self.row)
+            self.row = None
+
+    def handle_data(self, data):
+        if self.cell is not None:
+            self.cell.append(data)
+        if self.link is not None:
+            self.link["text"].append(data)
+
+
+def _extract_with_lxml(html):
+    root = lxml.html.fromstring(html)
+    tables = root.xpath("//table[@id='dataView']")
+    if not tables:
+        return None
+    table = tables[0]
+
+    def text_of(node):
+        return " ".join(node.text_content().split())
+
+    head_rows = table.xpath("./thead/tr")
+    headers = [text_of(cell) for cell in head_rows[-1].xpath("./th|./td")] if head_rows else []
+    rows = []
+    for tr in table.xpath("./tbody/tr|./tr"):
+        rows.append({
+            "cells": [text_of(cell) for cell in tr.xpath("./td|./th")],
+            "actions": [{"text": text_of(a), "onclick": a.get("onclick") or "", "href": a.get("href") or ""}
+                        for a in tr.iter("a")],
+        })
+    return {"headers": headers, "rows": rows}
+
+
+def extract_html(html):
+    """从页面源码中提取表格原始内容，格式与 EXTRACT_TABLE_JS 相同"""
+    if lxml is not None:
+        return _extract_with_lxml(html)
+    parser = _DataViewParser()
+    parser.feed(html)
+    parser.close()
+    if not parser.headers and not parser.rows:
+        return None
+    return {"headers": parser.headers, "rows": parser.rows}
+
+
+def parse_html(html):
+    """解析页面源码(page_source)中的结果表格"""
+    return parse_table(extract_html(html))
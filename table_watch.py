@@ -0,0 +1,108 @@
+# -*- coding: utf-8 -*-
+"""结果表格(dataView)变化检测
+
+在页面中为结果表格挂载 MutationObserver，维护内容哈希和变化计数。
+Python 端通过 execute_async_script 等待表格变化，表格内容与上次解析时相同时
+可以直接跳过解析和匹配。
+"""
+import time
+from selenium.common.exceptions import WebDriverException
+
+# 安装观察器并等待变化；arguments: [上次计数, 最长等待毫秒数, callback]
+WATCH_TABLE_JS = """
+var lastCount = arguments[0], waitMs = arguments[1];
+var done = arguments[arguments.length - 1];
+var table = document.getElementById('dataView');
+if (!table) { done({present: false, count: -1, hash: '', fresh: false}); return; }
+
+function hashOf(node) {
+    // FNV-1a，只关心表格文本内容
+    var text = node.textContent || '', h = 0x811c9dc5;
+    for (var i = 0; i < text.length; i++) {
+        h ^= text.charCodeAt(i);
+        h = (h + ((h << 1) + (h << 4) + (h << 7) + (h << 8) + (h << 24))) >>> 0;
+    }
+    return h.toString(16) + ':' + text.length;
+}
+
+var w = window.__sztuTableWatch, fresh = false;
+if (!w || w.table !== table) {
+    if (w && w.observer) { w.observer.disconnect(); }
+    w = window.__sztuTableWatch = {table: table, count: 0, hash: hashOf(table), waiters: []};
+    w.observer = new MutationObserver(function () {
+        w.count += 1;
+        w.hash = hashOf(w.table);
+        var waiters = w.waiters; w.waiters = [];
+        for (var i = 0; i < waiters.length; i++) { waiters[i](); }
+    });
+    w.observer.observe(table, {childList: true, subtree: true, characterData: true});
+    fresh = true;
+}
+
+function state() {
+    return {present: true, count: w.count, hash: w.hash, fresh: fresh,
+            rows: table.tBodies.length ? table.tBodies[0].rows.length : 0};
+}
+if (fresh || lastCount === null || w.count !== lastCount || waitMs <= 0) { done(state()); return; }
+
+var finished = false;
+function finish() { if (!finished) { finished = true; done(state()); } }
+w.waiters.push(finish);
+setTimeout(finish, waitMs);
+"""
+
+
+class TableWatcher:
+    """跟踪结果表格内容，判断自上次解析后是否发生变化"""
+
+    def __init__(self, driver):
+        self.driver = driver
+        self.last_state = None
+        # 课程标识 -> 上次解析且未找到可选课程时的表格哈希
+        self.parsed_hashes = {}
+        self.skipped = 0
+
+    def snapshot(self):
+        """立即读取当前表格状态（必要时安装观察器）"""
+        return self._run(None, 0)
+
+    def wait_for_change(self, since=None, timeout=3.0):
+        """等待表格相对 since 状态发生变化，超时后返回当前状态"""
+        last_count = since["count"] if since and since.get("present") else None
+        deadline = time.time() + timeout
+        while True:
+            remaining_ms = max(0, int((deadline - time.time()) * 1000))
+            try:
+                state = self._run(last_count, remaining_ms)
+            except WebDriverException:
+                # 查询导致整页刷新时脚本会被中断，稍后在新页面上重新安装
+                state = None
+            if state and (state["present"] or remaining_ms == 0):
+                self.last_state = state
+                return state
+            if time.time() >= deadline:
+                self.last_state = state
+                return state
+            time.sleep(0.1)
+
+    def unchanged(self, key, state=None):
+        """表格内容与该课程上次解析时相同"""
+        state = state or self.last_state
+        if not state or not state.get("present"):
+            return False
+        if self.parsed_hashes.get(key) == state["hash"]:
+            self.skipped += 1
+            return True
+        return False
+
+    def remember(self, key, state=None):
+        """记录本次解析结果对应的表格哈希"""
+        state = state or self.last_state
+        if state and state.get("present"):
+            self.parsed_hashes[key] = state["hash"]
+
+    def forget(self, key):
+        self.parsed_hashes.pop(key, None)
+
+    def _run(self, last_count, wait_ms):
+        return self.driver.execute_async_script(WATCH_TABLE_JS, last_count, wait_ms)
@@ -0,0 +1,60 @@
+# -*- coding: utf-8 -*-
+import pytest
+
+from latency import LatencyTracker, percentile
+
+
+def tracker(**kwargs):
+    return LatencyTracker(path="", **kwargs)
+
+
+def test_percentile():
+    assert percentile([], 99) == 0.0
+    assert percentile([3, 1, 2], 50) == 2
+    assert percentile(range(1, 101), 99) == 99
+
+
+def test_default_until_enough_samples():
+    latency = tracker(min_samples=5, factor=3.0, floor=0.5)
+    for _ in range(4):
+        latency.record("table", 0.4)
+    assert latency.timeout_for("table", 10) == 10
+
+    latency.record("table", 0.4)
+    assert latency.timeout_for("table", 10) == pytest.approx(1.2)
+
+
+def test_timeout_is_clamped():
+    latency = tracker(min_samples=1, factor=3.0, floor=0.5)
+    latency.record("fast", 0.01)
+    latency.record("slow", 8)
+
+    assert latency.timeout_for("fast", 10) == 0.5
+    assert latency.timeout_for("slow", 10) == 10
+
+
+def test_timeouts_back_off_until_success():
+    latency = tracker(min_samples=1, factor=2.0, backoff_after=2)
+    for _ in range(5):
+        latency.record("alert", 0.5)
+    assert latency.timeout_for("alert", 10) == 1.0
+
+    latency.record_timeout("alert", 1.0)
+    assert latency.timeout_for("alert", 10) == 2.0  # 超时按超时时间计入样本
+    latency.record_timeout("alert", 2.0)
+    assert latency.timeout_for("alert", 10) == 10
+    latency.record("alert", 0.5)
+    assert latency.timeout_for("alert", 10) == 4.0
+
+
+def test_save_and_load_keep_window(tmp_path):
+    path = str(tmp_path / "samples.json")
+    latency = tracker(window=3)
+    for seconds in (1, 2, 3, 4):
+        latency.record("table", seconds)
+    latency.save(path)
+
+    loaded = tracker(window=2)
+    assert loaded.load(path)
+    assert loaded.snapshot() == {"table": [3.0, 4.0]}
+    assert not tracker().load(str(tmp_path / "missing.json"))
@@ -0,0 +1,80 @@
+# -*- coding: utf-8 -*-
+import os
+
+from loguru import logger
+
+from log_archive import LogArchive, load_index, query, save_index
+
+
+def archive_run(base, run_id, events, segment_bytes=10 ** 6):
+    """按events依次写日志：(课程, 级别, 文字)，级别为exception时附带异常"""
+    directory = os.path.join(base, run_id)
+    os.makedirs(directory)
+    current = [None]
+    archive = LogArchive(directory, run_id, context=lambda: (current[0], "search"),
+                         segment_bytes=segment_bytes, index_path=os.path.join(base, "index.json"))
+    archive.start()
+    archive.note_courses(sorted({course for course, _, _ in events if course}))
+    for course, level, text in events:
+        current[0] = course
+        if level == "exception":
+            try:
+                raise TimeoutError(text)
+            except TimeoutError:
+                logger.exception(text)
+        else:
+            logger.log(level, text)
+    archive.note_outcome("CP00006", "full")
+    archive.close({"selected": []})
+    archive.close()
+    return archive
+
+
+def test_run_index_and_segments(tmp_path):
+    base = str(tmp_path)
+    archive = archive_run(base, "run-1", [("CP00006", "INFO", "查询 %d" % i) for i in range(20)],
+                          segment_bytes=500)
+    index = load_index(os.path.join(base, "index.json"))
+    entry = index["run-1"]
+
+    assert len(entry["segments"]) == len(archive.segments) > 1
+    assert all(name.endswith(".jsonl.gz") for name in os.listdir(os.path.join(base, "run-1"))
+               if name.startswith("events-"))
+    assert entry["dir"] == "run-1"
+    assert entry["courses"] == ["CP00006"]
+    assert entry["outcomes"] == {"CP00006": {"full": 1}}
+    assert sum(segment["events"] for segment in entry["segments"]) == 20
+
+    messages = [event["msg"] for _, event in query(index, run="run-1", index_path=os.path.join(base, "index.json"))]
+    assert messages == ["查询 %d" % i for i in range(20)]
+
+
+def test_query_filters_course_error_and_level(tmp_path):
+    base = str(tmp_path)
+    index_path = os.path.join(base, "index.json")
+    archive_run(base, "run-1", [("CP00006", "INFO", "开始"), ("CP00006", "exception", "等待超时"),
+                                ("CP00007", "WARNING", "人数已满")])
+    archive_run(base, "run-2", [("CP00007", "INFO", "开始")])
+    index = load_index(index_path)
+
+    assert set(index) == {"run-1", "run-2"}
+    assert index["run-1"]["errors"] == {"TimeoutError": 1}
+
+    by_error = list(query(index, error="TimeoutError", index_path=index_path))
+    assert [(run, event["msg"], event["course"]) for run, event in by_error] == [("run-1", "等待超时", "CP00006")]
+    assert "TimeoutError" in by_error[0][1]["exc"]
+
+    by_course = [(run, event["msg"]) for run, event in query(index, course="CP00007", index_path=index_path)]
+    assert by_course == [("run-1", "人数已满"), ("run-2", "开始")]
+
+    warnings = [event["msg"] for _, event in query(index, level="warning", index_path=index_path)]
+    assert warnings == ["等待超时", "人数已满"]
+
+
+def test_load_index_merges_legacy_index(tmp_path):
+    index_path = str(tmp_path / "index.json")
+    save_index({"old": {"start": 1, "dir": "old"}}, index_path)
+    save_index({"new": {"start": 2, "dir": "new"}}, str(tmp_path / "new" / "index.json"))
+
+    assert set(load_index(index_path)) == {"old", "new"}
+    assert load_index(str(tmp_path / "missing" / "index.json")) == {}
@@ -0,0 +1,72 @@
+# -*- coding: utf-8 -*-
+import pytest
+
+from matcher import MatchIndex, normalize, query_text
+
+
+def row(name, teacher, weekday="周一", start=1, end=2, course_id="CP00006"):
+    return {"course_id": course_id, "course_name": name, "teacher": teacher,
+            "weekday": weekday, "start_section": start, "end_section": end,
+            "slots": [(weekday, start, end)]}
+
+
+COURSE = {"course_name": "大学英语II", "teacher": "张三", "time": "周一", "start_section": 1, "end_section": 2}
+
+
+@pytest.mark.parametrize("a,b", [
+    ("大学英语II", "大学英语（二）"),
+    ("大学英语Ⅱ", "大学英语 2"),
+    ("Python程序设计", "ｐｙｔｈｏｎ 程序设计"),
+])
+def test_normalize_equivalent_spellings(a, b):
+    assert normalize(a) == normalize(b)
+
+
+def test_query_text_keeps_punctuation():
+    assert query_text(" 大学英语（二） ") == "大学英语(二)"
+
+
+def test_exact_match_is_confident():
+    match = MatchIndex([row("大学英语（二）", "张三，李四")]).best(COURSE)
+
+    assert match is not None
+    assert (match.name_score, match.teacher_score, match.time_score) == (1.0, 1.0, 1.0)
+    assert match.score == pytest.approx(1.0)
+
+
+def test_confident_match_ranks_first():
+    index = MatchIndex([
+        row("大学英语II", "张三", weekday="周三"),
+        row("大学英语III", "张三"),
+        row("大学英语II", "张三"),
+    ])
+    ranked = index.rank(COURSE)
+
+    assert ranked[0].row is index.entries[2][0]
+    assert ranked[0].confident
+    assert not any(match.confident for match in ranked[1:])
+
+
+@pytest.mark.parametrize("candidate", [
+    row("大学英语II", "王五"),               # 教师不同
+    row("大学英语II", "张三", start=3, end=4),  # 节次不同
+    row("大学物理", "张三"),                 # 课程不同
+])
+def test_mismatch_is_not_confident(candidate):
+    assert MatchIndex([candidate]).best(COURSE) is None
+
+
+def test_unparsed_time_is_neutral():
+    candidate = row("大学英语II", "张三", weekday=None, start=None, end=None)
+    match = MatchIndex([candidate]).rank(COURSE)[0]
+
+    assert match.time_score is None
+    assert not match.confident
+    assert match.score == pytest.approx(0.5 + 0.3 + 0.2 * 0.5)
+
+
+def test_course_id_filters_rows():
+    index = MatchIndex([row("大学英语II", "张三", course_id="CP00007")])
+
+    assert index.rank(dict(COURSE, course_id="cp00006")) == []
+    assert index.best(dict(COURSE, course_id="CP00007")) is not None
@@ -0,0 +1,50 @@
+# -*- coding: utf-8 -*-
+import pytest
+
+from outcomes import (classify_result, retry_policy, SUCCESS, FULL, CONFLICT, NOT_OPEN, LIMIT,
+                      ALREADY_SELECTED, SESSION_EXPIRED, UNKNOWN, DONE, RETRY, STOP)
+
+CASES = [
+    ("选课成功", SUCCESS),
+    ("选课失败：选课人数超过课程容量", FULL),
+    ("选课人数已达上限", FULL),
+    ("超出最大可选人数", FULL),
+    ("该课程人数已满", FULL),
+    ("该课程已选，不能重复选择", ALREADY_SELECTED),
+    ("你已选过该课程", ALREADY_SELECTED),
+    ("您已选择该课程", ALREADY_SELECTED),
+    ("已选学分超过上限", LIMIT),
+    ("已选学分已达上限", LIMIT),
+    ("已选课程门数已达上限", LIMIT),
+    ("本学期已选学分超出最高限制", LIMIT),
+    ("选课门数已达上限", LIMIT),
+    ("您的学分已达上限，不能再选", LIMIT),
+    ("超出选课门数限制", LIMIT),
+    ("选课门数上限为3门", LIMIT),
+    ("未修读先修课程", LIMIT),
+    ("与已选课程上课时间冲突", CONFLICT),
+    ("当前不在选课时间内", NOT_OPEN),
+    ("登录超时，请重新登录", SESSION_EXPIRED),
+    ("", UNKNOWN),
+    ("系统繁忙", UNKNOWN),
+]
+
+
+@pytest.mark.parametrize("text,expected", CASES)
+def test_classify_result(text, expected):
+    assert classify_result(text) == expected
+
+
+@pytest.mark.parametrize("outcome,policy", [
+    (SUCCESS, DONE),
+    (ALREADY_SELECTED, DONE),
+    (FULL, RETRY),
+    (LIMIT, STOP),
+])
+def test_retry_policy(outcome, policy):
+    assert retry_policy(outcome) == policy
+
+
+@pytest.mark.parametrize("text", ["已选学分已达上限", "已选课程门数已达上限", "本学期已选学分超出最高限制"])
+def test_limit_is_not_done(text):
+    assert retry_policy(classify_result(text)) == STOP
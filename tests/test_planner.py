@@ -0,0 +1,64 @@
+# -*- coding: utf-8 -*-
+import pytest
+
+from planner import LatencyModel, plan, simulate
+
+START = 1_700_000_000.0
+
+COURSES = [
+    {"course_id": "A", "course_name": "大学英语", "teacher": "张三", "tab_type": "plan"},
+    {"course_id": "B", "course_name": "高等数学", "teacher": "李四", "tab_type": "plan", "priority": 3},
+]
+
+# 每门课程: 跳转1.0 + 查询0.6 + 刷新1.0，加上8个命令各0.02
+PER_CHECK = 1.0 + 0.6 + 1.0 + 8 * 0.02
+
+
+def options(**overrides):
+    return dict({"multi_window": False, "batch_search": True, "rate": 0, "burst": 5,
+                 "session_check": 1e9}, **overrides)
+
+
+def test_unlimited_round_time_and_requests():
+    result = plan(COURSES, options(), LatencyModel(), rounds=3, start=START)
+
+    assert result["round_seconds"] == pytest.approx(2 * PER_CHECK)
+    assert result["requests"] == {"navigate": 2, "query": 2, "refresh": 2}
+    assert result["waited"] == 0
+
+
+def test_multi_window_navigates_once_per_tab():
+    result = simulate(COURSES, LatencyModel(), options(multi_window=True), rounds=2, start=START)
+    first, second = result["rounds"]
+
+    assert first["requests"]["navigate"] == 1
+    assert "navigate" not in second["requests"] and "refresh" not in second["requests"]
+
+
+def test_rate_limit_dominates_round_time():
+    result = plan(COURSES, options(rate=6, burst=1), LatencyModel(), rounds=4, start=START)
+
+    # 每轮6个请求，每分钟6个即每个请求10秒
+    assert result["round_seconds"] == pytest.approx(60, rel=0.05)
+    assert result["waited"] > result["round_seconds"] / 2
+
+
+def test_samples_and_commands_feed_the_model():
+    commands = {"per_check": {"navigate": 1, "search": 4, "total": 99},
+                "commands": [{"command": "get", "count": 10, "seconds": 50.0},
+                             {"command": "findElement", "count": 4, "seconds": 0.4}]}
+    model = LatencyModel({"page": [2.0, 2.0, 4.0]}, commands, pct=50)
+
+    assert model.wait("page") == 2.0
+    assert model.wait("results") == 0.6
+    assert model.commands["navigate"] == 1 and "total" not in model.commands
+    assert model.command_seconds == pytest.approx(0.1)
+    assert model.sources == ["latency_samples", "commands"]
+
+
+def test_priority_shows_in_check_counts():
+    result = plan(COURSES, options(), LatencyModel(), rounds=10, start=START)
+    rows = {row["key"]: row for row in result["courses"]}
+
+    assert rows["B"]["per_round"] > rows["A"]["per_round"]
+    assert rows["B"]["interval"] < rows["A"]["interval"]
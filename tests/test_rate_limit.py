@@ -0,0 +1,76 @@
+# -*- coding: utf-8 -*-
+import pytest
+
+from rate_limit import TokenBucket
+
+
+class FakeClock:
+    """可控时钟：sleep只推进时间"""
+
+    def __init__(self):
+        self.now = 0.0
+        self.slept = []
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.slept.append(seconds)
+        self.now += seconds
+
+
+def bucket(rate=60, burst=3):
+    clock = FakeClock()
+    return TokenBucket(rate_per_minute=rate, burst=burst, clock=clock, sleep=clock.sleep), clock
+
+
+def test_burst_then_paced():
+    limiter, clock = bucket(rate=60, burst=3)
+
+    assert [limiter.acquire("search") for _ in range(3)] == [0.0, 0.0, 0.0]
+    assert limiter.acquire("search") == pytest.approx(1.0)
+    assert limiter.acquire("search") == pytest.approx(1.0)
+    assert clock.now == pytest.approx(2.0)
+
+
+def test_refill_is_capped_at_burst():
+    limiter, clock = bucket(rate=60, burst=2)
+    limiter.acquire()
+    clock.now += 100
+
+    assert limiter.available() == pytest.approx(2.0)
+    assert [limiter.acquire() for _ in range(2)] == [0.0, 0.0]
+    assert limiter.acquire() == pytest.approx(1.0)
+
+
+def test_debt_queues_later_requests():
+    # 并发请求预支令牌：不推进时钟时，后来的请求等待时间依次增加
+    clock = FakeClock()
+    limiter = TokenBucket(rate_per_minute=30, burst=1, clock=clock, sleep=lambda seconds: None)
+
+    assert [limiter.acquire() for _ in range(4)] == pytest.approx([0.0, 2.0, 4.0, 6.0])
+    assert limiter.available() == 0.0
+
+
+def test_disabled_bucket_never_waits():
+    limiter, clock = bucket(rate=0, burst=1)
+
+    assert all(limiter.acquire() == 0.0 for _ in range(10))
+    assert limiter.available() == float("inf")
+    assert clock.slept == []
+
+
+def test_describe_and_listener():
+    limiter, _ = bucket(rate=60, burst=1)
+    calls = []
+    limiter.listener = lambda kind, waited: calls.append((kind, waited))
+    limiter.acquire("navigate")
+    limiter.acquire("search")
+    limiter.acquire("search")
+    info = limiter.describe()
+
+    assert calls == [("navigate", 0.0), ("search", pytest.approx(1.0)), ("search", pytest.approx(1.0))]
+    assert info["requests"] == 3
+    assert info["waited"] == pytest.approx(2.0)
+    assert info["by_kind"]["search"] == {"count": 2, "waited": 2.0}
+    assert info["by_kind"]["navigate"]["count"] == 1
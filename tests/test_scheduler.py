@@ -0,0 +1,88 @@
+# -*- coding: utf-8 -*-
+from datetime import datetime
+
+from scheduler import CourseScheduler, course_key, parse_deadline
+
+NOW = datetime(2025, 2, 20, 12, 0).timestamp()
+
+
+def course(course_id, **extra):
+    return dict({"course_id": course_id, "course_name": course_id, "teacher": "张三"}, **extra)
+
+
+def scheduler(courses, now=NOW):
+    return CourseScheduler(courses, course_key, clock=lambda: now)
+
+
+def test_course_key_falls_back_to_name_and_teacher():
+    assert course_key(course("CP00006")) == "CP00006"
+    assert course_key(course("", course_name="体育")) == "体育|张三"
+
+
+def test_parse_deadline_formats():
+    assert parse_deadline("2025-02-20 12:00") == NOW
+    assert parse_deadline("2025-02-20 12:00:00") == NOW
+    assert parse_deadline("2025-02-20T12:00") == NOW
+    assert parse_deadline("") is None
+
+
+def test_invalid_courses_are_reported_not_scheduled():
+    plan = scheduler([
+        course("A"),
+        course("B", priority="high"),
+        course("C", deadline="明天下午"),
+    ])
+
+    assert set(plan.invalid) == {"B", "C"}
+    assert all(plan.invalid.values())
+    assert list(plan.states) == ["A"]
+    assert [c["course_id"] for c in plan.plan_round()] == ["A"]
+
+
+def test_duplicate_course_is_scheduled_once():
+    plan = scheduler([course("A"), course("A", priority=5)])
+
+    assert plan.states["A"].priority == 1.0
+    assert len(plan.plan_round()) == 1
+
+
+def test_expired_course_is_dropped_from_rounds():
+    plan = scheduler([
+        course("A"),
+        course("B", deadline="2025-02-20 11:59"),
+        course("C", deadline="2025-02-20 12:00"),
+    ])
+
+    assert sorted(plan.expired()) == ["B", "C"]
+    assert [c["course_id"] for c in plan.plan_round()] == ["A"]
+
+
+def test_deadline_raises_check_frequency():
+    plan = scheduler([course("A"), course("B", deadline="2025-02-20 13:00")])
+    counts = {"A": 0, "B": 0}
+    for _ in range(20):
+        for item in plan.plan_round():
+            counts[item["course_id"]] += 1
+
+    assert plan.states["B"].urgency(NOW) == 2.0
+    assert counts["B"] > counts["A"] > 0
+
+
+def test_skipped_course_rejoins_at_global_pass():
+    plan = scheduler([course("A"), course("B")])
+    for _ in range(10):
+        plan.plan_round(skip={"B"})
+    rounds = [[c["course_id"] for c in plan.plan_round()] for _ in range(2)]
+
+    # B从全局pass值起步，不会因为之前未参与调度而连续占满多轮
+    assert all(set(ids) == {"A", "B"} for ids in rounds)
+
+
+def test_record_updates_opening_rate():
+    plan = scheduler([course("A")])
+    plan.record(course("A"), opened=True)
+    plan.record(course("A"), opened=False)
+    plan.record(course("Z"), opened=True)
+
+    assert plan.describe()["A"]["checks"] == 2
+    assert plan.states["A"].opening_rate() == 0.5
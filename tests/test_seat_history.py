@@ -0,0 +1,45 @@
+# -*- coding: utf-8 -*-
+from seat_history import SeatHistory
+
+
+def row(remaining, section="S1"):
+    return {"course_id": "CP00006", "section_id": section, "remaining": remaining}
+
+
+def test_filtered_query_closes_and_reopens_interval(tmp_path):
+    history = SeatHistory(str(tmp_path / "seats.db"))
+    # 过滤已满课程的查询：满员的教学班不出现在结果中
+    history.record("plan", [], ts=100, query="CP00006")
+    history.record("plan", [row(2)], ts=110, query="CP00006")
+    history.record("plan", [row(1)], ts=120, query="CP00006")
+    history.record("plan", [], ts=130, query="CP00006")
+    history.record("plan", [], ts=140, query="CP00006")
+    history.record("plan", [row(3)], ts=150, query="CP00006")
+    intervals = history.intervals()
+    history.close()
+
+    assert [(item["opened_at"], item["closed_at"], item["peak"]) for item in intervals] == [
+        (110, 130, 2),
+        (150, None, 3),
+    ]
+    assert intervals[0]["tab"] == "plan"
+
+
+def test_unfiltered_rows_close_interval(tmp_path):
+    history = SeatHistory(str(tmp_path / "seats.db"))
+    history.record("plan", [row(1), row(0, "S2")], ts=100)
+    history.record("plan", [row(0), row(0, "S2")], ts=110)
+    intervals = history.intervals()
+    history.close()
+
+    assert [(item["section"], item["opened_at"], item["closed_at"]) for item in intervals] == [("S1", 100, 110)]
+
+
+def test_other_query_does_not_close_section(tmp_path):
+    history = SeatHistory(str(tmp_path / "seats.db"))
+    history.record("plan", [row(1)], ts=100, query="CP00006")
+    history.record("plan", [], ts=110, query="CP00007|吴海娜")
+    intervals = history.intervals()
+    history.close()
+
+    assert [item["closed_at"] for item in intervals] == [None]
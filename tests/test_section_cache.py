@@ -0,0 +1,79 @@
+# -*- coding: utf-8 -*-
+from types import SimpleNamespace
+
+import pytest
+
+import section_cache
+from section_cache import SectionCache
+
+ROW = {"section_id": "202420251001", "action": "javascript:xsxkFun('202420251001')"}
+
+
+@pytest.fixture
+def now(monkeypatch):
+    clock = [1000.0]
+    monkeypatch.setattr(section_cache, "time", SimpleNamespace(time=lambda: clock[0]))
+    return clock
+
+
+def test_remember_requires_section_and_action(now):
+    cache = SectionCache()
+    cache.remember("a", "plan", {"section_id": "S1", "action": None})
+    cache.remember("b", "plan", {"section_id": None, "action": "xsxkFun()"})
+
+    assert cache.entries == {}
+
+
+def test_get_checks_tab(now):
+    cache = SectionCache()
+    cache.remember("a", "plan", ROW)
+
+    assert cache.get("a", "plan")["section_id"] == "202420251001"
+    assert cache.get("a", "public") is None
+    assert "a" in cache.entries
+
+
+def test_entry_expires_after_max_age(now):
+    cache = SectionCache(max_age=600)
+    cache.remember("a", "plan", ROW)
+    now[0] += 600
+    assert cache.get("a", "plan") is not None
+    now[0] += 1
+
+    assert cache.get("a", "plan") is None
+    assert "a" not in cache.entries
+
+
+def test_remember_refreshes_age(now):
+    cache = SectionCache(max_age=600)
+    cache.remember("a", "plan", ROW)
+    now[0] += 500
+    cache.remember("a", "plan", ROW)
+    now[0] += 500
+
+    assert cache.get("a", "plan") is not None
+
+
+def test_note_full_forgets_after_max_full(now):
+    cache = SectionCache(max_full=3)
+    cache.remember("a", "plan", ROW)
+
+    assert [cache.note_full("a") for _ in range(3)] == [False, False, True]
+    assert cache.get("a", "plan") is None
+    assert cache.note_full("a") is False
+
+
+def test_remember_resets_full_count(now):
+    cache = SectionCache(max_full=2)
+    cache.remember("a", "plan", ROW)
+    cache.note_full("a")
+    cache.remember("a", "plan", ROW)
+
+    assert cache.note_full("a") is False
+
+
+def test_script_strips_javascript_scheme():
+    script = SectionCache.script("javascript:xsxkFun('S1')")
+
+    assert script.startswith("setTimeout(function () { xsxkFun('S1')")
+    assert script.endswith("return true;")
@@ -0,0 +1,98 @@
+# -*- coding: utf-8 -*-
+import pytest
+
+import table_parser
+from table_parser import extract_html, parse_html, parse_rows, parse_time
+
+HEADERS = ["课程编号", "开课编号", "课程名称", "学分", "上课教师", "上课时间", "上课地点", "剩余量", "操作"]
+
+PAGE = """
+<html><body>
+<table id="other"><tr><td>不相关的表格</td></tr></table>
+<table id="dataView">
+  <thead><tr>%s</tr></thead>
+  <tbody>
+    <tr>
+      <td>CP00006</td><td>01</td><td>大学英语&nbsp;Ⅱ</td><td>2.0</td><td>张三，李四</td>
+      <td>星期一 1-2节, 星期三 第3节</td><td>C1-101</td><td>5</td>
+      <td><a href="javascript:void(0);" onclick="xsxkFun('202420251001', 'x')">选课</a></td>
+    </tr>
+    <tr>
+      <td>CP00007</td><td>02</td><td>高等数学</td><td>4.0</td><td>王五</td>
+      <td>周五 5~6节</td><td>C2-202</td><td>0</td>
+      <td><a href="/jsxsd/xsxkkc/xsxkOper?jx0404id=202420251002">选课</a><a onclick="tk()">退课</a></td>
+    </tr>
+    <tr><td colspan="9">无数据</td></tr>
+  </tbody>
+</table>
+</body></html>
+""" % "".join("<th>%s</th>" % header for header in HEADERS)
+
+
+def test_parse_rows_maps_columns_by_header():
+    rows = parse_rows(HEADERS, [
+        {"cells": ["CP00006", "01", "大学英语", "2.0", "张三", "星期二 3-4节", "C1", "剩余12", "选课"],
+         "actions": [{"text": "选课", "onclick": "xsxkFun('S1')", "href": ""}]},
+        {"cells": ["暂无数据"], "actions": []},
+        {"cells": ["CP00007", "02", "体育", "1.0", "李四", "", "操场", "0", ""], "actions": []},
+    ])
+
+    assert len(rows) == 2
+    first, second = rows
+    assert (first["course_id"], first["course_name"], first["teacher"]) == ("CP00006", "大学英语", "张三")
+    assert (first["weekday"], first["start_section"], first["end_section"]) == ("周二", 3, 4)
+    assert first["remaining"] == 12
+    assert first["capacity"] is None
+    assert first["section_id"] == "S1"
+    assert first["selectable"]
+    assert second["index"] == 2
+    assert second["slots"] == []
+    assert not second["selectable"] and second["action"] is None
+
+
+def test_parse_rows_without_headers_uses_default_columns():
+    rows = parse_rows([], [{"cells": ["CP00006", "01", "大学英语"], "actions": []}])
+
+    assert rows[0]["course_id"] == "CP00006"
+    assert rows[0]["course_name"] == "大学英语"
+    assert rows[0]["remaining"] is None
+
+
+@pytest.mark.parametrize("text,expected", [
+    ("星期一 1-2节", ("周一", 1, 2)),
+    ("周日第5节", ("周日", 5, 5)),
+    ("星期3 7～8节", ("周三", 7, 8)),
+    ("1-16周 星期五", ("周五", None, None)),
+    ("", (None, None, None)),
+])
+def test_parse_time(text, expected):
+    assert parse_time(text) == expected
+
+
+def test_extract_html_reads_only_data_view():
+    data = extract_html(PAGE)
+
+    assert data["headers"] == HEADERS
+    assert len(data["rows"]) == 3
+    assert data["rows"][0]["cells"][2] == "大学英语 Ⅱ"
+    assert data["rows"][1]["actions"][1]["text"] == "退课"
+    assert extract_html("<table id='other'><tr><td>1</td></tr></table>") is None
+
+
+def test_parse_html_rows():
+    rows = parse_html(PAGE)
+
+    assert [row["course_id"] for row in rows] == ["CP00006", "CP00007"]
+    assert rows[0]["slots"] == [("周一", 1, 2), ("周三", 3, 3)]
+    assert rows[0]["section_id"] == "202420251001"
+    assert rows[1]["section_id"] == "202420251002"
+    assert rows[1]["remaining"] == 0
+
+
+def test_lxml_and_stdlib_agree(monkeypatch):
+    pytest.importorskip("lxml.html")
+    with_lxml = extract_html(PAGE)
+    monkeypatch.setattr(table_parser, "lxml", None)
+    with_stdlib = extract_html(PAGE)
+
+    assert with_lxml == with_stdlib